@@ -1,72 +1,158 @@
+import logging
 import os
 import requests
+import threading
 import time
 from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
+import deadline
+import instrumentation
+import json_codec
+import quota
+from offers import FlightOffer, FlightSegment, HotelOffer, Itinerary, parse_iso_duration
+from prices import parse_price, price_amount
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Amadeus API credentials
 AMADEUS_CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID")
 AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
-AMADEUS_BASE_URL = "https://test.api.amadeus.com"  # Use https://api.amadeus.com for production
+# Use https://api.amadeus.com for production, or a local stub (benchmarks/stub_server.py)
+AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com").rstrip('/')
+
+# Per-call timeout in seconds; also capped by the request deadline (deadline.py)
+AMADEUS_TIMEOUT = float(os.getenv("AMADEUS_TIMEOUT", "20"))
+
+# Hedge slow GETs with a duplicate after the endpoint's p95 (hedging.py); opt-in
+AMADEUS_HEDGING = os.getenv("AMADEUS_HEDGING", "").lower() in ("1", "true", "yes")
+AMADEUS_HEDGE_BUDGET = float(os.getenv("AMADEUS_HEDGE_BUDGET", "0.05"))
+HEDGE_POLICY = None
+if AMADEUS_HEDGING:
+    from hedging import HedgePolicy
+    HEDGE_POLICY = HedgePolicy(budget=AMADEUS_HEDGE_BUDGET)
+
+# Candidate pool sizes: fetch wide once, rank locally, show the best few
+AMADEUS_FLIGHT_MAX = int(os.getenv("AMADEUS_FLIGHT_MAX", "50"))
+AMADEUS_HOTEL_CANDIDATES = int(os.getenv("AMADEUS_HOTEL_CANDIDATES", "20"))
+
+# Access tokens are valid for expires_in seconds (30 minutes); reuse them
+# instead of an OAuth round trip per call, renewing this long before expiry
+TOKEN_REFRESH_MARGIN = 60
+_TOKEN_CACHE = {}  # (base URL, client id) -> (token, monotonic expiry)
+_TOKEN_LOCK = threading.Lock()
+
+def _decode(response):
+    """Decode a response body with the fastest available JSON codec."""
+    return json_codec.loads(response.content)
 
 def get_access_token():
-    """Get access token for Amadeus API"""
-    url = f"{AMADEUS_BASE_URL}/v1/security/oauth2/token"
-    
-    headers = {
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-    
-    data = {
-        'grant_type': 'client_credentials',
-        'client_id': AMADEUS_CLIENT_ID,
-        'client_secret': AMADEUS_CLIENT_SECRET
-    }
-    
-    try:
-        response = _request_with_retry('POST', url, headers=headers, data=data)
-        response.raise_for_status()
-        return response.json()['access_token']
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting access token: {str(e)}")
-        return None
+    """Get access token for Amadeus API (reused until shortly before it expires)"""
+    key = (AMADEUS_BASE_URL, AMADEUS_CLIENT_ID)
+    cached = _TOKEN_CACHE.get(key)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+
+    # One refresh at a time; callers that waited reuse its token
+    with _TOKEN_LOCK:
+        cached = _TOKEN_CACHE.get(key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
+        url = f"{AMADEUS_BASE_URL}/v1/security/oauth2/token"
+
+        headers = {
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+
+        data = {
+            'grant_type': 'client_credentials',
+            'client_id': AMADEUS_CLIENT_ID,
+            'client_secret': AMADEUS_CLIENT_SECRET
+        }
+
+        try:
+            response = _request_with_retry('POST', url, headers=headers, data=data)
+            response.raise_for_status()
+            body = _decode(response)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error getting access token: %s", e)
+            return None
+        lifetime = float(body.get('expires_in') or 0) - TOKEN_REFRESH_MARGIN
+        if lifetime > 0:
+            _TOKEN_CACHE[key] = (body['access_token'], time.monotonic() + lifetime)
+        return body['access_token']
+
+def clear_token_cache():
+    """Forget cached access tokens (tests, credential rotation)."""
+    with _TOKEN_LOCK:
+        _TOKEN_CACHE.clear()
 
 def _request_with_retry(method, url, headers=None, params=None, data=None, json=None, max_retries=3, backoff_base=0.5):
-    """Make HTTP request with basic retry and exponential backoff for 429/5xx."""
+    """
+    Make HTTP request with basic retry and exponential backoff for 429/5xx.
+
+    Each attempt's timeout comes from the request deadline; a retry is only
+    made when the backoff plus another call still fits in it, otherwise the
+    last response is returned (or the error raised). Every HTTP request sent
+    (attempts and hedges alike) takes a slot from the quota governor in
+    effect (quota.governing); QuotaExhausted propagates to the caller.
+    """
     attempt = 0
+    endpoint = urlsplit(url).path
+
+    def get():
+        with quota.request_slot():
+            return requests.get(url, headers=headers, params=params, timeout=timeout)
+
     while True:
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            else:
-                response = requests.post(url, headers=headers, params=params, data=data, json=json)
+            timeout = deadline.call_timeout(AMADEUS_TIMEOUT)
+            with instrumentation.upstream_call(endpoint) as call:
+                if method.upper() == 'GET' and HEDGE_POLICY is not None:
+                    # GETs are idempotent: a slow one may be raced by a duplicate
+                    response = HEDGE_POLICY.call(endpoint, get)
+                elif method.upper() == 'GET':
+                    response = get()
+                else:
+                    with quota.request_slot():
+                        response = requests.post(url, headers=headers, params=params, data=data, json=json,
+                                                 timeout=timeout)
+                call.attrs['status'] = response.status_code
             # Retry on 429 and 5xx
-            if response.status_code in (429, 500, 502, 503, 504) and attempt < max_retries:
-                wait_s = backoff_base * (2 ** attempt)
-                print(f"{method} {url} -> {response.status_code}, retrying in {wait_s:.1f}s (attempt {attempt+1}/{max_retries})")
+            wait_s = backoff_base * (2 ** attempt)
+            if (response.status_code in (429, 500, 502, 503, 504) and attempt < max_retries
+                    and deadline.allows(wait_s)):
+                logger.info("%s %s -> %s, retrying in %.1fs (attempt %d/%d)",
+                            method, endpoint, response.status_code, wait_s, attempt + 1, max_retries)
+                instrumentation.METRICS.count('upstream_retries_total', endpoint=endpoint)
                 time.sleep(wait_s)
                 attempt += 1
                 continue
             return response
+        except deadline.DeadlineExceeded:
+            raise
         except requests.exceptions.RequestException as e:
-            if attempt >= max_retries:
-                raise
             wait_s = backoff_base * (2 ** attempt)
-            print(f"{method} {url} exception: {e}, retrying in {wait_s:.1f}s (attempt {attempt+1}/{max_retries})")
+            if attempt >= max_retries or not deadline.allows(wait_s):
+                raise
+            logger.info("%s %s failed: %s, retrying in %.1fs (attempt %d/%d)",
+                        method, endpoint, e, wait_s, attempt + 1, max_retries)
+            instrumentation.METRICS.count('upstream_retries_total', endpoint=endpoint)
             time.sleep(wait_s)
             attempt += 1
 
-def search_flights(origin, destination, departure_date, return_date=None, adults=1, travel_class='ECONOMY', currency='USD'):
-    """Search flights using Amadeus API"""
-    print(f"Searching flights: {origin} to {destination} on {departure_date}")
+def search_flights(origin, destination, departure_date, return_date=None, adults=1, travel_class='ECONOMY', currency='USD',
+                   max_results=3):
+    """Search flights using Amadeus API (max_results=None returns every parsed offer)"""
+    logger.debug("Searching flights: %s to %s on %s", origin, destination, departure_date)
     
     try:
         # Get Amadeus API access token
         token = get_access_token()
         if not token:
-            print("Failed to get Amadeus API access token")
             raise Exception("Failed to get Amadeus API access token")
         
         url = f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers"
@@ -78,7 +164,7 @@ def search_flights(origin, destination, departure_date, return_date=None, adults
             'departureDate': departure_date,
             'adults': adults,
             'currencyCode': currency,
-            'max': 15  # Increased for more variety
+            'max': AMADEUS_FLIGHT_MAX  # Wide candidate pool; ranking picks the best
         }
         
         # Add optional parameters if provided
@@ -88,79 +174,143 @@ def search_flights(origin, destination, departure_date, return_date=None, adults
             params['travelClass'] = travel_class
             
         # Make the API request
-        print(f"Making request to {url} with params: {params}")
         response = _request_with_retry('GET', url, headers=headers, params=params)
         
         if response.status_code != 200:
-            print(f"Flight search error: {response.status_code} - {response.text}")
+            logger.warning("Flight search error: %s - %s", response.status_code, response.text[:200])
             raise Exception(f"Flight search API returned: {response.status_code}")
             
-        data = response.json()
-        print(f"Flight search response received, status {response.status_code}")
+        data = _decode(response)
         
-        flights = []
-        if 'data' in data and len(data['data']) > 0:
-            print(f"Found {len(data['data'])} flight offers")
-            
-            # Process each flight offer
-            for i, offer in enumerate(data['data']):
-                if i >= 10:  # Limit to 10 results
-                    break
-                
-                # Get the first segment of the first itinerary for simple display
-                if 'itineraries' in offer and offer['itineraries']:
-                    itinerary = offer['itineraries'][0]
-                    if 'segments' in itinerary and itinerary['segments']:
-                        segment = itinerary['segments'][0]
-                        
-                        carrier = segment.get('carrierCode', 'Unknown')
-                        flight_data = {
-                            # Use camelCase for frontend consistency
-                            'airline': get_airline_name(carrier),
-                            'airlineCode': carrier,
-                            'flightNumber': segment.get('number', 'Unknown'),
-                            'departureTime': segment.get('departure', {}).get('at', 'N/A'),
-                            'arrivalTime': segment.get('arrival', {}).get('at', 'N/A'),
-                            'departureAirport': segment.get('departure', {}).get('iataCode', origin),
-                            'arrivalAirport': segment.get('arrival', {}).get('iataCode', destination),
-                            'price': float(offer.get('price', {}).get('total', 0)),
-                            'currency': offer.get('price', {}).get('currency', currency),
-                            'duration': itinerary.get('duration', 'N/A')
-                        }
-                        flights.append(flight_data)
-            
-            print(f"Processed {len(flights)} flights")
-            
-            # Deduplicate flights by unique key (airline + flight number + departure time)
-            seen = set()
-            unique_flights = []
-            for flight in flights:
-                key = f"{flight['airline']}{flight['flightNumber']}{flight['departureTime']}"
-                if key not in seen:
-                    seen.add(key)
-                    unique_flights.append(flight)
-            
-            print(f"After deduplication: {len(unique_flights)} unique flights")
-            flights = unique_flights
-        else:
-            print("No flight data found in API response")
+        flights = parse_flight_offers(data, origin, destination, currency)
+        logger.debug("Flight search %s -> %s: %d unique offers", origin, destination, len(flights))
         
-        # Return up to 3 real flights only
-        return flights[:3]
+        return flights if max_results is None else flights[:max_results]
         
+    except quota.QuotaExhausted:
+        raise
     except Exception as e:
-        print(f"Error searching flights: {e}")
+        logger.warning("Error searching flights %s -> %s: %s", origin, destination, e)
         return []
 
+def parse_flight_offers(data, origin, destination, currency, limit=None):
+    """
+    Parse an Amadeus flight-offers response into deduplicated FlightOffer models.
+    
+    Every itinerary and segment is kept. Offers are built in a single pass:
+    each segment becomes one FlightSegment tuple, and stops, durations and
+    the outbound summary fields are accumulated along the way. Offers
+    without a parseable price are dropped. Only the first `limit` offers
+    are considered (None for all).
+    """
+    offers = data.get('data') or []
+    if limit is not None:
+        offers = offers[:limit]
+    
+    flights = []
+    seen = set()
+    for offer in offers:
+        itineraries = []
+        total_minutes = 0
+        outbound_iso = 'N/A'
+        for itinerary in offer.get('itineraries') or ():
+            segments = []
+            # Connections between segments plus technical stops within them
+            stops = -1
+            for segment in itinerary.get('segments') or ():
+                departure = segment.get('departure', {})
+                arrival = segment.get('arrival', {})
+                segment_stops = segment.get('numberOfStops', 0)
+                stops += 1 + segment_stops
+                segments.append(FlightSegment(
+                    segment.get('carrierCode', 'Unknown'),
+                    segment.get('number', 'Unknown'),
+                    departure.get('iataCode'),
+                    departure.get('at', 'N/A'),
+                    arrival.get('iataCode'),
+                    arrival.get('at', 'N/A'),
+                    parse_iso_duration(segment.get('duration')),
+                    segment_stops
+                ))
+            if not segments:
+                continue
+            iso_duration = itinerary.get('duration', 'N/A')
+            if not itineraries:
+                outbound_iso = iso_duration
+            minutes = parse_iso_duration(iso_duration)
+            total_minutes += minutes or 0
+            itineraries.append(Itinerary(minutes, stops, tuple(segments)))
+        if not itineraries:
+            continue
+        price = parse_price(offer.get('price') or {}, currency)
+        if price is None:
+            # An offer without a usable price would rank as free; drop it
+            logger.debug("Skipping unpriced flight offer %s", offer.get('id'))
+            continue
+        itineraries = tuple(itineraries)
+        # Deduplicate on the flown segment chain (FlightOffer.dedup_key)
+        if itineraries in seen:
+            continue
+        seen.add(itineraries)
+        
+        outbound = itineraries[0]
+        first = outbound.segments[0]
+        last = outbound.segments[-1]
+        traveler_prices = tuple(
+            (traveler.get('travelerType', 'ADULT'), price_amount(traveler.get('price') or {}, 0.0))
+            for traveler in offer.get('travelerPricings') or ()
+        )
+        # Positional construction keeps this per-offer loop cheap
+        flights.append(FlightOffer(
+            get_airline_name(first.carrier_code),
+            first.carrier_code,
+            first.number,
+            first.departure_time,
+            last.arrival_time,
+            first.departure_airport or origin,
+            last.arrival_airport or destination,
+            price.amount,
+            price.currency,
+            outbound_iso,
+            itineraries,
+            outbound.stops,
+            total_minutes,
+            traveler_prices
+        ))
+    
+    return flights
+
+def parse_hotel_offers(data, city_name, description, limit=None):
+    """Parse an Amadeus hotel-offers response into HotelOffer models."""
+    hotels = []
+    for hotel_data in (data.get('data') or [])[:limit]:
+        try:
+            hotel_info = hotel_data['hotel']
+            price = parse_price(hotel_data['offers'][0]['price'], 'INR')
+            if price is None:
+                raise ValueError("offer has no price")
+            hotels.append(HotelOffer(
+                name=hotel_info.get('name', f'Hotel {city_name}'),
+                rating=hotel_info.get('rating', 4.0),
+                price=price.amount,
+                currency=price.currency,
+                location=f"{city_name} City Center",
+                description=description,
+                amenities=hotel_info.get('amenities', ['WiFi', 'Restaurant'])
+            ))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.debug("Skipping unparseable hotel offer: %s", e)
+            continue
+    return hotels
+
 def search_hotels(city_name, check_in, check_out, adults=1):
     """Search for hotels - always return only real Amadeus data (no mock)"""
-    print(f"Hotel search - Real data only for: {city_name}")
     hotels = []
     try:
         token = get_access_token()
         if token:
             city_code = get_city_code(city_name, token)
-            print(f"City code for {city_name}: {city_code}")
+            logger.debug("City code for %s: %s", city_name, city_code)
             if city_code:
                 hotel_list_url = f"{AMADEUS_BASE_URL}/v1/reference-data/locations/hotels/by-city"
                 headers = {'Authorization': f'Bearer {token}'}
@@ -170,14 +320,12 @@ def search_hotels(city_name, check_in, check_out, adults=1):
                     'radiusUnit': 'KM',
                     'hotelSource': 'ALL'
                 }
-                print(f"Searching for hotels in {city_name} ({city_code})...")
                 hotel_response = _request_with_retry('GET', hotel_list_url, headers=headers, params=params)
-                print(f"Hotel list API response status: {hotel_response.status_code}")
                 if hotel_response.status_code == 200:
-                    hotel_data = hotel_response.json()
-                    print(f"Hotel list data: {len(hotel_data.get('data', []))} hotels found")
+                    hotel_data = _decode(hotel_response)
+                    logger.debug("Hotel list for %s: %d hotels", city_code, len(hotel_data.get('data') or ()))
                     if 'data' in hotel_data and hotel_data['data']:
-                        hotel_ids = [hotel.get('hotelId') for hotel in hotel_data['data'][:5]]
+                        hotel_ids = [hotel.get('hotelId') for hotel in hotel_data['data'][:AMADEUS_HOTEL_CANDIDATES]]
                         if hotel_ids:
                             url = f"{AMADEUS_BASE_URL}/v3/shopping/hotel-offers"
                             params = {
@@ -187,35 +335,20 @@ def search_hotels(city_name, check_in, check_out, adults=1):
                                 'adults': adults,
                                 'currency': 'INR'
                             }
-                            print(f"Fetching offers for {len(hotel_ids)} hotels...")
                             response = _request_with_retry('GET', url, headers=headers, params=params)
-                            print(f"Hotel offers API response status: {response.status_code}")
                             if response.status_code == 200:
-                                data = response.json()
-                                print(f"Hotel offers data: {len(data.get('data', []))} offers returned")
-                                if 'data' in data:
-                                    for hotel_data in data['data'][:3]:  # Take up to 3 real hotels
-                                        try:
-                                            hotel_info = hotel_data['hotel']
-                                            offer = hotel_data['offers'][0]
-                                            hotel_obj = {
-                                                'name': hotel_info.get('name', f'Hotel {city_name}'),
-                                                'rating': hotel_info.get('rating', 4.0),
-                                                'price': float(offer['price']['total']),
-                                                'currency': offer['price'].get('currency', 'INR'),
-                                                'location': f"{city_name} City Center",
-                                                'description': f"Real hotel in {city_name} from Amadeus API",
-                                                'amenities': hotel_info.get('amenities', ['WiFi', 'Restaurant'])
-                                            }
-                                            hotels.append(hotel_obj)
-                                            print(f"Successfully parsed hotel: {hotel_obj['name']} - ₹{hotel_obj['price']}")
-                                        except (KeyError, ValueError) as e:
-                                            print(f"Error parsing real hotel data: {e}")
-                                            continue
+                                data = _decode(response)
+                                logger.debug("Hotel offers for %s: %d of %d hotels",
+                                             city_code, len(data.get('data') or ()), len(hotel_ids))
+                                hotels.extend(parse_hotel_offers(
+                                    data, city_name, f"Real hotel in {city_name} from Amadeus API"))
                             else:
-                                print(f"Hotel offers API error: {response.status_code} - {response.text[:200]}")
+                                logger.warning("Hotel offers API error: %s - %s", response.status_code, response.text[:200])
                                 # If no data or an error, try a fallback date window (+30 days)
+                                # while the request deadline still leaves room for one more call
                                 try:
+                                    if not deadline.allows(deadline.MIN_CALL_SECONDS):
+                                        raise deadline.DeadlineExceeded("no budget left for alternate dates")
                                     ci_dt = datetime.strptime(check_in, '%Y-%m-%d')
                                     co_dt = datetime.strptime(check_out, '%Y-%m-%d')
                                     alt_ci = (ci_dt + timedelta(days=30)).strftime('%Y-%m-%d')
@@ -223,41 +356,29 @@ def search_hotels(city_name, check_in, check_out, adults=1):
                                     params_alt = dict(params)
                                     params_alt['checkInDate'] = alt_ci
                                     params_alt['checkOutDate'] = alt_co
-                                    print(f"Retrying hotel offers with alternate dates {alt_ci} -> {alt_co}")
+                                    logger.info("Retrying hotel offers with alternate dates %s -> %s", alt_ci, alt_co)
                                     response_alt = _request_with_retry('GET', url, headers=headers, params=params_alt)
                                     if response_alt.status_code == 200:
-                                        data_alt = response_alt.json()
-                                        for hotel_data in data_alt.get('data', [])[:3]:
-                                            try:
-                                                hotel_info = hotel_data['hotel']
-                                                offer = hotel_data['offers'][0]
-                                                hotel_obj = {
-                                                    'name': hotel_info.get('name', f'Hotel {city_name}'),
-                                                    'rating': hotel_info.get('rating', 4.0),
-                                                    'price': float(offer['price']['total']),
-                                                    'currency': offer['price'].get('currency', 'INR'),
-                                                    'location': f"{city_name} City Center",
-                                                    'description': f"Real hotel in {city_name} (alt dates) from Amadeus API",
-                                                    'amenities': hotel_info.get('amenities', ['WiFi', 'Restaurant'])
-                                                }
-                                                hotels.append(hotel_obj)
-                                            except Exception:
-                                                continue
+                                        data_alt = _decode(response_alt)
+                                        hotels.extend(parse_hotel_offers(
+                                            data_alt, city_name, f"Real hotel in {city_name} (alt dates) from Amadeus API"))
+                                except quota.QuotaExhausted:
+                                    raise
                                 except Exception as e:
-                                    print(f"Alternate date retry failed: {e}")
+                                    logger.info("Alternate date retry failed: %s", e)
                     else:
-                        print(f"No hotel IDs found for {city_name}")
+                        logger.info("No hotel IDs found for %s", city_name)
                 else:
-                    print(f"Hotel list API error: {hotel_response.status_code} - {hotel_response.text[:200]}")
+                    logger.warning("Hotel list API error: %s - %s", hotel_response.status_code, hotel_response.text[:200])
             else:
-                print(f"Could not find city code for {city_name}")
+                logger.info("Could not find city code for %s", city_name)
         else:
-            print(f"Could not get access token")
+            logger.warning("Could not get access token")
+    except quota.QuotaExhausted:
+        raise
     except Exception as e:
-        print(f"Error fetching real hotel data: {e}")
-        import traceback
-        traceback.print_exc()
-    print(f"Returning {len(hotels)} real hotels for {city_name}")
+        logger.exception("Error fetching real hotel data for %s", city_name)
+    logger.debug("Returning %d hotels for %s", len(hotels), city_name)
     return hotels
 
 def get_city_code(city_name, token):
@@ -276,7 +397,7 @@ def get_city_code(city_name, token):
     try:
         response = _request_with_retry('GET', url, headers=headers, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = _decode(response)
         
         if 'data' in data and len(data['data']) > 0:
             return data['data'][0]['iataCode']
@@ -284,35 +405,35 @@ def get_city_code(city_name, token):
         return None
         
     except requests.exceptions.RequestException as e:
-        print(f"Error getting city code: {str(e)}")
+        logger.warning("Error getting city code: %s", e)
         return None
 
+AIRLINE_NAMES = {
+    '6E': 'IndiGo',
+    'AI': 'Air India',
+    'SG': 'SpiceJet',
+    'G8': 'GoAir',
+    'I5': 'AirAsia India',
+    'UK': 'Vistara',
+    'EK': 'Emirates',
+    'QR': 'Qatar Airways',
+    'EY': 'Etihad Airways',
+    'TK': 'Turkish Airlines',
+    'LH': 'Lufthansa',
+    'BA': 'British Airways',
+    'AF': 'Air France',
+    'KL': 'KLM',
+    'SQ': 'Singapore Airlines',
+    'TG': 'Thai Airways',
+    'MH': 'Malaysia Airlines',
+    'CX': 'Cathay Pacific',
+    'JL': 'Japan Airlines',
+    'NH': 'ANA'
+}
+
 def get_airline_name(carrier_code):
     """Get airline name from carrier code"""
-    airline_codes = {
-        '6E': 'IndiGo',
-        'AI': 'Air India',
-        'SG': 'SpiceJet',
-        'G8': 'GoAir',
-        'I5': 'AirAsia India',
-        'UK': 'Vistara',
-        'EK': 'Emirates',
-        'QR': 'Qatar Airways',
-        'EY': 'Etihad Airways',
-        'TK': 'Turkish Airlines',
-        'LH': 'Lufthansa',
-        'BA': 'British Airways',
-        'AF': 'Air France',
-        'KL': 'KLM',
-        'SQ': 'Singapore Airlines',
-        'TG': 'Thai Airways',
-        'MH': 'Malaysia Airlines',
-        'CX': 'Cathay Pacific',
-        'JL': 'Japan Airlines',
-        'NH': 'ANA'
-    }
-    
-    return airline_codes.get(carrier_code, f"{carrier_code} Airlines")
+    return AIRLINE_NAMES.get(carrier_code, f"{carrier_code} Airlines")
 
 def search_cities(query):
     """Search for cities/airports"""
@@ -336,7 +457,7 @@ def search_cities(query):
     try:
         response = _request_with_retry('GET', url, headers=headers, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = _decode(response)
         
         locations = []
         if 'data' in data:
@@ -350,13 +471,13 @@ def search_cities(query):
                     }
                     locations.append(location_info)
                 except KeyError as e:
-                    print(f"Error parsing location data: {e}")
+                    logger.debug("Skipping location without %s", e)
                     continue
         
         return locations
         
     except requests.exceptions.RequestException as e:
-        print(f"Error searching cities: {str(e)}")
+        logger.warning("Error searching cities: %s", e)
         return []
 
 def get_flight_status(carrier_code, flight_number, departure_date):
@@ -378,9 +499,12 @@ def get_flight_status(carrier_code, flight_number, departure_date):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        with instrumentation.upstream_call('/v2/schedule/flights') as call, quota.request_slot():
+            response = requests.get(url, headers=headers, params=params,
+                                    timeout=deadline.call_timeout(AMADEUS_TIMEOUT))
+            call.attrs['status'] = response.status_code
         response.raise_for_status()
-        data = response.json()
+        data = _decode(response)
         
         if 'data' in data and len(data['data']) > 0:
             flight = data['data'][0]
@@ -394,5 +518,5 @@ def get_flight_status(carrier_code, flight_number, departure_date):
         return None
         
     except requests.exceptions.RequestException as e:
-        print(f"Error getting flight status: {str(e)}")
+        logger.warning("Error getting flight status: %s", e)
         return None
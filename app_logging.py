@@ -0,0 +1,155 @@
+"""
+Logging setup: level-gated, lazily formatted structured records written
+off the request thread.
+
+Modules log through logging.getLogger(__name__) with %-style arguments, so
+a record below the configured level costs one level check and nothing is
+formatted. Records that pass go onto an in-process queue (QueueHandler);
+a single QueueListener thread formats them - message interpolation
+included - and writes them out, so request threads never block on stderr.
+Pass immutable arguments (str, numbers, tuples): they are formatted later.
+
+High-volume DEBUG lines can be sampled per module: LOG_SAMPLE=
+"amadeus_api=0.1,city_data=0.01" keeps 10% / 1% of those modules' DEBUG
+records (WARNING and above are never sampled).
+
+Environment: LOG_LEVEL (default INFO), LOG_FORMAT (json | text, default
+json), LOG_SAMPLE. configure_logging() is called by main.create_app().
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+import json_codec
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+_handler = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and extra fields."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json_codec.dumps(entry, default=str).decode('utf-8')
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fixed fraction of DEBUG records per logger-name prefix."""
+
+    def __init__(self, rates):
+        super().__init__()
+        # Longest prefix first so 'amadeus_api.x' beats 'amadeus_api'
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self._counters = {}
+
+    def _rate(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return prefix, rate
+        return None, 1.0
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        prefix, rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        # Deterministic 1-in-N: no RNG call per record, exact long-run rate
+        seen = self._counters.get(prefix, 0) + 1
+        self._counters[prefix] = seen
+        return int(seen * rate) != int((seen - 1) * rate)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats in the caller's thread; queue.Queue is
+    in-process, so the record can travel as is.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def parse_sample_rates(spec):
+    """'amadeus_api=0.1,city_data=0.01' -> {'amadeus_api': 0.1, 'city_data': 0.01}."""
+    rates = {}
+    for item in (spec or '').split(','):
+        name, _, rate = item.partition('=')
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(level=None, fmt=None, sample=None, stream=None, force=False):
+    """
+    Route the root logger through a queue to one writer thread (idempotent
+    unless force; restarted in forked workers). level/fmt/sample default to
+    LOG_LEVEL, LOG_FORMAT and LOG_SAMPLE; stream to stderr.
+    """
+    global _listener, _listener_pid, _handler
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            if not force:
+                return _handler
+            _listener.stop()
+        level = level or os.getenv('LOG_LEVEL', 'INFO')
+        fmt = fmt or os.getenv('LOG_FORMAT', 'json')
+        sample = sample if sample is not None else parse_sample_rates(os.getenv('LOG_SAMPLE'))
+
+        output = logging.StreamHandler(stream)
+        if fmt == 'text':
+            output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        else:
+            output.setFormatter(StructuredFormatter())
+
+        root = logging.getLogger()
+        if _handler is not None:
+            root.removeHandler(_handler)
+        _handler = _DeferredQueueHandler(queue.SimpleQueue())
+        if sample:
+            _handler.addFilter(SamplingFilter(sample))
+        root.addHandler(_handler)
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+
+        _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        return _handler
+
+
+def flush_logging():
+    """Block until every queued record has been written."""
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            # stop() drains the queue and joins the writer thread
+            _listener.stop()
+            _listener.start()
+
+
+@atexit.register
+def _stop_listener():
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
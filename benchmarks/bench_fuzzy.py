@@ -0,0 +1,98 @@
+"""
+Benchmark: typo-tolerant location lookups per second.
+
+Builds a synthetic dataset of --locations place names, then resolves
+misspelled queries (one or two edits) three ways: a linear Levenshtein
+scan over every name, a BK-tree search, and the BK-tree behind an
+lru_cache as used by city_data.resolve_city_name, where queries repeat.
+
+Usage:
+    python benchmarks/bench_fuzzy.py [--locations 10000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from functools import lru_cache
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fuzzy_match import BKTree, _bit_parallel_distance, _pattern_masks, max_typos  # noqa: E402
+
+SYLLABLES = ['ba', 'ka', 'lo', 'ma', 'ri', 'to', 'sha', 'ne', 'vi', 'dor', 'pur', 'gar',
+             'ston', 'ville', 'ham', 'ber', 'lin', 'mos', 'ko', 'na', 'del', 'hi', 'sa', 'ra']
+
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(names)
+
+
+def misspell(name, rng):
+    """Apply one or two random edits (substitute, delete, insert or swap)."""
+    chars = list(name)
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(chars) - 1)
+        edit = rng.choice('sdit')
+        if edit == 's':
+            chars[position] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        elif edit == 'd':
+            del chars[position]
+        elif edit == 'i':
+            chars.insert(position, rng.choice('abcdefghijklmnopqrstuvwxyz'))
+        else:
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return ''.join(chars)
+
+
+def linear_lookup(names, query):
+    """Baseline: compare the query with every name (same distance kernel as the tree)."""
+    masks, length = _pattern_masks(query), len(query)
+    distance, best = min((_bit_parallel_distance(masks, length, name), name) for name in names)
+    return best if distance <= max_typos(query) else None
+
+
+def _rate(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--locations', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = make_names(args.locations, rng)
+    queries = [misspell(rng.choice(names), rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    tree = BKTree((name, name) for name in names)
+    build_s = time.perf_counter() - start
+
+    def tree_lookup(query):
+        matches = tree.search(query, max_typos(query))
+        return matches[0][2] if matches else None
+
+    cached_lookup = lru_cache(maxsize=4096)(tree_lookup)
+    # Real traffic repeats the same handful of cities; replay each query 10x
+    repeated = queries * 10
+    rng.shuffle(repeated)
+
+    linear_queries = queries[:max(1, args.queries // 10)]
+    print(f"dataset: {len(names)} locations, BK-tree built in {build_s * 1000:.0f} ms")
+    print(f"{'strategy':<18} {'lookups/s':>12}")
+    print(f"{'linear scan':<18} {_rate(lambda q: linear_lookup(names, q), linear_queries):>12,.0f}")
+    print(f"{'bk-tree':<18} {_rate(tree_lookup, queries):>12,.0f}")
+    print(f"{'bk-tree + memo':<18} {_rate(cached_lookup, repeated):>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
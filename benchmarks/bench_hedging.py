@@ -0,0 +1,64 @@
+"""
+Benchmark: tail latency of simulated upstream GETs with and without hedging.
+
+Each simulated call takes --fast seconds, except a --tail fraction that
+take --slow seconds (the occasional stalled Amadeus response). Reports
+p50/p95/p99 as seen by the caller and the extra calls spent by hedging.
+
+Usage:
+    python benchmarks/bench_hedging.py [--calls 400] [--tail 0.03] [--budget 0.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hedging import HedgePolicy  # noqa: E402
+from histogram import LatencyHistogram  # noqa: E402
+
+
+def _run(args, policy):
+    rng = random.Random(42)
+    latencies = LatencyHistogram()
+    sent = 0
+
+    def send():
+        nonlocal sent
+        sent += 1
+        time.sleep(args.slow if rng.random() < args.tail else args.fast * rng.uniform(0.8, 1.2))
+        return 'ok'
+
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        if policy is None:
+            send()
+        else:
+            policy.call('/v3/shopping/hotel-offers', send)
+        latencies.record(time.perf_counter() - start)
+    return latencies, sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--fast', type=float, default=0.02)
+    parser.add_argument('--slow', type=float, default=0.5)
+    parser.add_argument('--tail', type=float, default=0.03)
+    parser.add_argument('--budget', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{args.calls} calls, {args.tail:.0%} take {args.slow}s, others ~{args.fast}s")
+    print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'extra calls':>12}")
+    for name, policy in (('plain', None), ('hedged', HedgePolicy(budget=args.budget))):
+        latencies, sent = _run(args, policy)
+        extra = (sent - args.calls) / args.calls
+        print(f"{name:<8} {latencies.percentile(50) * 1e3:>8.1f} {latencies.percentile(95) * 1e3:>8.1f} "
+              f"{latencies.percentile(99) * 1e3:>8.1f} {extra:>11.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: JSON decode/encode throughput per codec backend.
+
+Decodes a recorded flight-offers payload (expanded to --offers offers),
+parses it into FlightOffer models and encodes the response, for every
+installed backend. Reports decode throughput in MB/s and CPU time per
+request.
+
+Usage:
+    python benchmarks/bench_json.py [--offers 250] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json_codec  # noqa: E402
+from amadeus_api import parse_flight_offers  # noqa: E402
+from bench_offers import load_payload  # noqa: E402
+
+
+def _cpu_per_call(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--offers', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    raw = json.dumps(load_payload(args.offers)).encode('utf-8')
+    print(f"payload: {args.offers} offers, {len(raw) / 1024:.1f} KiB, {args.repeat} runs")
+    print(f"{'backend':<8} {'decode MB/s':>12} {'request CPU ms':>15}")
+
+    for name in ('json', 'ujson', 'orjson'):
+        try:
+            loads, dumps = json_codec._load_backend(name)
+        except ImportError:
+            print(f"{name:<8} (not installed)")
+            continue
+
+        def request():
+            offers = parse_flight_offers(loads(raw), 'DEL', 'BOM', 'INR', limit=None)
+            return dumps([offer.to_dict() for offer in offers[:3]])
+
+        decode_s = _cpu_per_call(lambda: loads(raw), args.repeat)
+        request_s = _cpu_per_call(request, args.repeat)
+        print(f"{name:<8} {len(raw) / decode_s / 1e6:12.1f} {request_s * 1e3:15.3f}")
+
+
+if __name__ == '__main__':
+    main()
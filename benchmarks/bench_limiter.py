@@ -0,0 +1,85 @@
+"""
+Benchmark: per-check overhead of rate-limit storage backends.
+
+Times Flask-Limiter's hot path (one hit() per limit per request) against
+memory://, the shared SQLite storage (limiter_storage.py) and, when
+--redis is given and the redis package is installed, Redis. Reports
+microseconds per check for the moving- and fixed-window strategies, with
+one process and with --processes processes hammering the same file.
+
+Usage:
+    python benchmarks/bench_limiter.py [--checks 5000] [--processes 4] [--redis redis://localhost:6379]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter  # noqa: E402
+
+import limiter_storage  # noqa: E402,F401  (registers sqlite://)
+
+# Large enough that checks keep succeeding (the success path does the write)
+ITEM = parse('1000000 per hour')
+
+
+def _time_checks(uri, strategy, checks, client='bench'):
+    limiter = strategy(storage_from_string(uri))
+    limiter.storage.reset()
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(ITEM, f'{client}-{i % 50}')
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def _worker(uri, checks, client, results):
+    results.put(_time_checks(uri, MovingWindowRateLimiter, checks, client))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--checks', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--redis', default=None)
+    args = parser.parse_args()
+
+    sqlite_uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'limits.db')}"
+    backends = [('memory', 'memory://'), ('sqlite', sqlite_uri)]
+    if args.redis:
+        backends.append(('redis', args.redis))
+
+    print(f"{args.checks} checks per run")
+    print(f"{'backend':<8} {'moving us/check':>16} {'fixed us/check':>15}")
+    for name, uri in backends:
+        try:
+            moving = _time_checks(uri, MovingWindowRateLimiter, args.checks)
+            fixed = _time_checks(uri, FixedWindowRateLimiter, args.checks)
+        except Exception as e:  # e.g. redis package missing or server down
+            print(f"{name:<8} unavailable: {e}")
+            continue
+        print(f"{name:<8} {moving:>16.1f} {fixed:>15.1f}")
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=_worker, args=(sqlite_uri, args.checks, f'p{i}', results))
+               for i in range(args.processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    per_check = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    print(f"sqlite, {args.processes} processes: {sum(per_check) / len(per_check):.1f} us/check per process, "
+          f"{args.processes * args.checks / elapsed:,.0f} checks/s total")
+
+
+if __name__ == '__main__':
+    main()
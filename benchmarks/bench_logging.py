@@ -0,0 +1,153 @@
+"""
+Benchmark: /search_hotels throughput under the old print-style logging vs
+queued INFO logging (app_logging.py).
+
+Requests go through the real routes and amadeus_api with the HTTP layer
+answered in-process, so logging is a visible share of the work. Modes:
+
+    sync-debug   every log line (the former prints, now DEBUG) formatted and
+                 written synchronously on the request thread - what print did
+    sync-info    INFO and above, still written on the request thread
+    queued-info  INFO and above through QueueHandler/QueueListener (default setup)
+
+Every mode writes the same JSON records to a temporary file; the best of
+--repeat runs is reported.
+
+Usage:
+    python benchmarks/bench_logging.py [--requests 2000] [--threads 8] [--sink-latency 0.001]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+os.environ.setdefault('SECRET_KEY', 'bench')
+os.environ.setdefault('RATELIMIT_STORAGE_URI', 'memory://')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import amadeus_api  # noqa: E402
+import app_logging  # noqa: E402
+from main import create_app  # noqa: E402
+from upstream import UpstreamClient  # noqa: E402
+
+
+class _Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode('utf-8')
+        self.text = ''
+
+    def raise_for_status(self):
+        pass
+
+
+_HOTELS = {'data': [{'hotel': {'name': f'Hotel {i}', 'rating': 4},
+                     'offers': [{'price': {'total': str(5000 + i), 'currency': 'INR'}}]}
+                    for i in range(20)]}
+
+
+def _fake_get(url, **kwargs):
+    path = urlsplit(url).path
+    if path.endswith('/locations/cities'):
+        return _Response({'data': [{'iataCode': 'PAR'}]})
+    if path.endswith('/hotels/by-city'):
+        return _Response({'data': [{'hotelId': f'H{i}'} for i in range(20)]})
+    return _Response(_HOTELS)
+
+
+def _fake_post(url, **kwargs):
+    return _Response({'access_token': 'token'})
+
+
+class _SlowSink:
+    """File whose writes block for a fixed time, like a pipe to a busy log collector."""
+
+    def __init__(self, path, latency):
+        self._file = open(path, 'a')
+        self._latency = latency
+
+    def write(self, text):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+
+def _set_mode(mode, path, latency):
+    root = logging.getLogger()
+    root.handlers.clear()
+    if mode == 'queued-info':
+        app_logging.configure_logging(level='INFO', stream=_SlowSink(path, latency), force=True)
+        return
+    handler = logging.StreamHandler(_SlowSink(path, latency))
+    handler.setFormatter(app_logging.StructuredFormatter())
+    root.addHandler(handler)
+    root.setLevel(logging.DEBUG if mode == 'sync-debug' else logging.INFO)
+
+
+def _run(client, requests_total, threads):
+    check_in = date.today() + timedelta(days=30)
+    form = {'destination': 'Paris, France', 'startDate': check_in.isoformat(),
+            'endDate': (check_in + timedelta(days=2)).isoformat()}
+    per_thread = requests_total // threads
+
+    def worker():
+        for _ in range(per_thread):
+            client.post('/search_hotels', data=form)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    # Queued records still being written don't hold up requests
+    app_logging.flush_logging()
+    return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sink-latency', type=float, default=0.0,
+                        help='seconds each log write blocks (e.g. 0.001 for a slow pipe)')
+    args = parser.parse_args()
+
+    amadeus_api.requests.get = _fake_get
+    amadeus_api.requests.post = _fake_post
+    app = create_app({'TESTING': True, 'RATELIMIT_ENABLED': False},
+                     upstream=UpstreamClient(gemini_api_key=''))
+    client = app.test_client()
+    path = os.path.join(tempfile.mkdtemp(), 'bench.log')
+
+    print(f"{args.requests} /search_hotels requests on {args.threads} threads, "
+          f"{args.sink_latency * 1e3:.1f}ms per log write")
+    print(f"{'mode':<12} {'req/s':>8} {'log lines':>10}")
+    for mode in ('sync-debug', 'sync-info', 'queued-info'):
+        open(path, 'w').close()
+        _set_mode(mode, path, args.sink_latency)
+        _run(client, args.threads * 10, args.threads)  # warm up
+        throughput = 0.0
+        for _ in range(args.repeat):
+            open(path, 'w').close()
+            throughput = max(throughput, _run(client, args.requests, args.threads))
+        with open(path) as log_file:
+            lines = sum(1 for _ in log_file)
+        print(f"{mode:<12} {throughput:>8.0f} {lines:>10}")
+
+
+if __name__ == '__main__':
+    main()
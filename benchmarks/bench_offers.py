@@ -0,0 +1,106 @@
+"""
+Benchmark: parse + dedup + serialize of a 250-offer flight-offers payload.
+
+Compares the legacy per-flight dict path (string dedup keys and a regex
+re-parse of prices in the route) with the FlightOffer model path.
+
+Usage:
+    python benchmarks/bench_offers.py [--offers 250] [--repeat 200]
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from amadeus_api import get_airline_name, parse_flight_offers  # noqa: E402
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'flight_offers.json')
+
+
+def load_payload(count):
+    """Expand the recorded fixture to `count` offers, with ~20% duplicates."""
+    with open(FIXTURE_PATH) as f:
+        recorded = json.load(f)
+    templates = recorded['data']
+    offers = []
+    for i in range(count):
+        offer = copy.deepcopy(templates[i % len(templates)])
+        # Every fifth offer repeats an earlier flight so dedup has work to do
+        variant = i - 1 if i % 5 == 4 else i
+        for itinerary in offer['itineraries']:
+            for segment in itinerary['segments']:
+                segment['number'] = str(100 + variant)
+                at = segment['departure']['at']
+                segment['departure']['at'] = f"{at[:11]}{variant % 24:02d}{at[13:]}"
+        offer['id'] = str(i + 1)
+        offers.append(offer)
+    return {'meta': {'count': count}, 'data': offers}
+
+
+def legacy_pipeline(data):
+    """The pre-model implementation: dicts, string keys and regex re-parse."""
+    flights = []
+    for offer in data['data']:
+        itinerary = offer['itineraries'][0]
+        segment = itinerary['segments'][0]
+        carrier = segment.get('carrierCode', 'Unknown')
+        flights.append({
+            'airline': get_airline_name(carrier),
+            'airlineCode': carrier,
+            'flightNumber': segment.get('number', 'Unknown'),
+            'departureTime': segment.get('departure', {}).get('at', 'N/A'),
+            'arrivalTime': segment.get('arrival', {}).get('at', 'N/A'),
+            'departureAirport': segment.get('departure', {}).get('iataCode'),
+            'arrivalAirport': segment.get('arrival', {}).get('iataCode'),
+            'price': float(offer.get('price', {}).get('total', 0)),
+            'currency': offer.get('price', {}).get('currency', 'INR'),
+            'duration': itinerary.get('duration', 'N/A')
+        })
+    seen = set()
+    unique = []
+    for flight in flights:
+        key = f"{flight['airline']}{flight['flightNumber']}{flight['departureTime']}"
+        if key not in seen:
+            seen.add(key)
+            unique.append(flight)
+    for flight in unique:
+        price_val = flight['price']
+        if isinstance(price_val, str):
+            match = re.search(r'[\d.]+', str(price_val).replace('₹', '').replace(',', ''))
+            flight['price'] = float(match.group()) if match else 0
+        if 'currency' not in flight:
+            flight['currency'] = 'INR'
+    return json.dumps(unique)
+
+
+def model_pipeline(data):
+    """Parse once into full FlightOffer models, dedup by tuple key, serialize."""
+    offers = parse_flight_offers(data, 'DEL', 'BOM', 'INR', limit=None)
+    return json.dumps([offer.to_dict() for offer in offers])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--offers', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payload = load_payload(args.offers)
+    legacy = json.loads(legacy_pipeline(payload))
+    model = json.loads(model_pipeline(payload))
+    assert [f['price'] for f in legacy] == [f['price'] for f in model]
+
+    print(f"parse+dedup+serialize, {args.offers} offers, {args.repeat} runs")
+    for name, fn in (('legacy dicts', legacy_pipeline), ('FlightOffer', model_pipeline)):
+        best = min(timeit.repeat(lambda: fn(payload), number=args.repeat, repeat=5)) / args.repeat
+        print(f"  {name:<14} {best * 1e3:8.3f} ms/payload  {args.offers / best:12,.0f} offers/s")
+
+
+if __name__ == '__main__':
+    main()
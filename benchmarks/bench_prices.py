@@ -0,0 +1,73 @@
+"""
+Benchmark: price normalization, legacy inline regex vs prices.py.
+
+The legacy block (formerly in main._collect_prices_for_date) stripped '₹'
+and ',' and ran re.search on str(price) whenever a price was a string,
+with the pattern looked up in re's cache each call. prices.py has a type
+fast path for numbers and plain decimal strings and one precompiled
+pattern for display strings. Inputs:
+
+    floats     what amadeus_api returns (the common case)
+    decimals   Amadeus 'total' strings ("1234.50")
+    display    "₹5,000", "Rs. 4,500/night", "USD 120.00", "€1.234,56", ...
+
+Usage:
+    python benchmarks/bench_prices.py [--values 10000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prices import parse_price, price_amount  # noqa: E402
+
+DISPLAY_FORMATS = ('₹{:,.0f}', 'Rs. {:,.0f}/night', 'USD {:.2f}', '{:.2f} EUR', '${:,.2f}', 'INR {:,.0f}')
+
+
+def legacy_amount(price):
+    import re
+    if isinstance(price, str):
+        price_match = re.search(r'[\d.]+', str(price).replace('₹', '').replace(',', ''))
+        if price_match:
+            try:
+                return float(price_match.group())
+            except ValueError:  # 'Rs. 4,500' matches the lone '.' - the route raised here
+                return None
+        return None
+    return price
+
+
+def make_values(kind, count, seed=0):
+    rng = random.Random(seed)
+    amounts = [round(rng.uniform(800, 60000), 2) for _ in range(count)]
+    if kind == 'floats':
+        return amounts
+    if kind == 'decimals':
+        return [f'{amount:.2f}' for amount in amounts]
+    return [rng.choice(DISPLAY_FORMATS).format(amount) for amount in amounts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--values', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.values} prices per run, best of {args.repeat}")
+    print(f"{'input':<10} {'legacy regex':>14} {'price_amount':>14} {'parse_price':>14}   (ns/value)")
+    for kind in ('floats', 'decimals', 'display'):
+        values = make_values(kind, args.values)
+        timings = []
+        for fn in (legacy_amount, price_amount, parse_price):
+            best = min(timeit.repeat(lambda: [fn(value) for value in values], number=1, repeat=args.repeat))
+            timings.append(best / len(values) * 1e9)
+        print(f"{kind:<10} {timings[0]:>14.0f} {timings[1]:>14.0f} {timings[2]:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
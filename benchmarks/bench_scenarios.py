@@ -0,0 +1,158 @@
+"""
+Benchmark: end-to-end route scenarios against the local stub upstreams.
+
+Runs the real app in-process (one test client per thread) with Amadeus and
+Gemini served by stub_server.py, and reports throughput and p50/p95/p99
+per route for each scenario:
+
+    cold_search       POST /search, every request a new search (cache misses)
+    warm_min_prices   POST /get_min_prices over a few primed destinations (cache hits)
+    chatbot_burst     a burst of concurrent general chatbot questions (Gemini)
+
+Usage:
+    python benchmarks/bench_scenarios.py [--scenario all] [--requests 200] [--concurrency 8]
+        [--latency 0.08] [--jitter 0.04] [--rate-429 0.0] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+WARM_DESTINATIONS = ('Paris, France', 'Goa, India', 'Tokyo, Japan', 'Dubai, UAE', 'London, UK')
+
+
+def configure_environment(server):
+    """Point the app at the stub server; must run before main is imported."""
+    os.environ['AMADEUS_BASE_URL'] = server.url
+    os.environ['GEMINI_BASE_URL'] = server.gemini_url
+    for name, value in (('AMADEUS_CLIENT_ID', 'bench'), ('AMADEUS_CLIENT_SECRET', 'bench'),
+                        ('GEMINI_API_KEY', 'bench'), ('SECRET_KEY', 'bench'),
+                        ('RATELIMIT_STORAGE_URI', 'memory://'), ('CACHE_BACKEND', 'memory'),
+                        ('LOG_LEVEL', 'WARNING'), ('REQUEST_LOG', '0')):
+        os.environ.setdefault(name, value)
+
+
+def build_app():
+    from cache_backends import MemoryCache
+    from main import create_app
+    return create_app({'TESTING': True, 'RATELIMIT_ENABLED': False}, cache=MemoryCache())
+
+
+def cold_search(i):
+    departure = date.today() + timedelta(days=14 + i)
+    return '/search', {
+        'startPointCode': 'DEL', 'destinationCode': 'BOM', 'destination': 'Mumbai, India',
+        'startDate': departure.isoformat(), 'endDate': (departure + timedelta(days=3)).isoformat(),
+        'adults': '1',
+    }
+
+
+def warm_min_prices(i):
+    return '/get_min_prices', {'startPoint': 'Delhi, India',
+                               'destination': WARM_DESTINATIONS[i % len(WARM_DESTINATIONS)]}
+
+
+def chatbot_burst(i):
+    return '/chatbot', {'message': f'Plan a relaxed 3 day itinerary in Goa (variant {i})',
+                        'destination': 'Goa, India'}
+
+
+SCENARIOS = {
+    'cold_search': cold_search,
+    'warm_min_prices': warm_min_prices,
+    'chatbot_burst': chatbot_burst,
+}
+
+
+def run_requests(app, make_request, total, concurrency):
+    """Issue total requests on concurrency threads; per-route latency and status counts."""
+    local = threading.local()
+    histograms = {}
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def one(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        path, form = make_request(i)
+        started = time.perf_counter()
+        response = client.post(path, data=form)
+        elapsed = time.perf_counter() - started
+        with lock:
+            histograms.setdefault(path, LatencyHistogram()).record(elapsed)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    return summarize(histograms, statuses, elapsed)
+
+
+def summarize(histograms, statuses, elapsed):
+    routes = {}
+    for path, histogram in histograms.items():
+        routes[path] = {
+            'requests': histogram.count,
+            'throughput_rps': round(histogram.count / elapsed, 1),
+            **{f'p{pct}_ms': round(histogram.percentile(pct) * 1e3, 1) for pct in (50, 95, 99)},
+        }
+    return {'elapsed_s': round(elapsed, 3), 'statuses': dict(statuses), 'routes': routes}
+
+
+def run_scenario(name, app, server, requests_total, concurrency):
+    if name == 'warm_min_prices':
+        # Prime the min-price cache so the timed run measures cache hits
+        run_requests(app, warm_min_prices, len(WARM_DESTINATIONS), len(WARM_DESTINATIONS))
+    server.reset_counts()
+    result = run_requests(app, SCENARIOS[name], requests_total, concurrency)
+    result['upstream_calls'] = dict(server.counts)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scenario', choices=['all', *SCENARIOS], default='all')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.08)
+    parser.add_argument('--jitter', type=float, default=0.04)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+    results = {'config': vars(args), 'scenarios': {}}
+    with StubServer(latency=args.latency, jitter=args.jitter, rate_429=args.rate_429) as server:
+        configure_environment(server)
+        print(f"stub upstream {server.url}: {args.latency * 1e3:.0f}ms +/- {args.jitter * 1e3:.0f}ms, "
+              f"{args.rate_429:.0%} 429s; {args.requests} requests x {args.concurrency} threads")
+        print(f"{'scenario':<16} {'route':<16} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  upstream calls")
+        for name in names:
+            result = run_scenario(name, build_app(), server, args.requests, args.concurrency)
+            results['scenarios'][name] = result
+            calls = sum(result['upstream_calls'].values())
+            for path, stats in result['routes'].items():
+                print(f"{name:<16} {path:<16} {stats['throughput_rps']:>7.1f} {stats['p50_ms']:>8.1f} "
+                      f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}  {calls}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
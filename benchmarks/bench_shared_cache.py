@@ -0,0 +1,81 @@
+"""
+Benchmark: upstream fetches and get() latency, per-process vs shared cache.
+
+Simulates --processes workers each serving --requests lookups over --keys
+popular destinations, filling the cache on a miss as the app does. With
+MemoryCache every worker warms its own copy, so upstream fetches grow with
+the worker count; with SharedMemoryCache one fill serves every worker.
+
+Usage:
+    python benchmarks/bench_shared_cache.py [--processes 4] [--requests 20000] [--keys 200]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache_backends import MemoryCache  # noqa: E402
+from offers import HotelOffer  # noqa: E402
+from shared_cache import SharedMemoryCache  # noqa: E402
+
+_MISSING = object()
+
+
+def _fake_hotels(key):
+    return [HotelOffer(f'Hotel {key} {i}', 4.0, 5000.0 + i, 'INR', 'City', 'Main Street')
+            for i in range(10)]
+
+
+def _worker(backend, path, requests, keys, seed, results):
+    cache = MemoryCache() if backend == 'memory' else SharedMemoryCache(path)
+    rng = random.Random(seed)
+    fetches = 0
+    get_seconds = 0.0
+    for _ in range(requests):
+        key = ('hotels', rng.randrange(keys))
+        start = time.perf_counter()
+        value = cache.get(key, _MISSING)
+        get_seconds += time.perf_counter() - start
+        if value is _MISSING:
+            fetches += 1
+            cache.set(key, _fake_hotels(key[1]), 3600)
+    results.put((fetches, get_seconds / requests * 1e6))
+
+
+def _run(backend, path, args):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=_worker, args=(backend, path, args.requests, args.keys, i, results))
+               for i in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    fetches = sum(f for f, _ in outcomes)
+    return fetches, sum(us for _, us in outcomes) / len(outcomes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--keys', type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'cache.mmap')
+    print(f"{args.processes} processes x {args.requests} lookups over {args.keys} keys")
+    print(f"{'backend':<8} {'upstream fetches':>17} {'us/get':>8}")
+    for backend in ('memory', 'shared'):
+        fetches, per_get = _run(backend, path, args)
+        print(f"{backend:<8} {fetches:>17} {per_get:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
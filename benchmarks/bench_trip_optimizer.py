@@ -0,0 +1,78 @@
+"""
+Benchmark: flight + hotel combinations, full cross product vs trip_optimizer.py.
+
+The naive way scores every flight x hotel pair, filters by budget and sorts
+(F x H work per request). trip_optimizer.py sorts each side once and walks
+a heap frontier only as far as the k options need. Offer sets are random,
+with the budget set so that about --fit of all pairs are affordable.
+
+Usage:
+    python benchmarks/bench_trip_optimizer.py [--sizes 50,200,500] [--k 5] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from offers import FlightOffer, HotelOffer  # noqa: E402
+from ranking import flight_scorer, hotel_scorer  # noqa: E402
+from trip_optimizer import best_combinations, cheapest_combinations  # noqa: E402
+
+NIGHTS = 3
+
+
+def make_offers(size, seed=0):
+    rng = random.Random(seed)
+    flights = [FlightOffer('Bench Air', 'BA', str(i), '2030-01-10T10:00:00', None, 'DEL', 'GOI',
+                           round(rng.uniform(3000, 30000), 2), 'INR', None, stops=rng.randrange(3),
+                           total_duration_minutes=rng.randrange(60, 900)) for i in range(size)]
+    hotels = [HotelOffer(f'Hotel {i}', rng.choice([2.0, 3.0, 4.0, 4.5, 5.0]), round(rng.uniform(800, 15000), 2),
+                         'INR', 'Goa', '') for i in range(size)]
+    return flights, hotels
+
+
+def budget_for(flights, hotels, fit):
+    totals = sorted(f.price + h.price * NIGHTS for f in flights for h in hotels)
+    return totals[int(fit * (len(totals) - 1))]
+
+
+def naive_cheapest(flights, hotels, budget, k):
+    pairs = [(f.price + h.price * NIGHTS, f, h) for f in flights for h in hotels]
+    return sorted((pair for pair in pairs if pair[0] <= budget), key=lambda pair: pair[0])[:k]
+
+
+def naive_best(flights, hotels, budget, k):
+    flight_score, hotel_score = flight_scorer(flights), hotel_scorer(hotels)
+    pairs = [(flight_score(f) + hotel_score(h), f, h) for f in flights for h in hotels
+             if f.price + h.price * NIGHTS <= budget]
+    return sorted(pairs, key=lambda pair: pair[0])[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='50,200,500', help='offers per side, comma-separated')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--fit', type=float, default=0.3, help='fraction of pairs within budget')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"k={args.k}, {NIGHTS} nights, {args.fit:.0%} of pairs within budget, best of {args.repeat} (ms)")
+    print(f"{'offers':>7} {'naive cheap':>12} {'heap cheap':>11} {'naive best':>11} {'heap best':>10}")
+    for size in (int(size) for size in args.sizes.split(',')):
+        flights, hotels = make_offers(size)
+        budget = budget_for(flights, hotels, args.fit)
+        row = []
+        for fn in (lambda: naive_cheapest(flights, hotels, budget, args.k),
+                   lambda: cheapest_combinations(flights, hotels, NIGHTS, budget, args.k),
+                   lambda: naive_best(flights, hotels, budget, args.k),
+                   lambda: best_combinations(flights, hotels, NIGHTS, budget, args.k)):
+            row.append(min(timeit.repeat(fn, number=1, repeat=args.repeat)) * 1e3)
+        print(f"{size:>7} {row[0]:>12.2f} {row[1]:>11.2f} {row[2]:>11.2f} {row[3]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Load generator: sweep concurrent users against the app and find the throughput knee.
+
+Each virtual user is a closed loop: pick an action from the user mix, send
+it, wait --think seconds, repeat until the level's --duration is up. Users
+drive the app either in-process (one Flask test client each) or over HTTP
+against waitress on a local port; Amadeus and Gemini are the stub upstreams
+(stub_server.py), so results depend only on this code and the stub latency.
+
+Actions (weights set by --mix):
+    autocomplete   POST /search_cities with a short city prefix
+    min_price      POST /get_min_prices for a popular destination
+    search         POST /search over 5 destinations x 20 dates (some cache hits)
+    chatbot        POST /chatbot with a general question
+
+For every concurrency level the JSON output has throughput, error counts
+and p50/p95/p99 per action, and "knee_concurrency" is the lowest level
+reaching 90% of peak throughput - a shift between runs flags a regression
+in the threading or caching layers.
+
+Usage:
+    python benchmarks/loadgen.py [--transport inprocess|http] [--concurrency 1,2,4,8,16,32]
+        [--duration 10] [--mix autocomplete=40,min_price=30,search=20,chatbot=10]
+        [--latency 0.08] [--jitter 0.04] [--output loadgen.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_scenarios import build_app, configure_environment  # noqa: E402
+from histogram import LatencyHistogram  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+DEFAULT_MIX = 'autocomplete=40,min_price=30,search=20,chatbot=10'
+KNEE_FRACTION = 0.9
+
+PREFIXES = ('Par', 'Lon', 'Tok', 'Dub', 'Mum', 'New', 'Sin', 'Goa', 'Ban', 'Rom')
+MIN_PRICE_DESTINATIONS = ('Paris, France', 'Goa, India', 'Tokyo, Japan', 'Dubai, UAE', 'London, UK')
+SEARCH_DESTINATIONS = (('BOM', 'Mumbai, India'), ('GOI', 'Goa, India'), ('DXB', 'Dubai, UAE'),
+                       ('CDG', 'Paris, France'), ('LHR', 'London, UK'))
+
+
+def autocomplete(rng):
+    return '/search_cities', {'query': rng.choice(PREFIXES)}
+
+
+def min_price(rng):
+    return '/get_min_prices', {'startPoint': 'Delhi, India', 'destination': rng.choice(MIN_PRICE_DESTINATIONS)}
+
+
+def search(rng):
+    code, destination = rng.choice(SEARCH_DESTINATIONS)
+    departure = date.today() + timedelta(days=14 + rng.randrange(20))
+    return '/search', {
+        'startPointCode': 'DEL', 'destinationCode': code, 'destination': destination,
+        'startDate': departure.isoformat(), 'endDate': (departure + timedelta(days=3)).isoformat(),
+        'adults': '1',
+    }
+
+
+def chatbot(rng):
+    return '/chatbot', {'message': 'What should I pack for a week in Goa?', 'destination': 'Goa, India'}
+
+
+ACTIONS = {
+    'autocomplete': autocomplete,
+    'min_price': min_price,
+    'search': search,
+    'chatbot': chatbot,
+}
+
+
+def parse_mix(spec):
+    """'autocomplete=3,search=1' -> {'autocomplete': 3.0, 'search': 1.0}; unknown actions raise ValueError."""
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if not name:
+            continue
+        if name not in ACTIONS:
+            raise ValueError(f"unknown action {name!r} (choose from {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the user mix needs at least one action with a positive weight")
+    return mix
+
+
+class InProcessTransport:
+    """Calls the app through one Flask test client per user."""
+
+    name = 'inprocess'
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self):
+        client = self.app.test_client()
+        return lambda path, form: client.post(path, data=form).status_code
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Serves the app with waitress on a local port; one requests.Session per user."""
+
+    name = 'http'
+
+    def __init__(self, app, threads=8):
+        from waitress.server import create_server
+        # Past the knee every request logs "Task queue depth is N"; the table shows it anyway
+        logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+        self._server = create_server(app, host='127.0.0.1', port=0, threads=threads)
+        self.url = f'http://127.0.0.1:{self._server.effective_port}'
+        self._thread = threading.Thread(target=self._server.run, name='loadgen-waitress', daemon=True)
+        self._thread.start()
+
+    def client(self):
+        session = requests.Session()
+        return lambda path, form: session.post(self.url + path, data=form, timeout=60).status_code
+
+    def close(self):
+        self._server.close()
+
+
+def run_level(transport, mix, users, duration, think=0.0, seed=0):
+    """Run `users` closed-loop users for `duration` seconds; one result row."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    histograms = {name: LatencyHistogram() for name in names}
+    statuses = {name: Counter() for name in names}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def user(index):
+        rng = random.Random(seed * 1000 + index)
+        send = transport.client()
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            path, form = ACTIONS[name](rng)
+            started = time.perf_counter()
+            try:
+                status = send(path, form)
+            except requests.exceptions.RequestException:
+                status = 'error'
+            elapsed = time.perf_counter() - started
+            with lock:
+                histograms[name].record(elapsed)
+                statuses[name][status] += 1
+            if think:
+                time.sleep(think)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), name=f'loadgen-user-{i}') for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    actions = {}
+    for name in names:
+        histogram = histograms[name]
+        if not histogram.count:
+            continue
+        ok = sum(count for status, count in statuses[name].items() if status == 200)
+        actions[name] = {
+            'requests': histogram.count,
+            'errors': histogram.count - ok,
+            **{f'p{pct}_ms': round(histogram.percentile(pct) * 1e3, 1) for pct in (50, 95, 99)},
+        }
+    total = sum(h.count for h in histograms.values())
+    return {
+        'concurrency': users,
+        'elapsed_s': round(elapsed, 3),
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1),
+        'errors': sum(action['errors'] for action in actions.values()),
+        'actions': actions,
+    }
+
+
+def find_knee(levels, fraction=KNEE_FRACTION):
+    """Lowest concurrency whose throughput reaches `fraction` of the peak."""
+    if not levels:
+        return None
+    peak = max(level['throughput_rps'] for level in levels)
+    for level in sorted(levels, key=lambda level: level['concurrency']):
+        if level['throughput_rps'] >= fraction * peak:
+            return level['concurrency']
+
+
+def sweep(transport, mix, concurrency_levels, duration, think=0.0, on_level=None):
+    levels = []
+    for seed, users in enumerate(concurrency_levels):
+        level = run_level(transport, mix, users, duration, think, seed)
+        levels.append(level)
+        if on_level:
+            on_level(level)
+    return {'levels': levels, 'knee_concurrency': find_knee(levels)}
+
+
+def _print_level(level):
+    p95 = '  '.join(f"{name} {action['p95_ms']:.0f}" for name, action in level['actions'].items())
+    print(f"{level['concurrency']:>6} {level['throughput_rps']:>8.1f} {level['errors']:>7}  {p95}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--transport', choices=['inprocess', 'http'], default='inprocess')
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32', help='comma-separated user counts')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per level')
+    parser.add_argument('--think', type=float, default=0.0, help='seconds each user waits between requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='action=weight,...')
+    parser.add_argument('--server-threads', type=int, default=8, help='waitress threads (http transport)')
+    parser.add_argument('--latency', type=float, default=0.08)
+    parser.add_argument('--jitter', type=float, default=0.04)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+
+    with StubServer(latency=args.latency, jitter=args.jitter, rate_429=args.rate_429) as server:
+        configure_environment(server)
+        app = build_app()
+        if args.transport == 'http':
+            transport = HttpTransport(app, threads=args.server_threads)
+        else:
+            transport = InProcessTransport(app)
+        print(f"{args.transport}: {args.duration:.0f}s per level, mix {args.mix}, "
+              f"stub {args.latency * 1e3:.0f}ms +/- {args.jitter * 1e3:.0f}ms")
+        print(f"{'users':>6} {'req/s':>8} {'errors':>7}  p95 ms per action")
+        try:
+            result = sweep(transport, mix, levels, args.duration, args.think, on_level=_print_level)
+        finally:
+            transport.close()
+        result['upstream_calls'] = dict(server.counts)
+
+    print(f"knee: {result['knee_concurrency']} users ({KNEE_FRACTION:.0%} of peak throughput)")
+    if args.output:
+        result['config'] = {**vars(args), 'mix': mix, 'concurrency': levels}
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Local stub of the Amadeus and Gemini HTTP APIs for offline benchmarks.
+
+Replays the recorded responses in benchmarks/fixtures/ for the endpoints
+the app calls (OAuth token, flight-offers, hotels-by-city, hotel-offers,
+city and location lookups, generateContent), whatever the query, with a
+configurable response latency, +/- jitter and a fraction of 429 responses.
+Point the app at it with AMADEUS_BASE_URL and GEMINI_BASE_URL (see url /
+gemini_url), set before main is imported.
+
+Usage:
+    python benchmarks/stub_server.py [--port 8801] [--latency 0.08] [--jitter 0.04] [--rate-429 0.02]
+
+or in-process:
+    with StubServer(latency=0.05) as server:
+        os.environ['AMADEUS_BASE_URL'] = server.url
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# (method, path pattern, endpoint name, fixture file)
+ROUTES = (
+    ('POST', re.compile(r'/v1/security/oauth2/token$'), 'token', 'token.json'),
+    ('GET', re.compile(r'/v2/shopping/flight-offers$'), 'flight-offers', 'flight_offers.json'),
+    ('GET', re.compile(r'/v1/reference-data/locations/hotels/by-city$'), 'hotels-by-city', 'hotels_by_city.json'),
+    ('GET', re.compile(r'/v3/shopping/hotel-offers$'), 'hotel-offers', 'hotel_offers.json'),
+    ('GET', re.compile(r'/v1/reference-data/locations/cities$'), 'cities', 'locations_cities.json'),
+    ('GET', re.compile(r'/v1/reference-data/locations$'), 'locations', 'locations.json'),
+    ('POST', re.compile(r'/models/[^/]+:generateContent$'), 'generateContent', 'generate_content.json'),
+)
+
+THROTTLED_BODY = json.dumps({'errors': [{'status': 429, 'code': 38194, 'title': 'Too many requests',
+                                         'detail': 'The network rate limit is exceeded'}]}).encode('utf-8')
+
+
+def load_fixtures():
+    """Encoded body of every fixture, read once."""
+    bodies = {}
+    for _, _, _, filename in ROUTES:
+        with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+            bodies[filename] = f.read()
+    return bodies
+
+
+class StubServer:
+    """Threaded HTTP server replaying fixtures; usable as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, rate_429=0.0,
+                 endpoint_latency=None, seed=0):
+        """
+        Args:
+            latency: seconds before each response
+            jitter: latency varies uniformly by +/- this many seconds
+            rate_429: fraction of requests answered with 429 Too Many Requests
+            endpoint_latency: optional {endpoint name: latency} overrides
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.bodies = load_fixtures()
+        self.counts = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def gemini_url(self):
+        return f'{self.url}/v1beta'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                path = urlsplit(self.path).path
+                for route_method, pattern, name, filename in ROUTES:
+                    if route_method == method and pattern.search(path):
+                        status, body = server._respond(name, filename)
+                        break
+                else:
+                    status, body = 404, b'{"errors":[{"status":404,"title":"Not found"}]}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _respond(self, name, filename):
+        with self._lock:
+            throttled = self._rng.random() < self.rate_429
+            delay = self.endpoint_latency.get(name, self.latency)
+            if self.jitter:
+                delay += self._rng.uniform(-self.jitter, self.jitter)
+            key = f'{name}:429' if throttled else name
+            self.counts[key] = self.counts.get(key, 0) + 1
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            return 429, THROTTLED_BODY
+        return 200, self.bodies[filename]
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8801)
+    parser.add_argument('--latency', type=float, default=0.08, help='seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.04, help='+/- seconds')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='fraction of 429 responses')
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency, args.jitter, args.rate_429)
+    print(f"Stub Amadeus at {server.url} (AMADEUS_BASE_URL), Gemini at {server.gemini_url} (GEMINI_BASE_URL)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Cache backends for per-app response caches (minimum hotel prices,
+full flight searches).
+
+A backend needs get(key, default=None), set(key, value, ttl_seconds),
+delete(key) and clear(). Keys are tuples whose first item names the
+cache, e.g. ('min_price', 'paris', date, 3). MemoryCache is per process;
+shared_cache.SharedMemoryCache is shared by all workers on the host.
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_FILE_NAME = 'cache.mmap'
+
+
+class MemoryCache:
+    """Thread-safe in-process cache with a TTL per entry."""
+
+    def __init__(self):
+        # Reentrant so callers can hold the lock around clear() or a get/set pair
+        self.lock = threading.RLock()
+        self._entries = {}  # key -> (expires_at monotonic seconds, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= now:
+                del self._entries[key]
+                return default
+            return entry[1]
+
+    def set(self, key, value, ttl_seconds):
+        with self.lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key):
+        with self.lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+
+def build_default_cache(slots=None, slot_size=None):
+    """
+    Cache backend selected by CACHE_BACKEND: "shared" (default) or "memory".
+
+    The shared cache lives in SHARED_CACHE_PATH, by default in this user's
+    private app directory (runtime_paths.py), sized by slots and slot_size,
+    else SHARED_CACHE_SLOTS and SHARED_CACHE_SLOT_SIZE; if it cannot be
+    opened, e.g. on Windows or when the file is not private to us, the
+    per-process MemoryCache is used instead.
+    """
+    if os.getenv('CACHE_BACKEND', 'shared').lower() == 'memory':
+        return MemoryCache()
+    try:
+        from runtime_paths import app_runtime_dir
+        from shared_cache import DEFAULT_SLOT_SIZE, DEFAULT_SLOTS, SharedMemoryCache
+        return SharedMemoryCache(
+            os.getenv('SHARED_CACHE_PATH') or os.path.join(app_runtime_dir(), SHARED_CACHE_FILE_NAME),
+            slots=int(slots or os.getenv('SHARED_CACHE_SLOTS', DEFAULT_SLOTS)),
+            slot_size=int(slot_size or os.getenv('SHARED_CACHE_SLOT_SIZE', DEFAULT_SLOT_SIZE)),
+        )
+    except (ImportError, OSError, ValueError) as e:
+        logger.warning("Shared cache unavailable (%s); using per-process cache", e)
+        return MemoryCache()
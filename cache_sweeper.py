@@ -0,0 +1,139 @@
+"""
+Periodic sweeper for expired api_cache entries.
+
+Deletes expired rows in bounded batches (so no single statement locks the
+whole table) and, when the partitioned/sharded api_cache layout is enabled,
+creates the partitions of the coming days ahead of time (so cache writes
+never run DDL) and drops whole expired partitions first. Keeps simple
+counters so the sweep rate and duration can be monitored, and exports
+them to /metrics through instrumentation.METRICS: cache_sweep_runs_total
+(by result), cache_sweep_rows_total, cache_sweep_partitions_dropped_total
+and the cache_sweep_duration_seconds histogram.
+"""
+
+import logging
+import time
+import threading
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+
+class CacheSweeper:
+    """Run a batched cache sweep on a background thread every interval_seconds."""
+
+    def __init__(self, sweep_fn, drop_partitions_fn=None, interval_seconds=300,
+                 batch_size=1000, max_batches=50, ensure_partitions_fn=None):
+        """
+        Args:
+            sweep_fn: Callable(batch_size, max_batches) returning rows deleted
+            drop_partitions_fn: Optional callable returning partitions dropped
+            ensure_partitions_fn: Optional callable creating upcoming partitions
+            interval_seconds: Delay between sweeps
+            batch_size: Maximum rows deleted per statement
+            max_batches: Maximum batches per sweep, bounding the time of one run
+        """
+        self.sweep_fn = sweep_fn
+        self.drop_partitions_fn = drop_partitions_fn
+        self.ensure_partitions_fn = ensure_partitions_fn
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats = {
+            'runs': 0,
+            'errors': 0,
+            'rows_swept_total': 0,
+            'partitions_dropped_total': 0,
+            'last_rows_swept': 0,
+            'last_duration_seconds': 0.0,
+            'max_duration_seconds': 0.0,
+            'total_duration_seconds': 0.0,
+            'last_run_at': None,
+        }
+
+    def run_once(self):
+        """Run a single sweep and return the number of rows deleted."""
+        started = time.perf_counter()
+        rows = 0
+        dropped = 0
+        failed = False
+        try:
+            if self.ensure_partitions_fn:
+                self.ensure_partitions_fn()
+            if self.drop_partitions_fn:
+                dropped = self.drop_partitions_fn() or 0
+            rows = self.sweep_fn(batch_size=self.batch_size, max_batches=self.max_batches) or 0
+        except Exception as e:
+            failed = True
+            logger.warning("Cache sweep failed: %s", e)
+        duration = time.perf_counter() - started
+
+        with self._lock:
+            self._stats['runs'] += 1
+            if failed:
+                self._stats['errors'] += 1
+            self._stats['rows_swept_total'] += rows
+            self._stats['partitions_dropped_total'] += dropped
+            self._stats['last_rows_swept'] = rows
+            self._stats['last_duration_seconds'] = duration
+            self._stats['max_duration_seconds'] = max(self._stats['max_duration_seconds'], duration)
+            self._stats['total_duration_seconds'] += duration
+            self._stats['last_run_at'] = time.time()
+
+        metrics = instrumentation.METRICS
+        metrics.count('cache_sweep_runs_total', result='error' if failed else 'ok')
+        metrics.count('cache_sweep_rows_total', rows)
+        metrics.count('cache_sweep_partitions_dropped_total', dropped)
+        metrics.observe('cache_sweep_duration_seconds', duration)
+        return rows
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self):
+        """Start the background sweep thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='cache-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Signal the sweep thread to stop and wait for it."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        """Get a snapshot of sweep metrics."""
+        with self._lock:
+            return dict(self._stats)
+
+
+def build_default_sweeper(interval_seconds=300, batch_size=1000, max_batches=50, storage=None):
+    """
+    Create a sweeper for a storage backend (storage.py).
+
+    Defaults to the configured database: Supabase/PostgreSQL when
+    DATABASE_URL is set, otherwise the local SQLite database.
+    API_CACHE_PARTITIONED enables creating upcoming partitions/shards and
+    dropping expired ones.
+    """
+    if storage is None:
+        from storage import build_default_storage
+        storage = build_default_storage()
+
+    return CacheSweeper(
+        storage.sweep_expired_cache,
+        drop_partitions_fn=storage.drop_expired_partitions if storage.partitioned else None,
+        ensure_partitions_fn=storage.ensure_partitions if storage.partitioned else None,
+        interval_seconds=interval_seconds,
+        batch_size=batch_size,
+        max_batches=max_batches,
+    )
@@ -2,6 +2,13 @@
 Pre-defined city data that works with Amadeus test API
 """
 
+import logging
+from functools import lru_cache
+
+from fuzzy_match import BKTree, max_typos, normalize
+
+logger = logging.getLogger(__name__)
+
 # Estimated minimum hotel prices per night (in INR) for fallback
 ESTIMATED_HOTEL_PRICES = {
     "new york": 8000,
@@ -99,25 +106,66 @@ AVAILABLE_CITIES = {
     }
 }
 
+# Alternative names and codes users type for the predefined cities
+CITY_ALIASES = {
+    "NYC": "New York",
+    "New York City": "New York",
+    "Manhattan": "New York",
+    "Bombay": "Mumbai",
+    "New Delhi": "Delhi",
+    "Dilli": "Delhi",
+    "SF": "San Francisco",
+    "Frisco": "San Francisco",
+    "Bay Area": "San Francisco",
+    "Singapura": "Singapore",
+    "Dubai City": "Dubai",
+}
+
+def _build_name_lookup():
+    """Map every normalized name, alias and IATA code to its city."""
+    lookup = {}
+    for city_name, info in AVAILABLE_CITIES.items():
+        lookup[normalize(city_name)] = city_name
+        lookup[normalize(info["city_code"])] = city_name
+        for airport in info["airports"]:
+            lookup[normalize(airport["name"])] = city_name
+            lookup[normalize(airport["code"])] = city_name
+    for alias, city_name in CITY_ALIASES.items():
+        lookup[normalize(alias)] = city_name
+    return lookup
+
+_NAME_LOOKUP = _build_name_lookup()
+# Only names are typo-corrected; 3-letter codes are too short to guess at
+_NAME_TREE = BKTree((name, city) for name, city in _NAME_LOOKUP.items() if len(name) > 3)
+
+@lru_cache(maxsize=4096)
+def resolve_city_name(city_name):
+    """
+    Resolve user input to one of the predefined city names.
+
+    Accepts case/spacing variants, aliases ("Bombay", "NYC"), airport
+    names and codes, and small typos ("Dehli"). Returns None when nothing
+    matches or when the closest typo matches are different cities.
+    """
+    # Handle cases where the city name includes country or airports
+    city_name = (city_name or "").split(" - ")[0].split(",")[0]
+    name = normalize(city_name)
+    if not name:
+        return None
+    city = _NAME_LOOKUP.get(name)
+    if city:
+        return city
+    matches = _NAME_TREE.search(name, max_typos(name))
+    if not matches:
+        return None
+    best = {match_city for distance, _, match_city in matches if distance == matches[0][0]}
+    return best.pop() if len(best) == 1 else None
+
 def get_city_info(city_name):
     """Get city information from the predefined list"""
-    # Handle cases where the city name includes country or airports
-    if " - " in city_name:
-        city_name = city_name.split(" - ")[0]  # Get the part before any dashes
-    if "," in city_name:
-        city_name = city_name.split(",")[0]  # Get the part before any commas
-    
-    # Remove any surrounding whitespace and convert to title case
-    city_name = city_name.strip().title()
-    print(f"Looking up city info for: {city_name}")
-    
-    # Try to find the city in our database
-    city_info = AVAILABLE_CITIES.get(city_name)
-    if city_info:
-        print(f"Found city info: {city_info}")
-    else:
-        print(f"No city info found for: {city_name}")
-    return city_info
+    resolved = resolve_city_name(city_name)
+    logger.debug("Looking up city info for: %s -> %s", city_name, resolved)
+    return AVAILABLE_CITIES.get(resolved)
 
 def get_available_cities():
     """Get list of all available cities"""
@@ -125,14 +173,14 @@ def get_available_cities():
 
 def get_airport_codes(city_name):
     """Get list of airport codes for a city"""
-    city = AVAILABLE_CITIES.get(city_name.title())
+    city = AVAILABLE_CITIES.get(resolve_city_name(city_name))
     if city:
         return [airport["code"] for airport in city["airports"]]
     return []
 
 def format_city_info(city_name):
     """Format city information for display"""
-    city = get_city_info(city_name)  # Use get_city_info to handle various formats
-    if city:
-        return f"{city_name.title()}, {city['country']}"  # Simpler format for UI display
+    resolved = resolve_city_name(city_name)  # Handles aliases, codes and typos
+    if resolved:
+        return f"{resolved}, {AVAILABLE_CITIES[resolved]['country']}"  # Simpler format for UI display
     return None
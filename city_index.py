@@ -0,0 +1,241 @@
+"""
+Local autocomplete index for city and airport search.
+
+Keys (city names, IATA codes, airport names, aliases and every word within
+them) are kept in a sorted array and searched with bisect, so a prefix
+lookup is a binary search plus a short scan. Results are ranked by a
+popularity score. The index is loaded from city_data and an airport
+dataset file; Amadeus is only needed for misses, and its answers are
+merged back into the index - inserted into the sorted array, not re-sorted.
+Queries Amadeus had nothing for are remembered for MISS_TTL_SECONDS, as
+are longer queries starting with them, so repeated typos don't each cost
+an upstream call.
+"""
+
+import bisect
+import csv
+import heapq
+import os
+import threading
+import time
+
+from city_data import AVAILABLE_CITIES, CITY_ALIASES
+from fuzzy_match import normalize
+
+DEFAULT_AIRPORTS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'airports.csv')
+
+# Popularity used when a source has no score of its own
+SUPPORTED_CITY_POPULARITY = 100
+SUPPORTED_AIRPORT_POPULARITY = 90
+UPSTREAM_POPULARITY = 10
+
+# Merges adding at most this many keys insert them one by one; larger ones merge sorted runs
+INSORT_MAX_KEYS = 64
+
+# Upstream misses (normalized query -> expiry) are kept this long, up to MISS_CACHE_SIZE
+MISS_TTL_SECONDS = 300
+MISS_CACHE_SIZE = 1024
+
+
+def _keys_for(text):
+    """Index keys for text: the full normalized string and each word suffix of it."""
+    normalized = normalize(text)
+    if not normalized:
+        return []
+    words = normalized.split(' ')
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+class CityIndex:
+    """Sorted-array prefix index over locations, ranked by popularity."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []          # sorted (key, location_id) pairs
+        self._locations = []     # location_id -> location dict
+        self._popularity = []    # location_id -> score
+        self._by_identity = {}   # (subType, iataCode) -> location_id
+        self._prefix_cache = {}  # short prefix -> ranked location ids
+        self._misses = {}        # normalized query -> monotonic expiry of an upstream miss
+
+    def __len__(self):
+        return len(self._locations)
+
+    def add(self, location, keys, popularity):
+        """
+        Add or update a location.
+
+        location is a dict in the Amadeus suggestion shape (name, iataCode,
+        subType, address). Locations with the same subType and iataCode are
+        merged: new keys are added and the higher popularity wins.
+        """
+        self.bulk_add([(location, keys, popularity)])
+
+    def bulk_add(self, items):
+        """Add many (location, keys, popularity) items, merging their keys into the sorted array."""
+        with self._lock:
+            entries = set()
+            for location, keys, popularity in items:
+                identity = (location.get('subType'), location.get('iataCode'))
+                location_id = self._by_identity.get(identity)
+                if location_id is None:
+                    location_id = len(self._locations)
+                    self._locations.append(location)
+                    self._popularity.append(popularity)
+                    self._by_identity[identity] = location_id
+                else:
+                    self._popularity[location_id] = max(self._popularity[location_id], popularity)
+                for text in keys:
+                    for key in _keys_for(text):
+                        entries.add((key, location_id))
+            new = sorted(entry for entry in entries if not self._has_key(entry))
+            if len(new) <= INSORT_MAX_KEYS:
+                for entry in new:
+                    bisect.insort(self._keys, entry)
+            else:
+                self._keys = list(heapq.merge(self._keys, new))
+            self._prefix_cache.clear()
+
+    def _has_key(self, entry):
+        position = bisect.bisect_left(self._keys, entry)
+        return position < len(self._keys) and self._keys[position] == entry
+
+    def search(self, query, limit=10):
+        """Get up to limit locations whose keys start with query, most popular first."""
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        cached = self._prefix_cache.get(prefix) if len(prefix) <= 2 else None
+        if cached is None:
+            cached = self._rank(prefix)
+            if len(prefix) <= 2:
+                self._prefix_cache[prefix] = cached
+        return [self._locations[location_id] for location_id in cached[:limit]]
+
+    def _rank(self, prefix, max_results=50):
+        keys = self._keys
+        position = bisect.bisect_left(keys, (prefix,))
+        matches = {}
+        while position < len(keys):
+            key, location_id = keys[position]
+            if not key.startswith(prefix):
+                break
+            # Exact key matches (e.g. a full IATA code) outrank partial ones
+            exact = key == prefix
+            if location_id not in matches or exact:
+                matches[location_id] = exact
+            position += 1
+        popularity = self._popularity
+        return heapq.nsmallest(
+            max_results, matches,
+            key=lambda location_id: (not matches[location_id], -popularity[location_id], location_id)
+        )
+
+    def note_miss(self, query, ttl_seconds=MISS_TTL_SECONDS):
+        """Remember that Amadeus had no locations for query."""
+        prefix = normalize(query)
+        if not prefix:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._misses) >= MISS_CACHE_SIZE:
+                self._misses = {key: expiry for key, expiry in self._misses.items() if expiry > now}
+                if len(self._misses) >= MISS_CACHE_SIZE:
+                    self._misses.clear()
+            self._misses[prefix] = now + ttl_seconds
+
+    def recent_miss(self, query):
+        """Whether Amadeus recently had nothing for query or a prefix of it."""
+        prefix = normalize(query)
+        misses = self._misses
+        if not prefix or not misses:
+            return False
+        now = time.monotonic()
+        return any(misses.get(prefix[:end], 0) > now for end in range(1, len(prefix) + 1))
+
+    def merge_upstream(self, locations):
+        """Merge Amadeus location results (search_cities output) into the index."""
+        items = []
+        for location in locations:
+            address = location.get('address') or {}
+            keys = [location.get('name'), location.get('iataCode'), address.get('cityName')]
+            items.append((_suggestion(
+                location.get('name'), location.get('iataCode'), location.get('subType'),
+                address.get('cityName'), address.get('countryName'),
+                address.get('cityCode') or location.get('iataCode'),
+            ), [k for k in keys if k], UPSTREAM_POPULARITY))
+        if items:
+            self.bulk_add(items)
+
+
+def _suggestion(name, iata_code, sub_type, city_name, country, city_code):
+    return {
+        'name': name,
+        'iataCode': iata_code,
+        'subType': sub_type,
+        'address': {'cityName': city_name, 'countryName': country},
+        # Fields used by the city dropdowns
+        'country': country,
+        'city_code': city_code,
+    }
+
+
+def load_city_data_items():
+    """Index items for the predefined cities, their airports and aliases."""
+    aliases = {}
+    for alias, city in CITY_ALIASES.items():
+        aliases.setdefault(city, []).append(alias)
+    items = []
+    for city_name, info in AVAILABLE_CITIES.items():
+        city_code = info.get('city_code', '')
+        country = info.get('country', '')
+        items.append((
+            _suggestion(city_name, city_code, 'CITY', city_name, country, city_code),
+            [city_name, city_code] + aliases.get(city_name, []),
+            SUPPORTED_CITY_POPULARITY,
+        ))
+        for airport in info.get('airports', []):
+            items.append((
+                _suggestion(airport['name'], airport['code'], 'AIRPORT', city_name, country, city_code),
+                [airport['name'], airport['code']],
+                SUPPORTED_AIRPORT_POPULARITY,
+            ))
+    return items
+
+
+def load_airport_dataset(path=DEFAULT_AIRPORTS_PATH):
+    """
+    Index items from an airport CSV file.
+
+    Expected columns: iata_code, name, city, country and optionally
+    popularity (0-100) and city_code. Rows without an IATA code are skipped.
+    """
+    items = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            code = (row.get('iata_code') or '').strip().upper()
+            if not code:
+                continue
+            try:
+                popularity = float(row.get('popularity') or 0)
+            except ValueError:
+                popularity = 0
+            city = (row.get('city') or '').strip()
+            items.append((
+                _suggestion(row.get('name', '').strip(), code, 'AIRPORT', city,
+                            (row.get('country') or '').strip(),
+                            (row.get('city_code') or '').strip().upper() or code),
+                [row.get('name', ''), code, city],
+                popularity,
+            ))
+    return items
+
+
+def build_default_index(airports_path=DEFAULT_AIRPORTS_PATH):
+    """Build the index from city_data plus the airport dataset (if present)."""
+    index = CityIndex()
+    items = load_city_data_items()
+    if airports_path and os.path.exists(airports_path):
+        items.extend(load_airport_dataset(airports_path))
+    index.bulk_add(items)
+    return index
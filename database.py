@@ -412,6 +412,136 @@ def populate_sample_data(conn):
     
     conn.commit()
 
+# Sharded api_cache layout: one table per expiry day, so a whole day of
+# expired entries is removed with a single DROP TABLE instead of a DELETE scan.
+API_CACHE_SHARD_PREFIX = 'api_cache_'
+
+def api_cache_shard_name(day):
+    """Get the shard table name holding entries that expire on day"""
+    return f"{API_CACHE_SHARD_PREFIX}{day.strftime('%Y%m%d')}"
+
+def ensure_api_cache_shard(conn, day):
+    """Create the api_cache shard for day if it does not exist and return its name"""
+    name = api_cache_shard_name(day)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {name} (
+            route_key TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            response_data TEXT NOT NULL,
+            last_updated TIMESTAMP NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (route_key, data_type)
+        )
+    ''')
+    return name
+
+def ensure_api_cache_shards(conn, days_ahead=2, now=None):
+    """Create the api_cache shards for today and the next days_ahead days, returning how many"""
+    today = (now or datetime.datetime.now()).date()
+    for offset in range(days_ahead + 1):
+        ensure_api_cache_shard(conn, today + datetime.timedelta(days=offset))
+    conn.commit()
+    return days_ahead + 1
+
+def list_api_cache_shards(conn):
+    """Get (day, table_name) pairs for all api_cache shards, newest first"""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+        (f"{API_CACHE_SHARD_PREFIX}%",)
+    ).fetchall()
+    shards = []
+    for row in rows:
+        name = row[0]
+        try:
+            day = datetime.datetime.strptime(name[len(API_CACHE_SHARD_PREFIX):], '%Y%m%d').date()
+        except ValueError:
+            continue
+        shards.append((day, name))
+    shards.sort(reverse=True)
+    return shards
+
+def cache_api_response(conn, route_key, data_type, response_data, ttl_hours=6, sharded=False):
+    """Cache API response data, optionally in the shard for its expiry day"""
+    now = datetime.datetime.now()
+    expires_at = now + datetime.timedelta(hours=ttl_hours)
+    table = 'api_cache'
+    if sharded:
+        # Entries for a key may live in an older shard; remove them first
+        shards = dict(list_api_cache_shards(conn))
+        for name in shards.values():
+            conn.execute(f'DELETE FROM {name} WHERE route_key = ? AND data_type = ?',
+                         (route_key, data_type))
+        # Shards are normally created ahead by the sweeper (ensure_api_cache_shards);
+        # SQLite has no catch-all partition, so create one here only if it is missing
+        table = shards.get(expires_at.date()) or ensure_api_cache_shard(conn, expires_at.date())
+    conn.execute(f'''
+        INSERT OR REPLACE INTO {table} (route_key, data_type, response_data, last_updated, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (route_key, data_type, response_data, now, expires_at))
+    conn.commit()
+
+def get_cached_api_response(conn, route_key, data_type, sharded=False):
+    """Get cached API response if not expired"""
+    now = datetime.datetime.now()
+    if sharded:
+        tables = [name for day, name in list_api_cache_shards(conn) if day >= now.date()]
+    else:
+        tables = ['api_cache']
+    for table in tables:
+        row = conn.execute(f'''
+            SELECT response_data FROM {table}
+            WHERE route_key = ? AND data_type = ? AND expires_at > ?
+        ''', (route_key, data_type, now)).fetchone()
+        if row:
+            return row[0]
+    return None
+
+def sweep_expired_cache(conn, batch_size=1000, max_batches=None, now=None, sharded=False):
+    """
+    Delete expired api_cache rows in bounded batches, committing after each batch.
+
+    With sharded, shards whose whole day has expired are dropped (their rows
+    counted as deleted) and the remaining shards are swept like api_cache,
+    all within the same max_batches.
+    """
+    cutoff = now or datetime.datetime.now()
+    total = 0
+    tables = ['api_cache']
+    if sharded:
+        for day, name in list_api_cache_shards(conn):
+            if day < cutoff.date():
+                total += conn.execute(f'SELECT COUNT(*) FROM {name}').fetchone()[0]
+                conn.execute(f'DROP TABLE IF EXISTS {name}')
+                conn.commit()
+            else:
+                tables.append(name)
+    batches = 0
+    for table in tables:
+        while max_batches is None or batches < max_batches:
+            cursor = conn.execute(f'''
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} WHERE expires_at < ? LIMIT ?
+                )
+            ''', (cutoff, batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            total += deleted
+            batches += 1
+            if deleted < batch_size:
+                break
+    return total
+
+def drop_expired_api_cache_shards(conn, now=None):
+    """Drop api_cache shards whose expiry day is before today, returning the count dropped"""
+    today = (now or datetime.datetime.now()).date()
+    dropped = 0
+    for day, name in list_api_cache_shards(conn):
+        if day < today:
+            conn.execute(f'DROP TABLE IF EXISTS {name}')
+            dropped += 1
+    conn.commit()
+    return dropped
+
 if __name__ == '__main__':
     try:
         conn = get_db_connection()
@@ -0,0 +1,76 @@
+"""
+Per-request time budget shared by every upstream call a request makes.
+
+A route's work runs inside `with request_deadline(seconds):`; amadeus_api
+and the upstream client then size each HTTP timeout from what is left
+(call_timeout) and skip retries and fallback calls the budget cannot
+cover (allows). The deadline lives in a ContextVar, so it follows the
+request without being threaded through every signature; work handed to
+a thread pool must be submitted through copy_context().run to see it.
+Outside a deadline every helper behaves as if time were unlimited.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+import requests
+
+# Below this an HTTP call cannot usefully complete (connect + TLS + response)
+MIN_CALL_SECONDS = 0.5
+
+_current = contextvars.ContextVar('request_deadline', default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request's budget ran out before an upstream call could start.
+
+    A requests Timeout, so existing RequestException handlers treat it
+    like any other upstream timeout.
+    """
+
+
+@contextmanager
+def request_deadline(seconds):
+    """Run the block with at most `seconds` of budget (never extends an outer deadline)."""
+    expires_at = time.monotonic() + seconds
+    outer = _current.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _current.set(expires_at)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline, or None when there is none."""
+    expires_at = _current.get()
+    if expires_at is None:
+        return None
+    return max(0.0, expires_at - time.monotonic())
+
+
+def allows(seconds):
+    """Whether `seconds` more work (e.g. a backoff sleep plus one call) fits in the budget."""
+    left = remaining()
+    return left is None or left >= seconds + MIN_CALL_SECONDS
+
+
+def call_timeout(default):
+    """Timeout for the next upstream call: default, capped by the remaining budget.
+
+    Raises DeadlineExceeded when too little time is left for a call.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left < MIN_CALL_SECONDS:
+        raise DeadlineExceeded(f"request deadline exceeded ({left:.2f}s left)")
+    return min(default, left)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's deadline into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
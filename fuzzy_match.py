@@ -0,0 +1,129 @@
+"""
+Typo-tolerant string matching with a BK-tree.
+
+A BK-tree indexes words by Levenshtein distance so a lookup within edit
+distance d only visits subtrees whose edge distance lies in
+[dist - d, dist + d], instead of comparing the query with every word.
+"""
+
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse punctuation/whitespace to single spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    return _NON_ALNUM.sub(' ', text).strip()
+
+
+def _pattern_masks(pattern):
+    """Bit mask of positions per character, for the bit-parallel distance."""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bit_parallel_distance(masks, length, text):
+    """
+    Levenshtein distance between a pattern (given by its masks and length) and text.
+
+    Myers/Hyyrö bit-vector algorithm: one column of the DP matrix is
+    encoded as positive/negative delta bit vectors, so each text
+    character costs a handful of integer operations instead of a loop
+    over the pattern.
+    """
+    if not length:
+        return len(text)
+    all_ones = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = all_ones, 0, length
+    for char in text:
+        match = masks.get(char, 0)
+        vertical = match | negative
+        horizontal = (((match & positive) + positive) ^ positive) | match
+        h_positive = negative | ~(horizontal | positive)
+        h_negative = positive & horizontal
+        if h_positive & last:
+            score += 1
+        elif h_negative & last:
+            score -= 1
+        h_positive = (h_positive << 1) | 1
+        h_negative <<= 1
+        positive = (h_negative | ~(vertical | h_positive)) & all_ones
+        negative = h_positive & vertical
+    return score
+
+
+def levenshtein(a, b):
+    """Edit distance between a and b (insertions, deletions, substitutions)."""
+    if a == b:
+        return 0
+    return _bit_parallel_distance(_pattern_masks(a), len(a), b)
+
+
+class BKTree:
+    """BK-tree over words, each carrying an arbitrary payload."""
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self, items=()):
+        # Node layout: [word, payload, {distance: child_node}]
+        self._root = None
+        self._size = 0
+        for word, payload in items:
+            self.add(word, payload)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, word, payload=None):
+        """Insert word; an existing identical word keeps its original payload."""
+        if self._root is None:
+            self._root = [word, payload, {}]
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [word, payload, {}]
+                self._size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """Get (distance, word, payload) for all words within max_distance, closest first."""
+        if self._root is None:
+            return []
+        masks, length = _pattern_masks(word), len(word)
+        results = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = _bit_parallel_distance(masks, length, node[0])
+            if distance <= max_distance:
+                results.append((distance, node[0], node[1]))
+            low = distance - max_distance
+            high = distance + max_distance
+            for edge, child in node[2].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        results.sort(key=lambda result: (result[0], result[1]))
+        return results
+
+
+def max_typos(word):
+    """Edit-distance tolerance for a query: stricter for short words."""
+    length = len(word)
+    if length <= 3:
+        return 0
+    if length == 4:
+        return 1
+    return 2
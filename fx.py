@@ -0,0 +1,177 @@
+"""
+Currency conversion: a cached FX rate table and bulk conversion of offers.
+
+Offers and minimum prices are stored in one canonical currency
+(CANONICAL_CURRENCY, default INR): whatever currency Amadeus answers in is
+converted once before caching, so one cache entry serves users of every
+currency, and routes convert to the requested display currency on the
+way out.
+
+A rate provider returns a RateTable (units of each currency per one unit
+of its base): FileRateProvider reads a JSON export (FX_RATES_FILE, default
+data/fx_rates.json), StaticRateProvider serves fixed rates for tests and
+offline runs. FxConverter keeps the table in memory for FX_CACHE_TTL
+seconds; if a refresh fails the previous table stays in use.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+CANONICAL_CURRENCY = os.getenv('CANONICAL_CURRENCY', 'INR').upper()
+DEFAULT_RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fx_rates.json')
+FX_CACHE_TTL = float(os.getenv('FX_CACHE_TTL', '3600'))
+# Retry a failed refresh this soon, not after a full TTL of stale rates
+FX_RETRY_SECONDS = 60.0
+
+DISPLAY_SYMBOLS = {'INR': '₹', 'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥'}
+
+
+class UnknownCurrency(ValueError):
+    """A currency code missing from the rate table."""
+
+
+class RateTable:
+    """Exchange rates against one base currency (immutable)."""
+
+    __slots__ = ('base', 'rates', 'as_of')
+
+    def __init__(self, base, rates, as_of=None):
+        self.base = base.upper()
+        self.rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        self.rates[self.base] = 1.0
+        self.as_of = as_of
+        if any(rate <= 0 for rate in self.rates.values()):
+            raise ValueError("exchange rates must be positive")
+
+    def __contains__(self, currency):
+        return currency in self.rates
+
+    def rate(self, source, target):
+        """Multiplier taking an amount in source to target."""
+        try:
+            return self.rates[target] / self.rates[source]
+        except KeyError as e:
+            raise UnknownCurrency(f"No exchange rate for {e.args[0]}") from None
+
+
+class FileRateProvider:
+    """Rates from a JSON file: {"base": "USD", "as_of": "...", "rates": {"INR": 83.2, ...}}."""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('FX_RATES_FILE') or DEFAULT_RATES_FILE
+
+    def fetch(self):
+        with open(self.path, 'rb') as f:
+            data = json_codec.loads(f.read())
+        return RateTable(data['base'], data['rates'], data.get('as_of'))
+
+
+class StaticRateProvider:
+    """Fixed rates (tests, offline benchmarks)."""
+
+    def __init__(self, rates, base='USD', as_of=None):
+        self._table = RateTable(base, rates, as_of)
+
+    def fetch(self):
+        return self._table
+
+
+class FxConverter:
+    """Converts amounts and offers between currencies using a TTL-cached rate table."""
+
+    def __init__(self, provider, canonical=CANONICAL_CURRENCY, ttl=FX_CACHE_TTL, clock=time.monotonic):
+        self.provider = provider
+        self.canonical = canonical.upper()
+        self.ttl = ttl
+        self._clock = clock
+        self._table = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    def table(self):
+        """The current rate table, refreshed from the provider once its TTL has passed."""
+        if self._table is not None and self._clock() < self._refresh_at:
+            return self._table
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._table is not None and self._clock() < self._refresh_at:
+                return self._table
+            try:
+                self._table = self.provider.fetch()
+                self._refresh_at = self._clock() + self.ttl
+            except (OSError, KeyError, ValueError) as e:
+                if self._table is None:
+                    raise
+                logger.warning("FX rate refresh failed (%s); keeping rates as of %s", e, self._table.as_of)
+                self._refresh_at = self._clock() + min(self.ttl, FX_RETRY_SECONDS)
+            return self._table
+
+    def supports(self, currency):
+        return currency.upper() in self.table()
+
+    def rate(self, source, target):
+        if source == target or source is None:
+            return 1.0
+        return self.table().rate(source, target)
+
+    def convert(self, amount, source, target):
+        if amount is None:
+            return None
+        return round(amount * self.rate(source, target), 2)
+
+    def convert_many(self, amounts, source, target):
+        """Convert a list of amounts in one currency with a single rate lookup."""
+        factor = self.rate(source, target)
+        if factor == 1.0:
+            return list(amounts)
+        return [round(amount * factor, 2) for amount in amounts]
+
+    def convert_offers(self, offers, target):
+        """
+        Offers priced in target; already-matching offers are returned as is,
+        others are converted copies (one rate lookup per source currency).
+        Offers without a currency are taken to be in the canonical one.
+        Offers in a currency missing from the rate table are logged and
+        dropped; an unknown target raises UnknownCurrency.
+        """
+        factors = {}
+        converted = []
+        for offer in offers:
+            source = offer.currency or self.canonical
+            if source == target:
+                converted.append(offer)
+                continue
+            if source not in factors:
+                try:
+                    factors[source] = self.rate(source, target)
+                except UnknownCurrency:
+                    if not self.supports(target):
+                        raise
+                    logger.warning("Dropping offers priced in %s: no exchange rate to %s", source, target)
+                    factors[source] = None
+            factor = factors[source]
+            if factor is not None:
+                converted.append(offer.in_currency(target, factor))
+        return converted
+
+    def to_canonical(self, offers):
+        return self.convert_offers(offers, self.canonical)
+
+
+def format_money(amount, currency):
+    """Display string for an amount: '₹5,000', '$60', '1,250 AED'."""
+    symbol = DISPLAY_SYMBOLS.get(currency)
+    if symbol:
+        return f"{symbol}{amount:,.0f}"
+    return f"{amount:,.0f} {currency}"
+
+
+def build_default_fx():
+    """FxConverter over FX_RATES_FILE (data/fx_rates.json when unset)."""
+    return FxConverter(FileRateProvider())
@@ -0,0 +1,35 @@
+"""
+gunicorn settings for running several workers (Linux/macOS):
+
+    gunicorn -c gunicorn.conf.py "main:create_app()"
+
+Each worker imports main and calls create_app() after fork, so every worker
+gets its own upstream client, caches and (if CACHE_SWEEP_INTERVAL is set)
+sweeper thread. Rate limits are host-wide: all workers share one SQLite
+counter database (limiter_storage.py) unless RATELIMIT_STORAGE_URI says
+otherwise, e.g. redis:// across hosts or memory:// for per-worker limits.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Requests mostly wait on Amadeus/Gemini, so give each worker a few threads
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Gemini calls may take up to 30s; leave room for the retry
+timeout = 75
+graceful_timeout = 30
+keepalive = 5
+
+# Build the app in each worker, not in the master (threads do not survive fork)
+preload_app = False
+
+# Recycle workers periodically to bound memory growth of the in-process caches
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = "-"
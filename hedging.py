@@ -0,0 +1,146 @@
+"""
+Hedged requests for idempotent upstream GETs.
+
+A call that has not answered by its endpoint's observed p95 gets one
+duplicate, and whichever copy completes first wins; the loser finishes in
+the background and is discarded. This trims the slow-response tail that
+dominates p99 at the cost of a few extra calls, capped by a global budget
+(a fraction of all hedgeable calls). Thresholds come from per-endpoint
+LatencyHistograms fed by every completed attempt, decayed so they track
+recent latency. Attempts are timed from when they actually start, so time
+spent queued for a pool thread never inflates the p95.
+
+Most calls cannot be hedged (the endpoint is still unprofiled or the
+budget is spent); those run on the caller's thread. Only a call that may
+need a hedge moves its primary to the pool, so the caller can return
+whichever copy answers first; its threshold also counts from the
+primary's start.
+
+Only safe for idempotent requests - amadeus_api uses it for GETs when
+AMADEUS_HEDGING is enabled.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import deadline
+from histogram import LatencyHistogram
+
+DEFAULT_BUDGET = 0.05          # at most 5% extra calls
+DEFAULT_PERCENTILE = 95
+MIN_SAMPLES = 20               # no hedging until an endpoint has a latency profile
+DECAY_EVERY = 2000             # samples per endpoint between histogram halvings
+MAX_WORKERS = 32
+
+
+class HedgePolicy:
+    """Per-endpoint latency tracking and budgeted hedging of idempotent calls."""
+
+    def __init__(self, budget=DEFAULT_BUDGET, percentile=DEFAULT_PERCENTILE,
+                 min_samples=MIN_SAMPLES, max_workers=MAX_WORKERS):
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.histograms = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _pool(self):
+        # Threads do not survive fork; each worker process builds its own pool
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='upstream-hedge')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def histogram(self, endpoint):
+        histogram = self.histograms.get(endpoint)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+        return histogram
+
+    def observe(self, endpoint, seconds):
+        histogram = self.histogram(endpoint)
+        histogram.record(seconds)
+        if histogram.count >= DECAY_EVERY:
+            histogram.decay()
+
+    def threshold(self, endpoint):
+        """Seconds after which a call to endpoint is hedged, or None while unprofiled."""
+        histogram = self.histogram(endpoint)
+        if histogram.count < self.min_samples:
+            return None
+        return histogram.percentile(self.percentile)
+
+    def _hedge_available(self):
+        with self._lock:
+            return self.hedges + 1 <= self.budget * self.calls
+
+    def _take_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _timed(self, endpoint, send, started=None):
+        """send(), observed from when it actually starts running."""
+        begin = time.perf_counter()
+        if started is not None:
+            started.set()
+        try:
+            return send()
+        finally:
+            self.observe(endpoint, time.perf_counter() - begin)
+
+    def call(self, endpoint, send):
+        """
+        Return send()'s result, hedging it with a second send() when the
+        first is slower than the endpoint's threshold and budget allows.
+        send must be idempotent; its exceptions propagate as usual.
+        """
+        with self._lock:
+            self.calls += 1
+        threshold = self.threshold(endpoint)
+        if threshold is None or not self._hedge_available():
+            return self._timed(endpoint, send)
+
+        started = threading.Event()
+        primary = deadline.submit(self._pool(), self._timed, endpoint, send, started)
+        started.wait()
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        hedge = deadline.submit(self._pool(), self._timed, endpoint, send)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self):
+        with self._lock:
+            calls, hedges, wins = self.calls, self.hedges, self.hedge_wins
+        return {
+            'calls': calls,
+            'hedges': hedges,
+            'hedge_wins': wins,
+            'thresholds': {endpoint: self.threshold(endpoint) for endpoint in list(self.histograms)},
+        }
@@ -0,0 +1,100 @@
+"""
+HDR-style latency histogram with bounded relative error.
+
+Values are recorded in microseconds into log-linear buckets: exact below
+2**SUB_BUCKET_BITS, then SUB_BUCKET_HALF linear sub-buckets per power of
+two, so any recorded value is off by at most 1/SUB_BUCKET_HALF (~3%) of
+itself whatever its magnitude. Recording is one bit_length() and a list
+increment; memory is fixed (MAX_BUCKETS counters) regardless of the
+number of samples.
+"""
+
+import threading
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Covers up to ~2**40 us (12 days); larger values land in the last bucket
+MAX_BUCKETS = (40 - SUB_BUCKET_BITS + 1) * SUB_BUCKET_HALF + SUB_BUCKET_COUNT
+
+
+def bucket_index(micros):
+    """Bucket of a non-negative integer value."""
+    if micros < SUB_BUCKET_COUNT:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS
+    return min(shift * SUB_BUCKET_HALF + (micros >> shift), MAX_BUCKETS - 1)
+
+
+def bucket_bounds(index):
+    """(lowest, highest) integer value that falls in a bucket."""
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    shift = index // SUB_BUCKET_HALF - 1
+    low = (index - shift * SUB_BUCKET_HALF) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of durations, recorded in seconds."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0.0   # seconds
+        self.max = 0.0     # seconds
+
+    def record(self, seconds):
+        index = bucket_index(max(0, int(seconds * 1e6)))
+        with self.lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, pct):
+        """Upper bound (seconds) of the bucket holding the pct-th percentile, or None if empty."""
+        with self.lock:
+            if not self.count:
+                return None
+            rank = max(1, int(self.count * pct / 100.0 + 0.5))
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= rank:
+                    return min(bucket_bounds(index)[1] / 1e6, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds):
+        """Number of samples <= each of the given bounds (seconds, ascending)."""
+        with self.lock:
+            counts = list(self._counts)
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            limit = bucket_index(int(bound * 1e6))
+            while index <= limit:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def decay(self):
+        """Halve every count, so percentiles follow recent latency."""
+        with self.lock:
+            self._counts = [bucket_count >> 1 for bucket_count in self._counts]
+            self.count = sum(self._counts)
+            self.total /= 2
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
@@ -0,0 +1,74 @@
+"""
+HTTP caching for read-mostly GET endpoints: strong ETags, Cache-Control, 304s.
+
+The city list and minimum hotel prices change over hours, not requests, so
+their GET variants let browsers and CDNs (Vercel's edge honours s-maxage)
+keep a copy instead of re-fetching the full JSON:
+
+- every response carries a strong ETag, the hash of its exact body (a
+  constant payload is serialized and hashed once, at import);
+- Cache-Control is "public, max-age=..., s-maxage=...,
+  stale-while-revalidate=..." from the endpoint's CachePolicy;
+- a request whose If-None-Match matches gets 304 Not Modified with no body
+  (weak comparison, as RFC 9110 requires, so proxies that weaken tags
+  while compressing still revalidate).
+
+POST variants stay uncached; only GET/HEAD responses get these headers.
+"""
+
+import hashlib
+from typing import NamedTuple
+
+from flask import current_app, request
+
+import json_codec
+
+
+class CachePolicy(NamedTuple):
+    """Cache lifetimes in seconds for one endpoint."""
+    max_age: int                     # browser copies
+    shared_max_age: int              # CDN copies (s-maxage)
+    stale_while_revalidate: int = 0  # serve stale while refetching in the background
+
+    def header(self):
+        value = f"public, max-age={self.max_age}, s-maxage={self.shared_max_age}"
+        if self.stale_while_revalidate:
+            value += f", stale-while-revalidate={self.stale_while_revalidate}"
+        return value
+
+
+def strong_etag(body):
+    """Strong entity tag (unquoted) of a response body."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _cacheable(response, etag, policy):
+    response.set_etag(etag)
+    if policy is not None:
+        response.headers['Cache-Control'] = policy.header()
+    # Turns the response into a body-less 304 when If-None-Match matches
+    return response.make_conditional(request)
+
+
+def cached_json(payload, policy):
+    """JSON response with a content-hash ETag and policy's Cache-Control; 304 when the client is current."""
+    body = json_codec.dumps(payload, default=current_app.json.default) + b"\n"
+    response = current_app.response_class(body, mimetype='application/json')
+    return _cacheable(response, strong_etag(body), policy)
+
+
+class StaticJSON:
+    """A constant JSON payload, serialized and tagged once."""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, payload):
+        self.body = json_codec.dumps(payload) + b"\n"
+        self.etag = strong_etag(self.body)
+
+    def response(self, policy=None):
+        """The body as a response; with a policy (GET variants) also cache headers and 304s."""
+        response = current_app.response_class(self.body, mimetype='application/json')
+        if policy is None:
+            return response
+        return _cacheable(response, self.etag, policy)
@@ -0,0 +1,236 @@
+"""
+Request and upstream instrumentation: latency histograms, counters and
+per-request trace spans.
+
+- Every Flask route and upstream endpoint (Amadeus URL path, Gemini) gets
+  a LatencyHistogram (histogram.py).
+- Counters such as upstream retries, responses by status (429s included)
+  and response-cache hits/misses are labelled tallies.
+- Each request carries a Trace in a ContextVar; span() records nested,
+  timed steps (route -> token -> city code -> hotel list -> offers) and
+  one structured log record per request (app_logging.py) summarizes them.
+
+METRICS is per process, like the caches before shared_cache.py: with
+several workers, each /metrics scrape reports the worker that served it.
+init_app() hooks a Flask app; render_prometheus() produces the /metrics
+body in Prometheus text format (version 0.0.4).
+"""
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+from histogram import LatencyHistogram
+
+# Histogram buckets exported to Prometheus (seconds); counts are exact to
+# the histogram's ~3% bucket precision
+EXPORT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# One structured log record per request (REQUEST_LOG=0 turns it off)
+REQUEST_LOG = os.getenv('REQUEST_LOG', '1').lower() not in ('0', 'false', 'no')
+
+logger = logging.getLogger(__name__)
+
+_trace = contextvars.ContextVar('trace', default=None)
+_parent_span = contextvars.ContextVar('parent_span', default=None)
+
+
+class Metrics:
+    """Thread-safe registry of latency histograms and labelled counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}   # (name, labels) -> LatencyHistogram
+        self.counters = {}     # (name, labels) -> int
+
+    @staticmethod
+    def _key(name, labels):
+        # Label values are exported as strings; stringify so 429 and '429' agree
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.record(seconds)
+
+    def count(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def counter_value(self, name, **labels):
+        return self.counters.get(self._key(name, labels), 0)
+
+    def histogram(self, name, **labels):
+        return self.histograms.get(self._key(name, labels))
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+METRICS = Metrics()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(metrics=METRICS):
+    """Metrics in Prometheus text exposition format."""
+    lines = []
+    with metrics._lock:
+        counters = sorted(metrics.counters.items())
+        histograms = sorted(metrics.histograms.items(), key=lambda item: item[0])
+
+    declared = set()
+    for (name, labels), value in counters:
+        if name not in declared:
+            lines.append(f'# TYPE {name} counter')
+            declared.add(name)
+        lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    for (name, labels), histogram in histograms:
+        if name not in declared:
+            lines.append(f'# TYPE {name} histogram')
+            declared.add(name)
+        for bound, cumulative in zip(EXPORT_BUCKETS, histogram.cumulative_counts(EXPORT_BUCKETS)):
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+        lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {histogram.count}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {histogram.total:.6f}')
+        lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+# Tracing
+
+class Trace:
+    """Spans of one request; shared by the threads the request fans out to."""
+
+    __slots__ = ('trace_id', 'started', 'spans')
+
+    def __init__(self):
+        self.trace_id = os.urandom(8).hex()
+        self.started = time.perf_counter()
+        self.spans = []  # list.append is atomic, so pool threads can add spans
+
+
+class Span:
+    __slots__ = ('name', 'parent', 'start', 'duration', 'attrs')
+
+    def __init__(self, name, parent, start, attrs):
+        self.name = name
+        self.parent = parent
+        self.start = start
+        self.duration = None
+        self.attrs = attrs
+
+    def to_dict(self, trace_started):
+        record = {
+            'name': self.name,
+            'parent': self.parent,
+            'start_ms': round((self.start - trace_started) * 1e3, 2),
+            'duration_ms': round(self.duration * 1e3, 2) if self.duration is not None else None,
+        }
+        if self.attrs:
+            record.update(self.attrs)
+        return record
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a step of the current request; nested spans record their parent."""
+    trace = _trace.get()
+    started = time.perf_counter()
+    current = Span(name, _parent_span.get(), started, attrs)
+    token = _parent_span.set(name)
+    try:
+        yield current
+    finally:
+        _parent_span.reset(token)
+        current.duration = time.perf_counter() - started
+        if trace is not None:
+            trace.spans.append(current)
+
+
+@contextmanager
+def upstream_call(endpoint):
+    """
+    Span plus latency/status metrics around one upstream HTTP call.
+    Set .attrs['status'] on the yielded span once the response arrives.
+    """
+    with span(endpoint) as current:
+        try:
+            yield current
+        finally:
+            status = current.attrs.get('status', 'error')
+            METRICS.observe('upstream_request_duration_seconds',
+                            time.perf_counter() - current.start, endpoint=endpoint)
+            METRICS.count('upstream_responses_total', endpoint=endpoint, status=status)
+
+
+def current_trace_id():
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def count_cache_lookup(cache_name, hit):
+    METRICS.count('cache_lookups_total', cache=cache_name, result='hit' if hit else 'miss')
+
+
+# Flask integration
+
+def _start_request():
+    # Top-level spans of the request are children of its route
+    g.instrumentation_tokens = (_trace.set(Trace()), _parent_span.set(request.endpoint or 'unmatched'))
+    g.instrumentation_status = 500
+
+
+def _record_status(response):
+    g.instrumentation_status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    tokens = g.pop('instrumentation_tokens', None)
+    if tokens is None:
+        return
+    trace = _trace.get()
+    _trace.reset(tokens[0])
+    _parent_span.reset(tokens[1])
+    duration = time.perf_counter() - trace.started
+    route = request.endpoint or 'unmatched'
+    status = g.pop('instrumentation_status', 500)
+    METRICS.observe('http_request_duration_seconds', duration, route=route)
+    METRICS.count('http_requests_total', route=route, status=status)
+    if REQUEST_LOG and logger.isEnabledFor(logging.INFO):
+        logger.info("%s %s %s %.1fms", request.method, route, status, duration * 1e3, extra={
+            'trace_id': trace.trace_id,
+            'method': request.method,
+            'route': route,
+            'status': status,
+            'duration_ms': round(duration * 1e3, 2),
+            'spans': [item.to_dict(trace.started) for item in trace.spans],
+        })
+
+
+def init_app(app):
+    """Trace and time every request of app (call before limiter.init_app so
+    rate-limited requests are counted too)."""
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
@@ -0,0 +1,134 @@
+"""
+Cheapest multi-city itineraries (A -> B -> C -> A) from per-leg fares.
+
+Each leg has a window of departure dates; between two legs the traveller
+stays in the leg's destination city from the arrival date (same-day
+arrival is assumed) until the next departure. An itinerary costs its leg
+fares plus each stay's nightly hotel rate x nights.
+
+Inputs are already reduced to what can win, which is what keeps upstream
+calls linear in the number of legs: one flight search per leg and date
+(only the cheapest fare of each survives - any other fare on the same leg
+and day is dominated) and one hotel search per stop city covering its
+whole window. That search prices the whole window, so callers divide its
+cheapest total by the window's nights (HotelOffer.per_night) and the
+nightly rate then prices every stay length.
+
+cheapest_itineraries() is a dynamic program over (leg, departure date):
+each state keeps only its k cheapest partial itineraries, since every
+completion of a dearer partial is beaten by the same completion of k
+cheaper ones, and partials over the budget are dropped as soon as they
+exceed it. O(legs x window^2 x k log k) after the searches.
+"""
+
+import heapq
+from datetime import timedelta
+
+
+class Stay:
+    """Nights in one city between two legs, at one hotel."""
+
+    __slots__ = ('city', 'hotel', 'check_in', 'check_out', 'nights')
+
+    def __init__(self, city, hotel, check_in, check_out):
+        self.city = city
+        self.hotel = hotel
+        self.check_in = check_in
+        self.check_out = check_out
+        self.nights = (check_out - check_in).days
+
+    @property
+    def price(self):
+        return self.hotel.price * self.nights
+
+    def to_dict(self):
+        return {
+            'city': self.city,
+            'checkIn': self.check_in.isoformat(),
+            'checkOut': self.check_out.isoformat(),
+            'nights': self.nights,
+            'hotel': self.hotel.to_dict(),
+            'price': round(self.price, 2),
+        }
+
+
+class Itinerary:
+    """One flight per leg plus the hotel stays between them."""
+
+    __slots__ = ('flights', 'stays', 'total')
+
+    def __init__(self, flights, stays, total):
+        self.flights = flights  # [(departure date, FlightOffer)] per leg
+        self.stays = stays
+        self.total = total
+
+    def in_currency(self, currency, rate):
+        stays = [Stay(stay.city, stay.hotel.in_currency(currency, rate), stay.check_in, stay.check_out)
+                 for stay in self.stays]
+        return Itinerary([(day, flight.in_currency(currency, rate)) for day, flight in self.flights],
+                         stays, round(self.total * rate, 2))
+
+    def to_dict(self):
+        return {
+            'legs': [{'date': day.isoformat(), 'flight': flight.to_dict()} for day, flight in self.flights],
+            'stays': [stay.to_dict() for stay in self.stays],
+            'totalPrice': round(self.total, 2),
+            'currency': self.flights[0][1].currency,
+        }
+
+    def __repr__(self):
+        return f"Itinerary({' -> '.join(day.isoformat() for day, _ in self.flights)} = {self.total})"
+
+
+def date_window(earliest, latest):
+    """Every date from earliest to latest inclusive."""
+    return [earliest + timedelta(days=offset) for offset in range((latest - earliest).days + 1)]
+
+
+def cheapest_fare(offers):
+    """The cheapest offer with a positive price, or None."""
+    priced = [offer for offer in offers or () if offer.price and offer.price > 0]
+    return min(priced, key=lambda offer: offer.price) if priced else None
+
+
+def cheapest_itineraries(fares, stays, min_nights=1, k=5, budget=None):
+    """
+    The k cheapest itineraries, cheapest first.
+
+    fares: per leg, {departure date: cheapest FlightOffer that day}.
+    stays: per stop (one fewer than legs), (city name, cheapest HotelOffer priced per night).
+    Consecutive departures are at least min_nights apart.
+    """
+    if not fares or len(stays) != len(fares) - 1 or k <= 0:
+        return []
+    limit = float('inf') if budget is None else budget
+
+    # frontier: departure date of the current leg -> k cheapest (cost, dates so far)
+    frontier = {day: [(fare.price, (day,))] for day, fare in fares[0].items() if fare.price <= limit}
+    for leg in range(1, len(fares)):
+        nightly = stays[leg - 1][1].price
+        next_frontier = {}
+        for day, fare in fares[leg].items():
+            candidates = []
+            for previous_day, partials in frontier.items():
+                nights = (day - previous_day).days
+                if nights < min_nights:
+                    continue
+                added = fare.price + nightly * nights
+                for cost, days in partials:
+                    if cost + added > limit:
+                        break  # partials are sorted; the rest cost more
+                    candidates.append((cost + added, days + (day,)))
+            if candidates:
+                next_frontier[day] = heapq.nsmallest(k, candidates)
+        frontier = next_frontier
+        if not frontier:
+            return []
+
+    best = heapq.nsmallest(k, (partial for partials in frontier.values() for partial in partials))
+    itineraries = []
+    for total, days in best:
+        flights = [(day, fares[leg][day]) for leg, day in enumerate(days)]
+        trip_stays = [Stay(city, hotel, days[stop], days[stop + 1]) for stop, (city, hotel) in enumerate(stays)]
+        itineraries.append(Itinerary(flights, trip_stays, total))
+    return itineraries
@@ -0,0 +1,62 @@
+"""
+Pluggable JSON codec for upstream decoding and response encoding.
+
+Uses orjson when installed, then ujson, then the stdlib json module.
+Set JSON_CODEC=orjson|ujson|json to force a particular backend.
+"""
+
+import json
+import os
+
+_BACKENDS = ('orjson', 'ujson', 'json')
+
+
+def _load_backend(name):
+    """Return (loads, dumps) for backend name; dumps returns UTF-8 bytes."""
+    if name == 'orjson':
+        import orjson
+
+        def dumps(obj, default=None, sort_keys=False):
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            return orjson.dumps(obj, default=default, option=option)
+
+        return orjson.loads, dumps
+
+    if name == 'ujson':
+        import ujson
+
+        def dumps(obj, default=None, sort_keys=False):
+            return ujson.dumps(obj, default=default, sort_keys=sort_keys,
+                               ensure_ascii=False).encode('utf-8')
+
+        return ujson.loads, dumps
+
+    def dumps(obj, default=None, sort_keys=False):
+        return json.dumps(obj, default=default, sort_keys=sort_keys, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    return json.loads, dumps
+
+
+def _select_backend(preferred=None):
+    candidates = (preferred,) if preferred else _BACKENDS
+    for name in candidates:
+        try:
+            return (name,) + _load_backend(name)
+        except ImportError:
+            continue
+    return ('json',) + _load_backend('json')
+
+
+BACKEND, _loads, _dumps = _select_backend(os.getenv('JSON_CODEC', '').strip().lower() or None)
+
+
+def loads(raw):
+    """Decode JSON text or bytes."""
+    return _loads(raw)
+
+
+def dumps(obj, default=None, sort_keys=False):
+    """Encode obj to UTF-8 JSON bytes, calling default for unsupported types."""
+    return _dumps(obj, default=default, sort_keys=sort_keys)
+
@@ -0,0 +1,202 @@
+"""
+Host-wide rate-limit storage for Flask-Limiter.
+
+Flask-Limiter's memory:// storage keeps counters per process, so with N
+gunicorn/waitress workers every client gets N times each limit. This
+module registers a sqlite:// storage scheme with the limits package: all
+workers on the host share one SQLite database in WAL mode. Each check is
+one short write transaction (BEGIN IMMEDIATE serializes concurrent
+increments across processes).
+
+URIs follow the SQLAlchemy convention: sqlite:///relative/path.db or
+sqlite:////absolute/path.db. For several hosts, use redis://host:6379
+instead (requires the redis package).
+
+The default database sits in this user's private app directory
+(runtime_paths.py), and the storage refuses a database file that is a
+symlink, not owned by us or open to other users - anyone who can write it
+can reset or exhaust every client's limits.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+
+from runtime_paths import app_runtime_dir, check_private_file
+
+logger = logging.getLogger(__name__)
+
+DB_FILE_NAME = 'ratelimit.db'
+
+# Expired rows of idle keys are purged once every this many writes per process
+PURGE_EVERY = 500
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS ratelimit_counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ratelimit_window (
+    key TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ratelimit_window_key_ts ON ratelimit_window (key, ts);
+'''
+
+
+def default_storage_uri():
+    """
+    Storage URI for RATELIMIT_STORAGE_URI: the env value, else a SQLite file
+    in the private app directory (per-process memory:// if that is unusable).
+    """
+    uri = os.getenv('RATELIMIT_STORAGE_URI')
+    if uri:
+        return uri
+    try:
+        return f'sqlite:///{os.path.join(app_runtime_dir(), DB_FILE_NAME)}'
+    except OSError as e:
+        logger.warning("Shared rate-limit storage unavailable (%s); limits are per worker", e)
+        return 'memory://'
+
+
+def _path_from_uri(uri):
+    path = uri.split('://', 1)[1] if '://' in uri else uri
+    # sqlite:///rel.db -> "rel.db", sqlite:////abs.db -> "/abs.db"
+    return path[1:] if path.startswith('/') else path
+
+
+def _claim_file(path):
+    """Create the database file private to us, or check that an existing one is."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    try:
+        check_private_file(fd, path)
+    finally:
+        os.close(fd)
+
+
+class SQLiteLimiterStorage(Storage, MovingWindowSupport):
+    """Fixed- and moving-window rate-limit counters in a shared SQLite file."""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        self.path = _path_from_uri(uri or default_storage_uri())
+        self.timeout = float(options.get('timeout', 5.0))
+        self._local = threading.local()
+        self._writes = 0
+        if self.path and self.path != ':memory:':
+            _claim_file(self.path)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection().executescript(_SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        """Connection for this thread, reopened after fork."""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            local.conn, local.pid = conn, os.getpid()
+        return conn
+
+    def _write(self, conn, fn):
+        """Run fn(conn) in one IMMEDIATE transaction (a host-wide write lock)."""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self._purge(conn)
+        return result
+
+    def _purge(self, conn, now=None):
+        now = now or time.time()
+        conn.execute('DELETE FROM ratelimit_counters WHERE expires_at <= ?', (now,))
+        # Moving-window expiries are at most a day for our limits
+        conn.execute('DELETE FROM ratelimit_window WHERE ts <= ?', (now - 86400,))
+
+    # Fixed window
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        row = self._connection().execute('''
+            INSERT INTO ratelimit_counters (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END,
+                expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+            RETURNING value
+        ''', (key, amount, now + expiry, now, now)).fetchone()
+        return row[0]
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM ratelimit_counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expires_at FROM ratelimit_counters WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    # Moving window
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+
+        def acquire(conn):
+            now = time.time()
+            cutoff = now - expiry
+            conn.execute('DELETE FROM ratelimit_window WHERE key = ? AND ts <= ?', (key, cutoff))
+            count = conn.execute('SELECT COUNT(*) FROM ratelimit_window WHERE key = ?', (key,)).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.executemany('INSERT INTO ratelimit_window (key, ts) VALUES (?, ?)', [(key, now)] * amount)
+            return True
+
+        return self._write(self._connection(), acquire)
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            'SELECT MIN(ts), COUNT(*) FROM ratelimit_window WHERE key = ? AND ts > ?', (key, now - expiry)
+        ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+    # Maintenance
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        def reset_all(conn):
+            deleted = conn.execute('DELETE FROM ratelimit_counters').rowcount
+            return deleted + conn.execute('DELETE FROM ratelimit_window').rowcount
+        return self._write(self._connection(), reset_all)
+
+    def clear(self, key):
+        def clear_key(conn):
+            conn.execute('DELETE FROM ratelimit_counters WHERE key = ?', (key,))
+            conn.execute('DELETE FROM ratelimit_window WHERE key = ?', (key,))
+        self._write(self._connection(), clear_key)
@@ -1,113 +1,319 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import (Blueprint, Flask, Response, abort, current_app, g, has_app_context, render_template, request,
+                   jsonify, session, redirect, stream_with_context, url_for)
+from flask.json.provider import DefaultJSONProvider
+import deadline
+import instrumentation
+import json_codec
+import profiling
+import logging
 import os
-import sqlite3
 import requests  # Added for enhanced Gemini API integration
+from bisect import bisect, insort
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 from dotenv import load_dotenv
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from amadeus_api import (search_flights as amadeus_search_flights,
-                          get_flight_status, search_cities, search_hotels as amadeus_search_hotels)
+from app_logging import configure_logging
+from limiter_storage import default_storage_uri  # also registers sqlite:// with Flask-Limiter
+from cache_backends import build_default_cache
+from cache_sweeper import build_default_sweeper
+from city_index import build_default_index
 from city_data import (get_city_info, get_available_cities, get_airport_codes, 
-                        format_city_info, AVAILABLE_CITIES, ESTIMATED_HOTEL_PRICES)
-import google.generativeai as genai
-from validation import (validate_date_range, validate_budget, validate_passenger_count,
+                        format_city_info, resolve_city_name, AVAILABLE_CITIES, ESTIMATED_HOTEL_PRICES)
+from offers import HotelOffer, offer_price, filter_flights, filter_and_sort_flights, FLIGHT_SORT_KEYS
+from fx import build_default_fx, format_money
+from http_cache import CachePolicy, StaticJSON, cached_json
+from prices import price_amount
+from quota import QuotaExhausted, build_default_quota, governing
+from itinerary import cheapest_fare, cheapest_itineraries, date_window
+from ranking import RankingWeights, top_k_flights, top_k_hotels
+from trip_optimizer import OBJECTIVES, optimize_trip
+from storage import build_default_storage
+from upstream import UpstreamClient
+from validation import (validate_date, validate_date_range, validate_budget, validate_passenger_count, validate_currency,
                         validate_city_code, validate_travel_class, sanitize_string)
 
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+logger = logging.getLogger(__name__)
 
 # Set up static folder in the project directory (ensure it exists)
 from pathlib import Path
 
-# Use the local static folder
-app = Flask(__name__, static_folder='static')
+class OfferJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by json_codec (orjson/ujson when installed) that
+    serializes FlightOffer/HotelOffer models directly.
+    """
+    # Key order is irrelevant to the frontend and sorting costs time on every response
+    sort_keys = False
+
+    def default(self, o):
+        if hasattr(o, 'to_dict'):
+            return o.to_dict()
+        return super().default(o)
+
+    def dumps(self, obj, **kwargs):
+        return json_codec.dumps(obj, default=self.default, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = json_codec.dumps(obj, default=self.default, sort_keys=self.sort_keys)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
 
 # Require SECRET_KEY - fail fast if not configured
 SECRET_KEY = os.getenv('SECRET_KEY')
 if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable must be set. Generate one with: python -c 'import secrets; print(secrets.token_hex(32))'")
-app.secret_key = SECRET_KEY
-
-# Configure rate limiting to prevent API abuse
-limiter = Limiter(
-    get_remote_address,
-    app=app,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://",
-)
-
-# In-memory cache for minimum hotel price lookups
-MIN_PRICE_CACHE = {}
-MIN_PRICE_CACHE_LOCK = Lock()
+
+# Rate limiting to prevent API abuse. Routes declare their limits with
+# rate_limit()/rate_limit_exempt; create_app() builds a Limiter per app and
+# applies them, so each app has its own storage and settings. Counters live
+# in RATELIMIT_STORAGE_URI: by default a SQLite file shared by all workers on
+# the host (limiter_storage.py), or redis:// across hosts.
+DEFAULT_RATE_LIMITS = ["200 per day", "50 per hour"]
+
+
+def rate_limit(limit_value, **options):
+    """Declare a route's rate limit (options as for Limiter.limit)."""
+    def declare(view):
+        view.rate_limits = getattr(view, 'rate_limits', ()) + ((limit_value, options),)
+        return view
+    return declare
+
+
+def rate_limit_exempt(view):
+    """Declare a route exempt from the default rate limits."""
+    view.rate_limit_exempt = True
+    return view
+
+
+def _init_limiter(app):
+    """A Limiter for app, with the declared limits applied to its registered views."""
+    limiter = Limiter(get_remote_address, default_limits=DEFAULT_RATE_LIMITS, strategy="moving-window")
+    limiter.init_app(app)
+    for endpoint, view in list(app.view_functions.items()):
+        if getattr(view, 'rate_limit_exempt', False):
+            limiter.exempt(view)
+        limited = view
+        for limit_value, options in getattr(view, 'rate_limits', ()):
+            limited = limiter.limit(limit_value, **options)(limited)
+        app.view_functions[endpoint] = limited
+    return limiter
+
+# Routes are registered on every app that create_app() builds
+routes = Blueprint('routes', __name__)
+
+# Response cache TTLs
 MIN_PRICE_CACHE_TTL = timedelta(hours=6)
 MIN_PRICE_MAX_WORKERS = 4  # Reduced from 8 to avoid rate limiting
+# Full flight search results, so sort/filter views of the same search are
+# answered from one upstream call
+FLIGHT_SEARCH_CACHE_TTL = timedelta(minutes=10)
+HOTEL_SEARCH_CACHE_TTL = timedelta(minutes=10)
+# Trip options returned by /optimize_trip (limit form field)
+TRIP_OPTIONS_DEFAULT = 5
+TRIP_OPTIONS_MAX = 20
+# Destinations /explore prices live at a time (each upstream request also takes a quota slot)
+EXPLORE_MAX_WORKERS = 4
+# /search_itinerary: flight searches are legs x window days, run this many at a time
+ITINERARY_MAX_LEGS = 6
+ITINERARY_MAX_WINDOW_DAYS = 3
+ITINERARY_MAX_WORKERS = 4
+# /batch_search: queries per request, distinct searches run at a time
+BATCH_MAX_QUERIES = 25
+BATCH_MAX_WORKERS = 4
+
+# Local city/airport autocomplete; Amadeus is only queried on misses
+CITY_SUGGESTION_LIMIT = 10
+# Full city list for the dropdowns, built once instead of per request
+ALL_CITIES = [
+    {
+        "name": city_name,
+        "country": city_data.get("country", ""),
+        "city_code": city_data.get("city_code", "")
+    }
+    for city_name, city_data in AVAILABLE_CITIES.items()
+]
+ALL_CITIES_JSON = StaticJSON({"available_cities": ALL_CITIES})
+
+# HTTP caching of the GET variants (http_cache.py). The city list only
+# changes with a deploy; suggestions and minimum prices follow the server
+# caches (city index merges, MIN_PRICE_CACHE_TTL).
+CITY_LIST_HTTP_CACHE = CachePolicy(max_age=3600, shared_max_age=86400, stale_while_revalidate=7 * 86400)
+CITY_SEARCH_HTTP_CACHE = CachePolicy(max_age=300, shared_max_age=3600, stale_while_revalidate=86400)
+MIN_PRICE_HTTP_CACHE = CachePolicy(max_age=1800, shared_max_age=3600,
+                                   stale_while_revalidate=int(MIN_PRICE_CACHE_TTL.total_seconds()))
+
+# Periodic batched sweep of expired api_cache rows (disabled when interval is 0)
+CACHE_SWEEP_INTERVAL = int(os.getenv('CACHE_SWEEP_INTERVAL', '0'))
+
+# Time budget for all upstream calls of one request (0 = unlimited); kept
+# under typical 30s proxy timeouts so slow requests fail fast instead of
+# being abandoned by the proxy mid-work
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '25'))
+
+
+class AppServices:
+    """Per-app dependencies, stored in app.extensions['travel_planner']."""
+
+    __slots__ = ('upstream', 'cache', 'storage', 'city_index', 'fx', 'quota', 'limiter', 'cache_sweeper')
+
+    def __init__(self, upstream, cache, storage, city_index, fx, quota, limiter=None, cache_sweeper=None):
+        self.upstream = upstream
+        self.cache = cache
+        self.storage = storage
+        self.city_index = city_index
+        self.fx = fx
+        self.quota = quota
+        self.limiter = limiter
+        self.cache_sweeper = cache_sweeper
+
+
+_default_app = None
+_default_app_lock = Lock()
+
+
+def default_app():
+    """App whose services back helpers called outside any app context, built on first use."""
+    global _default_app
+    if _default_app is None:
+        with _default_app_lock:
+            if _default_app is None:
+                _default_app = create_app({'CACHE_SWEEP_INTERVAL': 0})
+    return _default_app
+
+
+def _services():
+    """Services of the current app, or of default_app() outside one."""
+    target = current_app if has_app_context() else default_app()
+    return target.extensions['travel_planner']
+
+@routes.before_request
+def _start_request_deadline():
+    seconds = float(current_app.config['REQUEST_DEADLINE_SECONDS'])
+    if seconds > 0:
+        g.request_deadline = deadline.request_deadline(seconds)
+        g.request_deadline.__enter__()
+
+
+@routes.teardown_request
+def _end_request_deadline(exc):
+    budget = g.pop('request_deadline', None)
+    if budget is not None:
+        budget.__exit__(None, None, None)
+
+
+@routes.route('/metrics')
+@rate_limit_exempt
+def metrics():
+    """Latency histograms and counters of this worker in Prometheus text format."""
+    return instrumentation.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+@routes.route('/admin/profiles')
+@rate_limit_exempt
+def list_profiles():
+    """Recent request profiles of this worker; ?format=collapsed merges their stacks."""
+    if not profiling.admin_authorized():
+        abort(404)
+    store = profiling.store()
+    if request.args.get('format') == 'collapsed':
+        stacks = store.merged(route=request.args.get('route'))
+        return profiling.collapsed_text(stacks), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+    return jsonify({"profiles": store.summaries()})
 
-print(f"Flask app initialized with static_folder: {app.static_folder}")
 
-@app.route('/static/<path:filename>')
+@routes.route('/admin/profiles/<int:profile_id>')
+@rate_limit_exempt
+def get_profile(profile_id):
+    """One profile as collapsed-stack text for flamegraph.pl / speedscope."""
+    if not profiling.admin_authorized():
+        abort(404)
+    profile = profiling.store().get(profile_id)
+    if profile is None:
+        abort(404)
+    return profiling.collapsed_text(profile['stacks']), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+@routes.route('/static/<path:filename>')
 def static_files(filename):
     try:
-        return app.send_static_file(filename)
+        return current_app.send_static_file(filename)
     except Exception as e:
         return str(e), 404
 
-@app.route('/')
+@routes.route('/')
 def index():
     # Let Firebase handle authentication state on frontend
     # Users will be redirected by JavaScript if not authenticated
     return render_template('index.html')
 
 # Authentication routes
-@app.route('/login')
+@routes.route('/login')
 def login():
     return render_template('login.html')
 
-@app.route('/signup')
+@routes.route('/signup')
 def signup():
     return render_template('signup.html')
 
-@app.route('/logout')
+@routes.route('/logout')
 def logout():
     session.clear()
-    return redirect(url_for('login'))
+    return redirect(url_for('routes.login'))
+
+@routes.route('/cities')
+def list_cities():
+    """All predefined cities for the dropdowns (cacheable by browsers and CDNs)."""
+    return ALL_CITIES_JSON.response(CITY_LIST_HTTP_CACHE)
 
 # Your existing routes...
-@app.route('/search_cities', methods=['POST'])
+@routes.route('/search_cities', methods=['GET', 'POST'])
 def search_city():
     try:
-        query = request.form.get('query', '').strip()
+        query = request.values.get('query', '').strip()
+        cacheable = request.method == 'GET'
 
         if not query:
             # If no query, return all available cities from our predefined list
-            all_cities = []
-            for city_name, city_data in AVAILABLE_CITIES.items():
-                all_cities.append({
-                    "name": city_name,
-                    "country": city_data.get("country", ""),
-                    "city_code": city_data.get("city_code", "")
-                })
-            return jsonify({"available_cities": all_cities})
-        else:
-            # If there is a query, search using the Amadeus API
-            cities = search_cities(query)
-            return jsonify({"suggestions": cities})
+            return ALL_CITIES_JSON.response(CITY_LIST_HTTP_CACHE if cacheable else None)
+
+        # Answer from the local index; fall back to Amadeus only on a miss it hasn't just had
+        services = _services()
+        suggestions = services.city_index.search(query, limit=CITY_SUGGESTION_LIMIT)
+        if not suggestions and not services.city_index.recent_miss(query):
+            cities = services.upstream.search_cities(query)
+            if cities:
+                services.city_index.merge_upstream(cities)
+                suggestions = services.city_index.search(query, limit=CITY_SUGGESTION_LIMIT) or cities
+            else:
+                services.city_index.note_miss(query)
+        if cacheable:
+            return cached_json({"suggestions": suggestions}, CITY_SEARCH_HTTP_CACHE)
+        return jsonify({"suggestions": suggestions})
 
     except Exception as e:
-        print(f"Error in search_cities: {str(e)}")
+        logger.exception("Error in search_cities")
         return jsonify({"error": str(e)}), 500
  
 def get_db():
-    db_path = os.path.join(os.path.dirname(__file__), 'travel_planner.db')
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _services().storage.connect()
 
 def _collect_prices_for_date(dest_name, check_date, fetcher):
-    """Helper to collect hotel prices for a specific date."""
+    """
+    Hotel prices for a specific date, or None when the date was not
+    fetched (no time left in the request deadline, or the fetch failed) -
+    as opposed to [] for a date with no offers.
+    """
     import time
+    if not deadline.allows(0.3):
+        return None  # Request deadline leaves no room for this date
     time.sleep(0.3)  # 300ms delay to avoid Amadeus rate limiting (429 errors)
     
     check_in_str = check_date.strftime('%Y-%m-%d')
@@ -121,50 +327,67 @@ def _collect_prices_for_date(dest_name, check_date, fetcher):
             adults=1
         )
     except Exception as fetch_error:
-        print(f"Error fetching hotel data for {dest_name} on {check_in_str}: {fetch_error}")
-        return []
+        logger.warning("Error fetching hotel data for %s on %s: %s", dest_name, check_in_str, fetch_error)
+        return None
 
+    # Offer prices are already floats; legacy dicts may still carry display strings.
+    # Minimums are compared and cached in the canonical currency.
+    fx = _services().fx
     prices = []
-    if hotels:
-        import re
-        for hotel in hotels:
-            price = hotel.get('price', 0)
-            if isinstance(price, str):
-                price_match = re.search(r'[\d.]+', str(price).replace('₹', '').replace(',', ''))
-                if price_match:
-                    price = float(price_match.group())
-                else:
-                    continue
-            prices.append(price)
+    for hotel in hotels or ():
+        price = price_amount(offer_price(hotel))
+        if price is not None:
+            currency = hotel.get('currency') if isinstance(hotel, dict) else hotel.currency
+            prices.append(fx.convert(price, currency, fx.canonical))
     return prices
 
 
-def get_min_price_for_destination(dest_name, fetcher=amadeus_search_hotels, days=7):  # Reduced from 30 to avoid rate limits
-    """Fetch minimum hotel price for destination with caching and parallel lookups."""
+_MISSING = object()
+
+
+def _min_price_cache_key(dest_name, days=7):
+    return ('min_price', dest_name.strip().lower(), datetime.now().date(), days)
+
+
+def get_min_price_for_destination(dest_name, fetcher=None, days=7, cache=None):  # Reduced from 30 to avoid rate limits
+    """
+    Fetch minimum hotel price for destination with caching and parallel lookups.
+
+    fetcher and cache default to the current app's upstream.search_hotels
+    and cache backend.
+    """
+    services = _services()
+    if fetcher is None:
+        fetcher = services.upstream.search_hotels
+    if cache is None:
+        cache = services.cache
     dest_clean = dest_name.strip()
-    normalized = dest_clean.lower()
-    today = datetime.now().date()
-    cache_key = (normalized, today, days)
-    now = datetime.now()
+    cache_key = _min_price_cache_key(dest_clean, days)
 
-    with MIN_PRICE_CACHE_LOCK:
-        cached_entry = MIN_PRICE_CACHE.get(cache_key)
-        if cached_entry and now - cached_entry['timestamp'] < MIN_PRICE_CACHE_TTL:
-            return cached_entry['price']
+    cached_price = cache.get(cache_key, _MISSING)
+    instrumentation.count_cache_lookup('min_price', cached_price is not _MISSING)
+    if cached_price is not _MISSING:
+        return cached_price
 
     current_date = datetime.now()
     all_prices = []
+    complete = True  # every date was actually fetched
     # Reduced to 3 days to avoid rate limiting (was 7)
     days_to_check = min(days, 3)
     with ThreadPoolExecutor(max_workers=MIN_PRICE_MAX_WORKERS) as executor:
-        futures = [executor.submit(_collect_prices_for_date, dest_clean, current_date + timedelta(days=i), fetcher)
+        futures = [deadline.submit(executor, _collect_prices_for_date, dest_clean,
+                                   current_date + timedelta(days=i), fetcher)
                    for i in range(days_to_check)]
         for future in as_completed(futures):
             try:
                 prices = future.result()
-                all_prices.extend(prices)
             except Exception as e:
-                print(f"Error retrieving prices from future: {e}")
+                logger.warning("Error retrieving prices from future: %s", e)
+                prices = None
+            if prices is None:
+                complete = False
+            else:
+                all_prices.extend(prices)
 
     min_prices = [price for price in all_prices if price and price > 0]
     min_price = min(min_prices) if min_prices else None
@@ -174,40 +397,132 @@ def get_min_price_for_destination(dest_name, fetcher=amadeus_search_hotels, days
         normalized_dest = dest_clean.lower()
         min_price = ESTIMATED_HOTEL_PRICES.get(normalized_dest)
         if min_price:
-            print(f"Using estimated hotel price for {dest_clean}: ₹{min_price}")
+            min_price = _services().fx.convert(min_price, 'INR', _services().fx.canonical)
+            logger.debug("Using estimated hotel price for %s: %s", dest_clean, min_price)
 
-    with MIN_PRICE_CACHE_LOCK:
-        MIN_PRICE_CACHE[cache_key] = {'price': min_price, 'timestamp': now}
+    # A minimum over only some of the dates (skipped or failed) is partial; don't keep it
+    if complete:
+        cache.set(cache_key, min_price, MIN_PRICE_CACHE_TTL.total_seconds())
 
     return min_price
 
 
-@app.route('/get_min_prices', methods=['POST'])
-@limiter.limit("30 per minute")  # Higher limit as this uses cache
+def _flight_cache_key(origin, destination, departure_date, return_date, adults, travel_class):
+    return ('flights', origin, destination, departure_date, return_date or None, adults, travel_class,
+            _services().fx.canonical)
+
+
+def _hotel_cache_key(city_name, check_in, check_out, adults):
+    return ('hotels', city_name.lower(), check_in, check_out, adults, _services().fx.canonical)
+
+
+def get_flight_offers(origin, destination, departure_date, return_date=None, adults=1,
+                      travel_class='ECONOMY', quota=None):
+    """
+    Get every parsed flight offer for a search, cached for FLIGHT_SEARCH_CACHE_TTL.
+
+    Offers are priced in the canonical currency (fx.py), so one entry serves
+    every display currency; convert with services.fx.convert_offers().
+    Fan-out routes pass the app's quota governor: when the search has to go
+    upstream, each of its HTTP requests takes a slot (QuotaExhausted if
+    none is free); cache hits take none.
+    """
+    services = _services()
+    cache_key = _flight_cache_key(origin, destination, departure_date, return_date, adults, travel_class)
+
+    flights = services.cache.get(cache_key)
+    instrumentation.count_cache_lookup('flights', flights is not None)
+    if flights is not None:
+        return flights
+
+    with governing(quota):
+        flights = services.upstream.search_flights(
+            origin=origin,
+            destination=destination,
+            departure_date=departure_date,
+            return_date=return_date or None,
+            adults=adults,
+            travel_class=travel_class,
+            currency=services.fx.canonical,
+            max_results=None
+        )
+    # Amadeus may still answer in another currency
+    flights = services.fx.to_canonical(flights or [])
+
+    # Empty results usually mean an upstream error; don't pin them in the cache
+    if flights:
+        services.cache.set(cache_key, flights, FLIGHT_SEARCH_CACHE_TTL.total_seconds())
+
+    return flights
+
+
+def get_hotel_offers(city_name, check_in, check_out, adults=1, quota=None):
+    """
+    Every hotel offer for a stay in the canonical currency, cached for
+    HOTEL_SEARCH_CACHE_TTL (quota as for get_flight_offers).
+    """
+    services = _services()
+    cache_key = _hotel_cache_key(city_name, check_in, check_out, adults)
+
+    hotels = services.cache.get(cache_key)
+    instrumentation.count_cache_lookup('hotels', hotels is not None)
+    if hotels is not None:
+        return hotels
+
+    with governing(quota):
+        hotels = services.upstream.search_hotels(
+            city_name=city_name,
+            check_in=check_in,
+            check_out=check_out,
+            adults=adults
+        )
+    hotels = services.fx.to_canonical(hotels or [])
+
+    if hotels:
+        services.cache.set(cache_key, hotels, HOTEL_SEARCH_CACHE_TTL.total_seconds())
+
+    return hotels
+
+
+def _display_currency(fx):
+    """Currency the response should be priced in (currency field, default canonical)."""
+    return request.values.get('currency', '').strip().upper() or fx.canonical
+
+
+@routes.route('/get_min_prices', methods=['GET', 'POST'])
+@rate_limit("30 per minute")  # Higher limit as this uses cache
 def get_min_prices():
     try:
-        origin = request.form.get('startPoint', '').strip()
-        destination = request.form.get('destination', '').strip()
+        origin = request.values.get('startPoint', '').strip()
+        destination = request.values.get('destination', '').strip()
 
         if not origin or not destination:
             return jsonify({"error": "Origin and destination are required"}), 400
 
-        dest_name = destination.split(",")[0].strip()
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
 
-        print(f"Getting min hotel prices for {dest_name}")
+        dest_name = destination.split(",")[0].strip()
 
         min_price = get_min_price_for_destination(dest_name)
 
-        return jsonify({
-            'min_hotel_price': f"₹{min_price:,.0f}" if min_price else "N/A"
-        })
+        result = {
+            'min_hotel_price': format_money(fx.convert(min_price, fx.canonical, currency), currency)
+                               if min_price else "N/A"
+        }
+        if request.method == 'GET':
+            return cached_json(result, MIN_PRICE_HTTP_CACHE)
+        return jsonify(result)
 
     except Exception as e:
-        print(f"Error in get_min_prices: {str(e)}")
+        logger.exception("Error in get_min_prices")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/search_flights', methods=['POST'])
-@limiter.limit("10 per minute")  # Limit to prevent API quota exhaustion
+@routes.route('/search_flights', methods=['POST'])
+@rate_limit("10 per minute")  # Limit to prevent API quota exhaustion
 def search_flights():
     try:
         # Use the reliable city codes sent from the frontend
@@ -218,6 +533,9 @@ def search_flights():
         return_date = request.form.get('endDate', '').strip()
         adults = request.form.get('adults', '1')
         travel_class = request.form.get('travelClass', 'ECONOMY').upper()
+        sort_by = request.form.get('sort', 'best').strip().lower()
+        non_stop = request.form.get('nonStop', '').strip().lower() in ('1', 'true', 'on', 'yes')
+        max_stops = request.form.get('maxStops', '').strip()
         
         # Validate required fields
         if not origin_code or not dest_code or not departure_date:
@@ -248,47 +566,48 @@ def search_flights():
         if not is_valid:
             return jsonify({"error": error}), 400
         
-        print(f"Flight search - Origin Code: {origin_code}, Destination Code: {dest_code}, Date: {departure_date}")
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
         
-        # Search for flights using Amadeus API with INR currency
-        flights = amadeus_search_flights(
-            origin=origin_code,
-            destination=dest_code,
-            departure_date=departure_date,
-            return_date=return_date if return_date else None,
-            adults=adults,
-            travel_class=travel_class,
-            currency='INR'
+        # Validate result view options
+        if sort_by != 'best' and sort_by not in FLIGHT_SORT_KEYS:
+            return jsonify({"error": f"Sort must be one of: best, {', '.join(FLIGHT_SORT_KEYS)}"}), 400
+        try:
+            weights = RankingWeights.from_mapping(request.form)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if max_stops:
+            if not max_stops.isdigit():
+                return jsonify({"error": "Max stops must be a non-negative integer"}), 400
+            max_stops = int(max_stops)
+        else:
+            max_stops = None
+        
+        # Search for flights using Amadeus API (cached per search in the canonical currency)
+        flights = get_flight_offers(
+            origin_code, dest_code, departure_date, return_date, adults, travel_class
         )
+        if sort_by == 'best':
+            # Best 3 of the whole result by weighted score
+            flights = top_k_flights(filter_flights(flights, non_stop, max_stops), k=3, weights=weights)
+        else:
+            flights = filter_and_sort_flights(flights, sort_by=sort_by, non_stop=non_stop, max_stops=max_stops)[:3]
         
         if flights:
-            # Return raw data without formatting - let frontend handle formatting
-            limited_flights = flights[:3]
-            for flight in limited_flights:
-                # Ensure price is numeric (remove any formatting)
-                if 'price' in flight:
-                    price_val = flight['price']
-                    if isinstance(price_val, str):
-                        # Extract numeric value from formatted string
-                        import re
-                        price_match = re.search(r'[\d.]+', str(price_val).replace('₹', '').replace(',', ''))
-                        if price_match:
-                            flight['price'] = float(price_match.group())
-                        else:
-                            flight['price'] = 0
-                if 'currency' not in flight:
-                    flight['currency'] = 'INR'
-            
-            return jsonify(limited_flights)
+            # Offers already carry numeric prices - let frontend handle formatting
+            return jsonify(fx.convert_offers(flights, currency))
         
         return jsonify({"error": "No flights found for the specified criteria"}), 404
     
     except Exception as e:
-        print(f"Error in search_flights: {str(e)}")
+        logger.exception("Error in search_flights")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/search_hotels', methods=['POST'])
-@limiter.limit("10 per minute")  # Limit to prevent API quota exhaustion
+@routes.route('/search_hotels', methods=['POST'])
+@rate_limit("10 per minute")  # Limit to prevent API quota exhaustion
 def search_hotels():
     try:
         destination = sanitize_string(request.form.get('destination', '').strip())
@@ -311,82 +630,70 @@ def search_hotels():
             return jsonify({"error": error}), 400
         adults = int(adults)
         
-        print(f"Hotel search - Destination: {destination}")
+        try:
+            weights = RankingWeights.from_mapping(request.form)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
         
         dest_base = destination.split(",")[0].strip()
-        print(f"Parsed destination: {dest_base}")
         
-        # Get hotel data (enhanced to get more real data)
-        hotels = amadeus_search_hotels(
-            city_name=dest_base,
-            check_in=check_in_date,
-            check_out=check_out_date,
-            adults=adults
-        )
+        # Every offer for the stay (cached per search in the canonical currency)
+        hotels = get_hotel_offers(dest_base, check_in_date, check_out_date, adults)
             
         if hotels:
-            # Return raw data without formatting - let frontend handle formatting
-            limited_hotels = hotels[:3]
-            for hotel in limited_hotels:
-                # Ensure price is numeric
-                if 'price' in hotel:
-                    price_val = hotel['price']
-                    if isinstance(price_val, str):
-                        # Extract numeric value from formatted string
-                        import re
-                        price_match = re.search(r'[\d.]+', str(price_val).replace('₹', '').replace(',', ''))
-                        if price_match:
-                            hotel['price'] = float(price_match.group())
-                        else:
-                            hotel['price'] = 0
-                if 'currency' not in hotel:
-                    hotel['currency'] = 'INR'
-            
-            return jsonify(limited_hotels)
+            # Best 3 by price and rating; converted on the way out, let frontend handle formatting
+            best = top_k_hotels(hotels, k=3, weights=weights)
+            return jsonify(fx.convert_offers(best, currency))
         
         # If no hotels from API, return estimated prices as fallback
         dest_lower = dest_base.lower()
         if dest_lower in ESTIMATED_HOTEL_PRICES:
             estimated_price = ESTIMATED_HOTEL_PRICES[dest_lower]
             fallback_hotels = [
-                {
-                    'name': f'Hotels in {dest_base}',
-                    'rating': 4.0,
-                    'price': estimated_price,
-                    'currency': 'INR',
-                    'location': f'{dest_base} City Center',
-                    'description': f'Estimated average hotel price in {dest_base}. Actual prices may vary.',
-                    'isEstimate': True
-                }
+                HotelOffer(
+                    name=f'Hotels in {dest_base}',
+                    rating=4.0,
+                    price=fx.convert(estimated_price, 'INR', currency),
+                    currency=currency,
+                    location=f'{dest_base} City Center',
+                    description=f'Estimated average hotel price in {dest_base}. Actual prices may vary.',
+                    is_estimate=True
+                )
             ]
-            print(f"Returning fallback hotel data for {dest_base}: ₹{estimated_price}")
+            logger.debug("Returning fallback hotel data for %s: %s", dest_base, estimated_price)
             return jsonify(fallback_hotels)
 
         return jsonify([])  # Return empty array if no data available
     
     except Exception as e:
-        print(f"Error in search_hotels: {str(e)}")
+        logger.exception("Error in search_hotels")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/flight_status', methods=['POST'])
+@routes.route('/flight_status', methods=['POST'])
 def flight_status():
     try:
         carrier_code = request.form['carrierCode']
         flight_number = request.form['flightNumber']
         departure_date = request.form['departureDate']
         
-        status = get_flight_status(carrier_code, flight_number, departure_date)
+        status = _services().upstream.get_flight_status(carrier_code, flight_number, departure_date)
         
         if status:
             return jsonify(status)
         else:
             return jsonify({"error": "Flight status not found"}), 404
     except Exception as e:
-        print(f"Error in flight_status: {str(e)}")
+        logger.exception("Error in flight_status")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/chatbot', methods=['POST'])
-@limiter.limit("20 per minute")  # Slightly higher limit for chatbot
+@routes.route('/chatbot', methods=['POST'])
+@rate_limit("20 per minute")  # Slightly higher limit for chatbot
 def chatbot():
     user_message = request.form['message']
     destination = request.form.get('destination', '').strip()
@@ -394,7 +701,12 @@ def chatbot():
     start_date = request.form.get('startDate', '')
     end_date = request.form.get('endDate', '')
 
-    if not GEMINI_API_KEY:
+    upstream = _services().upstream
+    fx = _services().fx
+    currency = _display_currency(fx)
+    if not fx.supports(currency):
+        currency = fx.canonical
+    if not upstream.gemini_enabled:
         return jsonify({"response": "API key is missing. Please check your configuration."})
 
     # Check if the question is about flights or hotels
@@ -423,12 +735,8 @@ def chatbot():
             from datetime import datetime
             departure_date = start_date if start_date else datetime.now().strftime('%Y-%m-%d')
             
-            flights = amadeus_search_flights(
-                origin=origin_codes[0],
-                destination=dest_codes[0], 
-                departure_date=departure_date,
-                adults=1,
-                currency='INR'
+            flights = top_k_flights(
+                get_flight_offers(origin_codes[0], dest_codes[0], departure_date, adults=1)
             )
             
             if not flights:
@@ -436,11 +744,11 @@ def chatbot():
             
             # Format flight information with HTML - use camelCase properties
             response = f"Here are the available flights from {origin_name} to {dest_name}:<br><br>"
-            for flight in flights[:3]:  # Limit to 3 flights
-                price = flight.get('price', 'N/A')
-                airline = flight.get('airline', 'Unknown Airline')
-                departure = flight.get('departureTime', 'N/A')
-                flight_num = flight.get('flightNumber', 'N/A')
+            for flight in fx.convert_offers(flights, currency):  # Top 3 flights
+                price = flight.price
+                airline = flight.airline or 'Unknown Airline'
+                departure = flight.departure_time or 'N/A'
+                flight_num = flight.flight_number or 'N/A'
                 
                 # Format the departure time for display
                 try:
@@ -451,12 +759,12 @@ def chatbot():
                 except:
                     departure = 'N/A'
                 
-                response += f"• <strong>{airline} {flight_num}</strong>: ₹{price:,.0f} - Departure: {departure}<br>"
+                response += f"• <strong>{airline} {flight_num}</strong>: {format_money(price, currency)} - Departure: {departure}<br>"
             
             return jsonify({"response": response})
             
         except Exception as e:
-            print(f"Error getting flight data: {str(e)}")
+            logger.warning("Chatbot flight lookup failed: %s", e)
             return jsonify({"response": f"Sorry, I encountered an error while searching for flights from {origin if origin else 'your location'} to {destination if destination else 'your destination'}."})
     
     # If question is about hotels
@@ -470,38 +778,26 @@ def chatbot():
             check_in = start_date if start_date else datetime.now().strftime('%Y-%m-%d')
             check_out = end_date if end_date else (datetime.now() + timedelta(days=2)).strftime('%Y-%m-%d')
             
-            hotels = amadeus_search_hotels(
-                city_name=destination,
-                check_in=check_in,
-                check_out=check_out,
-                adults=1
-            )
+            hotels = get_hotel_offers(destination, check_in, check_out, adults=1)
             
             if not hotels:
                 return jsonify({"response": f"I don't have any hotel information available for {destination} at the moment."})
             
             # Format hotel information with HTML
             response = f"Here are the available hotels in {destination}:<br><br>"
-            for hotel in hotels[:3]:  # Limit to 3 hotels
-                name = hotel.get('name', 'Unknown Hotel')
-                price = hotel.get('price', 'N/A')
-                rating = hotel.get('rating', 'N/A')
-                response += f"• <strong>{name}</strong>: ₹{price}/night - Rating: {rating}/5<br>"
+            for hotel in fx.convert_offers(top_k_hotels(hotels), currency):  # Top 3 hotels
+                name = hotel.name or 'Unknown Hotel'
+                price = hotel.price
+                rating = hotel.rating if hotel.rating is not None else 'N/A'
+                response += f"• <strong>{name}</strong>: {format_money(price, currency)}/night - Rating: {rating}/5<br>"
             
             return jsonify({"response": response})
             
         except Exception as e:
-            print(f"Error getting hotel data: {str(e)}")
+            logger.warning("Chatbot hotel lookup failed: %s", e)
             return jsonify({"response": f"Sorry, I encountered an error while searching for hotels in {destination}."})
 
-    # For other questions, use the enhanced Gemini API
-    # Using gemini-1.5-flash as gemini-pro has been deprecated
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={GEMINI_API_KEY}"
-
-    headers = {
-        "Content-Type": "application/json"
-    }
-
+    # For other questions, use the enhanced Gemini API (upstream.generate_content)
     # Enhanced travel context prompt
     date_context = ""
     if start_date and end_date:
@@ -541,12 +837,11 @@ Please provide a detailed, helpful response that addresses their question thorou
     }
 
     try:
-        response = requests.post(api_url, headers=headers, json=data, timeout=30)
+        response = upstream.generate_content(data, timeout=30)
         
         # Log detailed error information
         if response.status_code != 200:
-            print(f"Gemini API Error - Status: {response.status_code}")
-            print(f"Response: {response.text}")
+            logger.warning("Gemini API error %s: %s", response.status_code, response.text[:500])
             error_msg = "Sorry, the AI assistant is temporarily unavailable. "
             if response.status_code == 404:
                 error_msg += "The API endpoint might have changed or the API key is invalid."
@@ -569,11 +864,13 @@ Please provide a detailed, helpful response that addresses their question thorou
                 ai_response = ai_response.replace('\n\n', '<br><br>')
                 ai_response = ai_response.replace('\n', '<br>')
                 
-                # Check if response seems incomplete and try to complete it
-                if len(ai_response.strip()) < 100 or ai_response.strip().endswith('•') or ai_response.strip().endswith(','):
+                # Check if response seems incomplete and try to complete it (when the
+                # request deadline leaves time for a second generation)
+                if ((len(ai_response.strip()) < 100 or ai_response.strip().endswith('•') or ai_response.strip().endswith(','))
+                        and deadline.allows(5)):
                     # Make another request to get a more complete response
                     data['contents'][0]['parts'][0]['text'] = f"{data['contents'][0]['parts'][0]['text']}\n\nPlease provide a complete, detailed response of at least 200 words."
-                    response = requests.post(api_url, headers=headers, json=data)
+                    response = upstream.generate_content(data)
                     if response.status_code == 200:
                         response_data = response.json()
                         if 'candidates' in response_data and len(response_data['candidates']) > 0:
@@ -585,27 +882,557 @@ Please provide a detailed, helpful response that addresses their question thorou
                 
                 return jsonify({"response": ai_response})
             else:
-                print(f"No candidates in Gemini response: {response_data}")
+                logger.warning("No candidates in Gemini response: %s", str(response_data)[:500])
                 return jsonify({"response": "Sorry, I couldn't generate a response. Please try again."})
         else:
             return jsonify({"response": "Sorry, I encountered an error. Please try again later."})
     
     except requests.exceptions.Timeout:
-        print(f"Gemini API Timeout")
+        logger.warning("Gemini API timeout")
         return jsonify({"response": "The AI assistant is taking too long to respond. Please try a shorter question."})
     except requests.exceptions.RequestException as e:
-        print(f"Gemini API Request Error: {str(e)}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Status Code: {e.response.status_code}")
-            print(f"Response Text: {e.response.text[:500]}")
+        if getattr(e, 'response', None) is not None:
+            logger.warning("Gemini API request error: %s (%s: %s)", e, e.response.status_code, e.response.text[:500])
+        else:
+            logger.warning("Gemini API request error: %s", e)
         return jsonify({"response": f"Sorry, I encountered a network error. The AI service might be unavailable."})
     except Exception as e:
-        print(f"Unexpected error in chatbot: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in chatbot")
         return jsonify({"response": f"Sorry, an unexpected error occurred. Please try again."})
 
-@app.route('/search', methods=['POST'])
+@routes.route('/optimize_trip', methods=['POST'])
+@rate_limit("10 per minute")  # Same upstream cost as a full search
+def optimize_trip_route():
+    """Best (or cheapest) flight + hotel combinations within a budget."""
+    try:
+        origin_code = request.form.get('startPointCode', '').strip().upper()
+        dest_code = request.form.get('destinationCode', '').strip().upper()
+        destination = sanitize_string(request.form.get('destination', '').strip())
+        departure_date = request.form.get('startDate', '').strip()
+        return_date = request.form.get('endDate', '').strip()
+        budget = request.form.get('budget', '').strip()
+        adults = request.form.get('adults', '1')
+        travel_class = request.form.get('travelClass', 'ECONOMY').upper()
+        objective = request.form.get('objective', 'best').strip().lower()
+        limit = request.form.get('limit', '').strip()
+
+        if not origin_code or not dest_code or not destination or not departure_date or not return_date:
+            return jsonify({"error": "Origin, destination, and travel dates are required"}), 400
+
+        for code, field in ((origin_code, "Origin"), (dest_code, "Destination")):
+            is_valid, error = validate_city_code(code, field)
+            if not is_valid:
+                return jsonify({"error": error}), 400
+
+        is_valid, error = validate_date_range(departure_date, return_date)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_budget(budget)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_passenger_count(adults, "Adults")
+        if not is_valid:
+            return jsonify({"error": error}), 400
+        adults = int(adults)
+
+        is_valid, error = validate_travel_class(travel_class)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        if objective not in OBJECTIVES:
+            return jsonify({"error": f"Objective must be one of: {', '.join(OBJECTIVES)}"}), 400
+        if limit and not (limit.isdigit() and 1 <= int(limit) <= TRIP_OPTIONS_MAX):
+            return jsonify({"error": f"Limit must be between 1 and {TRIP_OPTIONS_MAX}"}), 400
+        limit = int(limit) if limit else TRIP_OPTIONS_DEFAULT
+        try:
+            weights = RankingWeights.from_mapping(request.form)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        nights = max((datetime.strptime(return_date, '%Y-%m-%d')
+                      - datetime.strptime(departure_date, '%Y-%m-%d')).days, 1)
+        dest_base = destination.split(",")[0].strip()
+
+        # Both offer sets are cached in the canonical currency; fetch them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            flights_future = deadline.submit(executor, get_flight_offers, origin_code, dest_code,
+                                             departure_date, return_date, adults, travel_class)
+            hotels_future = deadline.submit(executor, get_hotel_offers, dest_base, departure_date,
+                                            return_date, adults)
+            flights = flights_future.result()
+            # Amadeus prices the whole stay; the optimizer works in nightly rates
+            hotels = [hotel.per_night(nights) for hotel in hotels_future.result()]
+
+        options = optimize_trip(flights, hotels, nights, fx.convert(float(budget), currency, fx.canonical),
+                                k=limit, objective=objective, weights=weights)
+        rate = fx.rate(fx.canonical, currency)
+        return jsonify({
+            "options": [option.in_currency(currency, rate) for option in options],
+            "nights": nights,
+            "budget": float(budget),
+            "currency": currency,
+            "considered": {"flights": len(flights), "hotels": len(hotels)},
+        })
+
+    except Exception as e:
+        logger.exception("Error in /optimize_trip")
+        return jsonify({"error": str(e)}), 500
+
+def _explore_destinations(origin_code):
+    """AVAILABLE_CITIES entries other than the origin's own city."""
+    for name, info in AVAILABLE_CITIES.items():
+        codes = {info.get('city_code')} | {airport['code'] for airport in info.get('airports', ())}
+        if origin_code not in codes:
+            yield name, info
+
+
+def _cheapest(offers):
+    prices = [offer.price for offer in offers or () if offer.price and offer.price > 0]
+    return min(prices) if prices else None
+
+
+def _cached_destination_prices(entry, search):
+    """Fill entry from cached and precomputed prices only (no upstream calls)."""
+    services = _services()
+    flights = services.cache.get(_flight_cache_key(search['origin'], entry['cityCode'], search['departure_date'],
+                                                   search['return_date'], search['adults'], search['travel_class']))
+    instrumentation.count_cache_lookup('flights', flights is not None)
+    if _cheapest(flights) is not None:
+        entry['flightPrice'], entry['sources']['flight'] = _cheapest(flights), 'cache'
+
+    hotels = services.cache.get(_hotel_cache_key(entry['city'], search['departure_date'], search['return_date'],
+                                                 search['adults']))
+    instrumentation.count_cache_lookup('hotels', hotels is not None)
+    if _cheapest(hotels) is not None:
+        # Hotel searches price the whole stay; everything below is per night
+        entry['hotelPerNight'], entry['sources']['hotel'] = _cheapest(hotels) / search['nights'], 'cache'
+        return
+    # Next best: the 7-day minimum /get_min_prices keeps, then the static estimate
+    min_price = services.cache.get(_min_price_cache_key(entry['city']), _MISSING)
+    instrumentation.count_cache_lookup('min_price', min_price is not _MISSING)
+    if min_price not in (_MISSING, None):
+        entry['hotelPerNight'], entry['sources']['hotel'] = min_price, 'min_price'
+        return
+    estimate = ESTIMATED_HOTEL_PRICES.get(entry['city'].lower())
+    if estimate:
+        entry['hotelPerNight'] = services.fx.convert(estimate, 'INR', services.fx.canonical)
+        entry['sources']['hotel'] = 'estimate'
+
+
+def _live_destination_prices(entry, search):
+    """Fetch the prices entry still lacks, each upstream request under the app's quota governor."""
+    quota = _services().quota
+    try:
+        if entry['flightPrice'] is None:
+            flights = get_flight_offers(search['origin'], entry['cityCode'], search['departure_date'],
+                                        search['return_date'], search['adults'], search['travel_class'],
+                                        quota=quota)
+            entry['flightPrice'], entry['sources']['flight'] = _cheapest(flights), 'live'
+        if entry['hotelPerNight'] is None:
+            hotels = get_hotel_offers(entry['city'], search['departure_date'], search['return_date'],
+                                      search['adults'], quota=quota)
+            stay_total = _cheapest(hotels)
+            entry['hotelPerNight'] = stay_total / search['nights'] if stay_total is not None else None
+            entry['sources']['hotel'] = 'live'
+    except QuotaExhausted:
+        entry['error'] = "Upstream quota exhausted"
+    except Exception as e:
+        logger.warning("Error pricing %s for /explore: %s", entry['city'], e)
+        entry['error'] = "Price lookup failed"
+    return entry
+
+
+def _explore_stream(entries, search, budget, nights, currency):
+    """NDJSON lines: one per destination as it resolves (with its rank so far), then the full ranking."""
+    fx = _services().fx
+    rate = fx.rate(fx.canonical, currency)
+    ranked = []  # (canonical total, city) of the priced destinations so far
+
+    def line(entry):
+        total = None
+        if entry['flightPrice'] is not None and entry['hotelPerNight'] is not None:
+            total = entry['flightPrice'] + entry['hotelPerNight'] * nights
+            insort(ranked, (total, entry['city']))
+        destination = dict(entry, currency=currency, nights=nights)
+        for field in ('flightPrice', 'hotelPerNight'):
+            if entry[field] is not None:
+                destination[field] = round(entry[field] * rate, 2)
+        destination['totalPrice'] = round(total * rate, 2) if total is not None else None
+        destination['withinBudget'] = total is not None and total <= budget
+        rank = bisect(ranked, (total, entry['city'])) if total is not None else None
+        return json_codec.dumps({'type': 'destination', 'rank': rank, 'destination': destination}) + b"\n"
+
+    pending = []
+    for entry in entries:
+        _cached_destination_prices(entry, search)
+        if entry['flightPrice'] is None or entry['hotelPerNight'] is None:
+            pending.append(entry)
+        else:
+            yield line(entry)
+
+    if pending:
+        executor = ThreadPoolExecutor(max_workers=min(EXPLORE_MAX_WORKERS, len(pending)))
+        try:
+            futures = [deadline.submit(executor, _live_destination_prices, entry, search) for entry in pending]
+            for future in as_completed(futures):
+                yield line(future.result())
+        finally:
+            # A client that disconnects mid-stream leaves nothing worth fetching
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    yield json_codec.dumps({
+        'type': 'done',
+        'ranking': [city for _, city in ranked],
+        'withinBudget': [city for total, city in ranked if total <= budget],
+        'unpriced': [entry['city'] for entry in entries
+                     if entry['flightPrice'] is None or entry['hotelPerNight'] is None],
+        'budget': round(budget * rate, 2),
+        'currency': currency,
+        'nights': nights,
+    }) + b"\n"
+
+
+@routes.route('/explore', methods=['POST'])
+@rate_limit("5 per minute")  # Fans out to every destination
+def explore():
+    """
+    Every destination in AVAILABLE_CITIES ranked by estimated trip cost
+    (cheapest flight + cheapest hotel night x nights) from one origin.
+
+    Streams NDJSON: destinations priced from the caches come first, the
+    rest as their live lookups complete; the last line is the ranking.
+    """
+    try:
+        origin_code = request.form.get('startPointCode', '').strip().upper()
+        departure_date = request.form.get('startDate', '').strip()
+        return_date = request.form.get('endDate', '').strip()
+        budget = request.form.get('budget', '').strip()
+        adults = request.form.get('adults', '1')
+        travel_class = request.form.get('travelClass', 'ECONOMY').upper()
+
+        if not origin_code or not departure_date or not return_date:
+            return jsonify({"error": "Origin and travel dates are required"}), 400
+
+        is_valid, error = validate_city_code(origin_code, "Origin")
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_date_range(departure_date, return_date)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_budget(budget)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_passenger_count(adults, "Adults")
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        is_valid, error = validate_travel_class(travel_class)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        nights = max((datetime.strptime(return_date, '%Y-%m-%d')
+                      - datetime.strptime(departure_date, '%Y-%m-%d')).days, 1)
+        search = {'origin': origin_code, 'departure_date': departure_date, 'return_date': return_date,
+                  'adults': int(adults), 'travel_class': travel_class, 'nights': nights}
+        entries = [{'city': name, 'country': info.get('country', ''), 'cityCode': info.get('city_code', ''),
+                    'flightPrice': None, 'hotelPerNight': None, 'sources': {'flight': None, 'hotel': None}}
+                   for name, info in _explore_destinations(origin_code)]
+
+        return Response(stream_with_context(_explore_stream(
+            entries, search, fx.convert(float(budget), currency, fx.canonical), nights, currency
+        )), mimetype='application/x-ndjson')
+
+    except Exception as e:
+        logger.exception("Error in /explore")
+        return jsonify({"error": str(e)}), 500
+
+def _leg_fare(origin, destination, day, adults, travel_class):
+    return cheapest_fare(get_flight_offers(origin, destination, day.isoformat(), None, adults, travel_class,
+                                           quota=_services().quota))
+
+
+def _stay_rate(city_name, check_in, check_out, adults):
+    """Cheapest hotel for the window, priced per night (Amadeus prices the whole window)."""
+    hotel = cheapest_fare(get_hotel_offers(city_name, check_in.isoformat(), check_out.isoformat(), adults,
+                                           quota=_services().quota))
+    return hotel.per_night((check_out - check_in).days) if hotel is not None else None
+
+
+def _city_of(code):
+    """City name for an airport or city code (the code itself outside AVAILABLE_CITIES)."""
+    return resolve_city_name(code) or code
+
+
+def _parse_legs(form):
+    """Legs from the repeated legOrigin/legDestination/legEarliest/legLatest fields, or (None, error)."""
+    columns = [form.getlist(field) for field in ('legOrigin', 'legDestination', 'legEarliest', 'legLatest')]
+    if len({len(column) for column in columns}) != 1:
+        return None, "Each leg needs legOrigin, legDestination, legEarliest and legLatest"
+    if not 2 <= len(columns[0]) <= ITINERARY_MAX_LEGS:
+        return None, f"An itinerary needs between 2 and {ITINERARY_MAX_LEGS} legs"
+
+    legs = []
+    for number, (origin, destination, earliest, latest) in enumerate(zip(*columns), start=1):
+        origin, destination = origin.strip().upper(), destination.strip().upper()
+        latest = latest.strip() or earliest.strip()
+        for code, field in ((origin, f"Leg {number} origin"), (destination, f"Leg {number} destination")):
+            is_valid, error = validate_city_code(code, field)
+            if not is_valid:
+                return None, error
+        for value, field in ((earliest.strip(), f"Leg {number} earliest date"), (latest, f"Leg {number} latest date")):
+            is_valid, error = validate_date(value, field)
+            if not is_valid:
+                return None, error
+        earliest = datetime.strptime(earliest.strip(), '%Y-%m-%d').date()
+        latest = datetime.strptime(latest, '%Y-%m-%d').date()
+        if not 0 <= (latest - earliest).days < ITINERARY_MAX_WINDOW_DAYS:
+            return None, f"Leg {number} date window must span 1 to {ITINERARY_MAX_WINDOW_DAYS} days"
+        # Connecting legs may use different airports of one city (LHR in, LGW out)
+        if legs and _city_of(legs[-1]['destination']) != _city_of(origin):
+            return None, f"Leg {number} must depart from where leg {number - 1} arrives"
+        legs.append({'origin': origin, 'destination': destination, 'earliest': earliest, 'latest': latest})
+    return legs, None
+
+
+@routes.route('/search_itinerary', methods=['POST'])
+@rate_limit("10 per minute")  # Up to legs x window flight searches
+def search_itinerary():
+    """
+    Cheapest multi-city itineraries (A -> B -> C -> A, a date window per
+    leg) with the cheapest hotel for each stay in between.
+
+    Upstream calls are linear in the number of legs: one cached flight
+    search per leg and date plus one hotel search per stop city, all run
+    concurrently under the quota governor (see itinerary.py).
+    """
+    try:
+        legs, error = _parse_legs(request.form)
+        if error:
+            return jsonify({"error": error}), 400
+
+        adults = request.form.get('adults', '1')
+        travel_class = request.form.get('travelClass', 'ECONOMY').upper()
+        budget = request.form.get('budget', '').strip()
+        min_nights = request.form.get('minNights', '1').strip()
+        limit = request.form.get('limit', '').strip()
+
+        is_valid, error = validate_passenger_count(adults, "Adults")
+        if not is_valid:
+            return jsonify({"error": error}), 400
+        adults = int(adults)
+
+        is_valid, error = validate_travel_class(travel_class)
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        if budget:
+            is_valid, error = validate_budget(budget)
+            if not is_valid:
+                return jsonify({"error": error}), 400
+
+        if not min_nights.isdigit():
+            return jsonify({"error": "minNights must be a whole number of nights"}), 400
+        min_nights = int(min_nights)
+
+        if limit and not (limit.isdigit() and 1 <= int(limit) <= TRIP_OPTIONS_MAX):
+            return jsonify({"error": f"Limit must be between 1 and {TRIP_OPTIONS_MAX}"}), 400
+        limit = int(limit) if limit else TRIP_OPTIONS_DEFAULT
+
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        # Stay i is in leg i's destination, from its earliest arrival to leg i+1's latest departure
+        stop_cities = [_city_of(leg['destination']) for leg in legs[:-1]]
+        with ThreadPoolExecutor(max_workers=ITINERARY_MAX_WORKERS) as executor:
+            fare_futures = {
+                (index, day): deadline.submit(executor, _leg_fare, leg['origin'], leg['destination'], day,
+                                              adults, travel_class)
+                for index, leg in enumerate(legs) for day in date_window(leg['earliest'], leg['latest'])
+            }
+            stay_futures = [
+                deadline.submit(executor, _stay_rate, city, legs[index]['earliest'],
+                                max(legs[index + 1]['latest'], legs[index]['earliest'] + timedelta(days=1)), adults)
+                for index, city in enumerate(stop_cities)
+            ]
+
+            fares = [{} for _ in legs]
+            missing_fares = []
+            for (index, day), future in fare_futures.items():
+                try:
+                    fare = future.result()
+                except (QuotaExhausted, requests.exceptions.RequestException) as e:
+                    logger.warning("No fare for leg %d on %s: %s", index + 1, day, e)
+                    fare = None
+                if fare is None:
+                    missing_fares.append({"leg": index + 1, "date": day.isoformat()})
+                else:
+                    fares[index][day] = fare
+
+            stays = []
+            missing_hotels = []
+            for city, future in zip(stop_cities, stay_futures):
+                try:
+                    hotel = future.result()
+                except (QuotaExhausted, requests.exceptions.RequestException) as e:
+                    logger.warning("No hotel rate for %s: %s", city, e)
+                    hotel = None
+                if hotel is None:
+                    missing_hotels.append(city)
+                stays.append((city, hotel))
+
+        itineraries = []
+        if not missing_hotels:
+            itineraries = cheapest_itineraries(
+                fares, stays, min_nights=min_nights, k=limit,
+                budget=fx.convert(float(budget), currency, fx.canonical) if budget else None
+            )
+        rate = fx.rate(fx.canonical, currency)
+        return jsonify({
+            "itineraries": [itinerary.in_currency(currency, rate) for itinerary in itineraries],
+            "currency": currency,
+            "searches": {"flights": len(fare_futures), "hotels": len(stay_futures)},
+            "unavailable": {"fares": missing_fares, "hotels": missing_hotels},
+        })
+
+    except Exception as e:
+        logger.exception("Error in /search_itinerary")
+        return jsonify({"error": str(e)}), 500
+
+def _batch_query_key(query):
+    """Normalized flight search key of one /batch_search query, or (None, error)."""
+    if not isinstance(query, dict):
+        return None, "Each query must be an object"
+    origin = str(query.get('origin') or '').strip().upper()
+    destination = str(query.get('destination') or '').strip().upper()
+    departure_date = str(query.get('departureDate') or '').strip()
+    return_date = str(query.get('returnDate') or '').strip()
+    adults = str(query.get('adults') or '1')
+    travel_class = str(query.get('travelClass') or 'ECONOMY').strip().upper()
+
+    for code, field in ((origin, "Origin"), (destination, "Destination")):
+        is_valid, error = validate_city_code(code, field)
+        if not is_valid:
+            return None, error
+    if return_date:
+        is_valid, error = validate_date_range(departure_date, return_date)
+    else:
+        is_valid, error = validate_date(departure_date, "Departure date")
+    if not is_valid:
+        return None, error
+    is_valid, error = validate_passenger_count(adults, "Adults")
+    if not is_valid:
+        return None, error
+    is_valid, error = validate_travel_class(travel_class)
+    if not is_valid:
+        return None, error
+    return (origin, destination, departure_date, return_date or None, int(adults), travel_class), None
+
+
+def _batch_request():
+    """
+    The parsed /batch_search body, once per request (the rate-limit cost
+    function reads it before the view): (keys, errors, options) with one
+    key or error per query, or None when the body is malformed.
+    """
+    if 'batch_request' not in g:
+        body = request.get_json(silent=True)
+        queries = body.get('queries') if isinstance(body, dict) else None
+        if not isinstance(queries, list) or not 1 <= len(queries) <= BATCH_MAX_QUERIES:
+            g.batch_request = None
+        else:
+            keys, errors = zip(*(_batch_query_key(query) for query in queries))
+            g.batch_request = (list(keys), list(errors), body)
+    return g.batch_request
+
+
+def _batch_cost():
+    """Rate-limit cost of a batch: distinct searches that will reach the upstream (at least 1)."""
+    batch = _batch_request()
+    if batch is None:
+        return 1
+    cache = _services().cache
+    uncached = {key for key in batch[0] if key is not None and cache.get(_flight_cache_key(*key)) is None}
+    return max(1, len(uncached))
+
+
+def _batch_flights(key):
+    return get_flight_offers(*key, quota=_services().quota)
+
+
+@routes.route('/batch_search', methods=['POST'])
+@rate_limit("60 per minute", cost=_batch_cost)  # Counted in upstream searches, not HTTP calls
+def batch_search():
+    """
+    Flight prices for up to BATCH_MAX_QUERIES (origin, destination, date)
+    searches in one JSON request.
+
+    Every query is validated up front; identical searches run once, on a
+    bounded pool, cache misses under the quota governor. Results come back in query
+    order, each with its own status: ok, not_found, invalid, throttled
+    (no upstream quota left) or error.
+    """
+    try:
+        batch = _batch_request()
+        if batch is None:
+            return jsonify({"error": f"Body must be JSON with 1 to {BATCH_MAX_QUERIES} queries"}), 400
+        keys, errors, body = batch
+
+        limit = body.get('limit', 3)
+        if type(limit) is not int or not 1 <= limit <= TRIP_OPTIONS_MAX:
+            return jsonify({"error": f"Limit must be between 1 and {TRIP_OPTIONS_MAX}"}), 400
+        fx = _services().fx
+        currency = str(body.get('currency') or fx.canonical).strip().upper()
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
+
+        unique = list(dict.fromkeys(key for key in keys if key is not None))
+        outcomes = {}
+        if unique:
+            with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(unique))) as executor:
+                futures = {key: deadline.submit(executor, _batch_flights, key) for key in unique}
+                for key, future in futures.items():
+                    try:
+                        flights = future.result()
+                    except QuotaExhausted:
+                        outcomes[key] = {"status": "throttled", "error": "Upstream quota exhausted; retry later"}
+                    except Exception as e:
+                        logger.warning("Batch search %s failed: %s", key, e)
+                        outcomes[key] = {"status": "error", "error": "Flight search failed"}
+                    else:
+                        flights = fx.convert_offers(top_k_flights(flights, k=limit), currency)
+                        outcomes[key] = {"status": "ok", "flights": flights} if flights else {"status": "not_found"}
+
+        results = [dict(outcomes[key], index=index) if key is not None
+                   else {"index": index, "status": "invalid", "error": error}
+                   for index, (key, error) in enumerate(zip(keys, errors))]
+        return jsonify({"results": results, "currency": currency, "unique": len(unique)})
+
+    except Exception as e:
+        logger.exception("Error in /batch_search")
+        return jsonify({"error": str(e)}), 500
+
+@routes.route('/search', methods=['POST'])
 def search_all():
     try:
         # Extract parameters
@@ -616,6 +1443,11 @@ def search_all():
         return_date = request.form.get('endDate')
         adults = int(request.form.get('adults', '1'))
         travel_class = request.form.get('travelClass', 'ECONOMY')
+        fx = _services().fx
+        currency = _display_currency(fx)
+        is_valid, error = validate_currency(currency, fx.table())
+        if not is_valid:
+            return jsonify({"error": error}), 400
 
         results = {
             "flights": [],
@@ -624,41 +1456,82 @@ def search_all():
 
         # Search Flights
         if origin_code and dest_code and departure_date:
-             flights = amadeus_search_flights(
-                origin=origin_code,
-                destination=dest_code,
-                departure_date=departure_date,
-                return_date=return_date if return_date else None,
-                adults=adults,
-                travel_class=travel_class,
-                currency='INR'
+             flights = get_flight_offers(
+                origin_code, dest_code, departure_date, return_date, adults, travel_class
             )
              if flights:
-                 results["flights"] = flights[:3]
+                 results["flights"] = fx.convert_offers(top_k_flights(flights), currency)
 
         # Search Hotels
         if destination:
             dest_base = destination.split(",")[0].strip()
-            hotels = amadeus_search_hotels(
-                city_name=dest_base,
-                check_in=departure_date,
-                check_out=return_date,
-                adults=adults
-            )
+            hotels = get_hotel_offers(dest_base, departure_date, return_date, adults)
             if hotels:
-                results["hotels"] = hotels[:3]
+                results["hotels"] = fx.convert_offers(top_k_hotels(hotels), currency)
         
         return jsonify(results)
 
     except Exception as e:
-        print(f"Error in /search: {str(e)}")
+        logger.exception("Error in /search")
         return jsonify({"error": str(e)}), 500
 
-import os, sys
+import os
 REQUIRED_ENV = ["AMADEUS_CLIENT_ID","AMADEUS_CLIENT_SECRET","GEMINI_API_KEY","SECRET_KEY"]
 missing = [k for k in REQUIRED_ENV if not os.getenv(k)]
 if missing:
-    print(f"[BOOT][ERROR] Missing: {', '.join(missing)}", file=sys.stderr)
+    logger.error("[BOOT] Missing environment variables: %s", ', '.join(missing))
+
+def create_app(config=None, upstream=None, cache=None, storage=None, fx=None, quota=None):
+    """
+    Application factory.
+
+    Builds an independently configured app: config (a mapping) is applied
+    over the defaults, and the upstream client (Amadeus + Gemini, see
+    upstream.py), response cache backend (cache_backends.py), api_cache
+    storage backend (storage.py), FX converter (fx.py) and upstream quota
+    governor (quota.py) can be injected -
+    e.g. a local stub client for load tests. Each defaults to the real
+    implementation.
+
+    A periodic api_cache sweep is started when CACHE_SWEEP_INTERVAL
+    (config or environment) is positive; SHARED_CACHE_SLOTS and
+    SHARED_CACHE_SLOT_SIZE (likewise) size the default shared cache.
+    Entry points: python main.py, gunicorn -c gunicorn.conf.py
+    "main:create_app()", serve.py (waitress) and wsgi.py (hosts that
+    import a module-level app, e.g. Vercel).
+    """
+    configure_logging()
+    new_app = Flask(__name__, static_folder='static')
+    new_app.json = OfferJSONProvider(new_app)
+    new_app.secret_key = SECRET_KEY
+    new_app.config['CACHE_SWEEP_INTERVAL'] = CACHE_SWEEP_INTERVAL
+    new_app.config['RATELIMIT_STORAGE_URI'] = default_storage_uri()
+    new_app.config['REQUEST_DEADLINE_SECONDS'] = REQUEST_DEADLINE_SECONDS
+    if config:
+        new_app.config.update(config)
+
+    instrumentation.init_app(new_app)  # first, so rate-limited requests are timed too
+    profiling.init_app(new_app)
+    new_app.register_blueprint(routes)
+    limiter = _init_limiter(new_app)
+
+    services = AppServices(
+        upstream=upstream if upstream is not None else UpstreamClient(),
+        cache=cache if cache is not None else build_default_cache(
+            slots=new_app.config.get('SHARED_CACHE_SLOTS'),
+            slot_size=new_app.config.get('SHARED_CACHE_SLOT_SIZE')),
+        storage=storage if storage is not None else build_default_storage(),
+        city_index=build_default_index(),
+        fx=fx if fx is not None else build_default_fx(),
+        quota=quota if quota is not None else build_default_quota(),
+        limiter=limiter,
+    )
+    interval = int(new_app.config['CACHE_SWEEP_INTERVAL'])
+    if interval > 0:
+        services.cache_sweeper = build_default_sweeper(interval_seconds=interval, storage=services.storage)
+        services.cache_sweeper.start()
+    new_app.extensions['travel_planner'] = services
+    return new_app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
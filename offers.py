@@ -0,0 +1,329 @@
+"""
+Compact offer models shared by the Amadeus client, routes and caches.
+
+Offers are parsed once from the Amadeus JSON into __slots__ objects with
+numeric prices, deduplicated by a tuple key, and serialized straight to the
+camelCase JSON shape the frontend expects.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+_ISO_DURATION = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?')
+
+
+@lru_cache(maxsize=2048)
+def parse_iso_duration(value):
+    """Convert an ISO 8601 duration such as 'PT5H35M' or 'P1DT2H' to minutes (None if invalid)."""
+    if not value:
+        return None
+    match = _ISO_DURATION.fullmatch(value)
+    if not match:
+        return None
+    days, hours, minutes = match.groups()
+    return int(days or 0) * 1440 + int(hours or 0) * 60 + int(minutes or 0)
+
+
+class FlightSegment(NamedTuple):
+    """One flown leg, stored as a flat tuple (no per-segment dicts)."""
+    carrier_code: str
+    number: str
+    departure_airport: str
+    departure_time: str
+    arrival_airport: str
+    arrival_time: str
+    duration_minutes: int
+    stops: int
+
+
+class Itinerary(NamedTuple):
+    """One direction of travel (outbound or return) made of segments."""
+    duration_minutes: int
+    stops: int
+    segments: Tuple[FlightSegment, ...]
+
+    def layovers(self):
+        """Get (airport, minutes) for every connection between consecutive segments."""
+        result = []
+        for previous, following in zip(self.segments, self.segments[1:]):
+            minutes = None
+            try:
+                gap = datetime.fromisoformat(following.departure_time) - datetime.fromisoformat(previous.arrival_time)
+                minutes = int(gap.total_seconds() // 60)
+            except (TypeError, ValueError):
+                pass
+            result.append((previous.arrival_airport, minutes))
+        return result
+
+    def to_dict(self):
+        return {
+            'durationMinutes': self.duration_minutes,
+            'stops': self.stops,
+            'segments': [{
+                'airlineCode': segment.carrier_code,
+                'flightNumber': segment.number,
+                'departureAirport': segment.departure_airport,
+                'departureTime': segment.departure_time,
+                'arrivalAirport': segment.arrival_airport,
+                'arrivalTime': segment.arrival_time,
+                'durationMinutes': segment.duration_minutes,
+                'stops': segment.stops,
+            } for segment in self.segments],
+            'layovers': [{'airport': airport, 'minutes': minutes} for airport, minutes in self.layovers()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        segments = tuple(FlightSegment(
+            segment.get('airlineCode'),
+            segment.get('flightNumber'),
+            segment.get('departureAirport'),
+            segment.get('departureTime'),
+            segment.get('arrivalAirport'),
+            segment.get('arrivalTime'),
+            segment.get('durationMinutes'),
+            segment.get('stops', 0),
+        ) for segment in data.get('segments', []))
+        return cls(data.get('durationMinutes'), data.get('stops', 0), segments)
+
+
+class FlightOffer:
+    """
+    A flight offer with every itinerary and segment.
+
+    The flat fields (airline, departure/arrival, duration) describe the
+    outbound itinerary: departure of its first segment and arrival of its
+    last, so connecting flights report the real final arrival.
+    """
+
+    __slots__ = ('airline', 'airline_code', 'flight_number', 'departure_time', 'arrival_time',
+                 'departure_airport', 'arrival_airport', 'price', 'currency', 'duration',
+                 'itineraries', 'stops', 'total_duration_minutes', 'traveler_prices')
+
+    def __init__(self, airline, airline_code, flight_number, departure_time, arrival_time,
+                 departure_airport, arrival_airport, price, currency, duration,
+                 itineraries=(), stops=0, total_duration_minutes=None, traveler_prices=()):
+        self.airline = airline
+        self.airline_code = airline_code
+        self.flight_number = flight_number
+        self.departure_time = departure_time
+        self.arrival_time = arrival_time
+        self.departure_airport = departure_airport
+        self.arrival_airport = arrival_airport
+        self.price = price
+        self.currency = currency
+        self.duration = duration
+        self.itineraries = itineraries
+        self.stops = stops
+        self.total_duration_minutes = total_duration_minutes
+        self.traveler_prices = traveler_prices
+
+    @property
+    def dedup_key(self):
+        """Identity of the flights flown: the full segment chain when known."""
+        if self.itineraries:
+            return self.itineraries
+        return (self.airline_code, self.flight_number, self.departure_time)
+
+    @property
+    def price_per_passenger(self):
+        if self.traveler_prices:
+            return self.price / len(self.traveler_prices)
+        return self.price
+
+    def to_dict(self):
+        """Get the JSON representation used by the frontend."""
+        return {
+            'airline': self.airline,
+            'airlineCode': self.airline_code,
+            'flightNumber': self.flight_number,
+            'departureTime': self.departure_time,
+            'arrivalTime': self.arrival_time,
+            'departureAirport': self.departure_airport,
+            'arrivalAirport': self.arrival_airport,
+            'price': self.price,
+            'currency': self.currency,
+            'duration': self.duration,
+            'stops': self.stops,
+            'totalDurationMinutes': self.total_duration_minutes,
+            'pricePerPassenger': self.price_per_passenger,
+            'travelerPrices': [{'travelerType': traveler_type, 'price': price}
+                               for traveler_type, price in self.traveler_prices],
+            'itineraries': [itinerary.to_dict() for itinerary in self.itineraries],
+        }
+
+    def in_currency(self, currency, rate):
+        """A copy priced in currency, with every amount multiplied by rate."""
+        return FlightOffer(
+            self.airline, self.airline_code, self.flight_number, self.departure_time, self.arrival_time,
+            self.departure_airport, self.arrival_airport, round(self.price * rate, 2), currency, self.duration,
+            self.itineraries, self.stops, self.total_duration_minutes,
+            tuple((traveler_type, round(price * rate, 2)) for traveler_type, price in self.traveler_prices),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an offer from its to_dict() form (e.g. from a cache entry)."""
+        return cls(
+            airline=data.get('airline'),
+            airline_code=data.get('airlineCode'),
+            flight_number=data.get('flightNumber'),
+            departure_time=data.get('departureTime'),
+            arrival_time=data.get('arrivalTime'),
+            departure_airport=data.get('departureAirport'),
+            arrival_airport=data.get('arrivalAirport'),
+            price=float(data.get('price') or 0),
+            currency=data.get('currency'),
+            duration=data.get('duration'),
+            itineraries=tuple(Itinerary.from_dict(item) for item in data.get('itineraries', [])),
+            stops=data.get('stops', 0),
+            total_duration_minutes=data.get('totalDurationMinutes'),
+            traveler_prices=tuple((item.get('travelerType'), float(item.get('price') or 0))
+                                  for item in data.get('travelerPrices', [])),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, FlightOffer):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        # Positional args (slots are in __init__ order): much faster to unpickle from shared caches
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"FlightOffer({self.airline_code}{self.flight_number} {self.departure_time} {self.price} {self.currency})"
+
+
+class HotelOffer:
+    """A single hotel with its cheapest offer."""
+
+    __slots__ = ('name', 'rating', 'price', 'currency', 'location', 'description',
+                 'amenities', 'is_estimate')
+
+    def __init__(self, name, rating, price, currency, location, description,
+                 amenities=None, is_estimate=False):
+        self.name = name
+        self.rating = rating
+        self.price = price
+        self.currency = currency
+        self.location = location
+        self.description = description
+        self.amenities = amenities
+        self.is_estimate = is_estimate
+
+    @property
+    def dedup_key(self):
+        return (self.name, self.location)
+
+    def to_dict(self):
+        """Get the JSON representation used by the frontend."""
+        data = {
+            'name': self.name,
+            'rating': self.rating,
+            'price': self.price,
+            'currency': self.currency,
+            'location': self.location,
+            'description': self.description,
+        }
+        if self.amenities is not None:
+            data['amenities'] = self.amenities
+        if self.is_estimate:
+            data['isEstimate'] = True
+        return data
+
+    def in_currency(self, currency, rate):
+        """A copy priced in currency, with the price multiplied by rate."""
+        return HotelOffer(self.name, self.rating, round(self.price * rate, 2), currency, self.location,
+                          self.description, self.amenities, self.is_estimate)
+
+    def per_night(self, nights):
+        """A copy priced per night, from an offer priced for a stay of nights (Amadeus totals)."""
+        if nights <= 1:
+            return self
+        return HotelOffer(self.name, self.rating, self.price / nights, self.currency, self.location,
+                          self.description, self.amenities, self.is_estimate)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an offer from its to_dict() form (e.g. from a cache entry)."""
+        return cls(
+            name=data.get('name'),
+            rating=data.get('rating'),
+            price=float(data.get('price') or 0),
+            currency=data.get('currency'),
+            location=data.get('location'),
+            description=data.get('description'),
+            amenities=data.get('amenities'),
+            is_estimate=bool(data.get('isEstimate', False)),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, HotelOffer):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        # Positional args (slots are in __init__ order): much faster to unpickle from shared caches
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"HotelOffer({self.name!r} {self.price} {self.currency})"
+
+
+def dedupe_offers(offers):
+    """Drop offers whose dedup_key was already seen, preserving order."""
+    seen = set()
+    unique = []
+    for offer in offers:
+        key = offer.dedup_key
+        if key not in seen:
+            seen.add(key)
+            unique.append(offer)
+    return unique
+
+
+def offer_price(offer):
+    """Get the price of an offer model or a legacy offer dict."""
+    if isinstance(offer, dict):
+        return offer.get('price', 0)
+    return offer.price
+
+
+FLIGHT_SORT_KEYS = {
+    'cheapest': lambda offer: (offer.price, offer.total_duration_minutes or 0),
+    'fastest': lambda offer: (offer.total_duration_minutes if offer.total_duration_minutes is not None
+                              else float('inf'), offer.price),
+    'departure': lambda offer: (offer.departure_time or '', offer.price),
+}
+
+
+def filter_flights(offers, non_stop=False, max_stops=None):
+    """
+    Filter parsed flight offers.
+
+    Args:
+        offers: FlightOffer list from a single search
+        non_stop: Keep only offers whose every itinerary is non-stop
+        max_stops: Keep only offers with at most this many outbound stops
+    """
+    if non_stop:
+        offers = [offer for offer in offers
+                  if all(itinerary.stops == 0 for itinerary in offer.itineraries) and offer.stops == 0]
+    if max_stops is not None:
+        offers = [offer for offer in offers if offer.stops <= max_stops]
+    return offers
+
+
+def filter_and_sort_flights(offers, sort_by='cheapest', non_stop=False, max_stops=None):
+    """
+    Select a view over parsed flight offers without another upstream call.
+
+    sort_by is one of FLIGHT_SORT_KEYS ('cheapest', 'fastest', 'departure');
+    see filter_flights() for the filters.
+    """
+    if sort_by not in FLIGHT_SORT_KEYS:
+        raise ValueError(f"sort_by must be one of: {', '.join(FLIGHT_SORT_KEYS)}")
+    return sorted(filter_flights(offers, non_stop, max_stops), key=FLIGHT_SORT_KEYS[sort_by])
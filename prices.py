@@ -0,0 +1,127 @@
+"""
+Price normalization: any price value we receive -> (amount, currency).
+
+Amadeus returns prices as decimal strings ("1234.50") beside a currency
+field; legacy offer dicts, estimates and user input carry display strings
+("₹5,000", "Rs. 4,500/night", "USD 120.00", "€1.234,56", "1,23,456").
+parse_price() turns all of them into a Money tuple once, at the API
+boundary, so routes compare and sort plain floats:
+
+- ints and floats take a fast path (one type check, no string work);
+- strings go through one precompiled pattern: an optional currency
+  symbol/code before or after the number, then the digits, where the last
+  of ',' / '.' followed by 1-2 digits is the decimal separator and any
+  other separator groups thousands (Western or Indian lakh grouping).
+
+A bare "1.234" is read as a decimal, like every Amadeus total. Values
+with no recognizable amount (None, '', 'N/A', 'nan') parse to None.
+"""
+
+import math
+import re
+from functools import partial
+from typing import NamedTuple, Optional
+
+CURRENCY_SYMBOLS = {
+    '₹': 'INR',
+    'RS': 'INR',
+    'RS.': 'INR',
+    '$': 'USD',
+    'US$': 'USD',
+    '€': 'EUR',
+    '£': 'GBP',
+    '¥': 'JPY',
+    'AED': 'AED',
+}
+
+_CURRENCY = r'([A-Za-z]{3}|US\$|[Rr][Ss]\.?|[₹$€£¥])'
+# prefix currency, number, suffix currency ("₹5,000", "Rs. 4,500/night", "120.00 USD")
+_PRICE = re.compile(r'\s*(?:' + _CURRENCY + r'\s*)?(\d[\d,.\s]*)(?:\s*' + _CURRENCY + r')?')
+
+
+class Money(NamedTuple):
+    """A numeric amount and its ISO 4217 currency code (None when unknown)."""
+    amount: float
+    currency: Optional[str] = None
+
+
+# Money((amount, currency)) without the generated Python-level __new__ (2x faster)
+_money = partial(tuple.__new__, Money)
+
+
+def _currency_code(token):
+    token = token.upper()
+    return CURRENCY_SYMBOLS.get(token, token)
+
+
+def _parse_number(text):
+    if ' ' in text:
+        text = text.replace(' ', '')
+    text = text.rstrip(',.')
+    # The last separator is the decimal point when 1-2 digits follow it
+    separator = max(text.rfind(','), text.rfind('.'))
+    if separator < 0:
+        return float(text)
+    if len(text) - separator <= 3:
+        whole = text[:separator]
+        if ',' in whole or '.' in whole:
+            whole = whole.replace(',', '').replace('.', '')
+        return float(whole + text[separator:].replace(',', '.'))
+    return float(text.replace(',', '').replace('.', ''))
+
+
+def _parse_text(text):
+    """(amount, currency token or None) of a price string, or None."""
+    # Plain decimal strings (every Amadeus total) need no pattern match
+    if text[:1].isdigit() and text[-1:].isdigit() and ',' not in text:
+        try:
+            amount = float(text)
+        except ValueError:
+            pass
+        else:
+            return (amount, None) if math.isfinite(amount) else None
+    match = _PRICE.match(text)
+    if match is None:
+        return None
+    prefix, number, suffix = match.groups()
+    try:
+        return _parse_number(number), prefix or suffix
+    except ValueError:
+        return None
+
+
+def parse_price(value, default_currency=None):
+    """
+    Normalize a price to Money(amount, currency), or None if it has no amount.
+
+    value may be a number, a display string, or an Amadeus price object
+    ({'total': '123.45', 'currency': 'EUR'}). default_currency applies when
+    the value names none.
+    """
+    if type(value) is dict:
+        default_currency = value.get('currency') or default_currency
+        value = value.get('total', value.get('amount'))
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        return _money((float(value), default_currency))
+    if value is None or value_type is bool:
+        return None
+    parsed = _parse_text(value if value_type is str else str(value))
+    if parsed is None:
+        return None
+    amount, symbol = parsed
+    return _money((amount, _currency_code(symbol) if symbol else default_currency))
+
+
+def price_amount(value, default=None):
+    """Just the numeric amount of a price value (default if it has none)."""
+    if type(value) is dict:
+        value = value.get('total', value.get('amount'))
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is str:
+        parsed = _parse_text(value)
+        return parsed[0] if parsed is not None else default
+    money = parse_price(value)
+    return money.amount if money is not None else default
@@ -0,0 +1,262 @@
+"""
+Opt-in per-request profiling with flamegraph (collapsed-stack) export.
+
+A request is profiled when it carries the header "X-Profile: cprofile" or
+"X-Profile: sample" together with the admin token, or when it is picked
+at random at PROFILE_SAMPLE_RATE (those use PROFILE_MODE). Two profilers:
+
+- cprofile: deterministic cProfile of the request thread. Exact call
+  counts, noticeable overhead; the call graph is expanded into stacks by
+  apportioning each function's time over its callers.
+- sample: a background thread snapshots the request thread's stack every
+  PROFILE_INTERVAL seconds (sys._current_frames). Low overhead, true
+  stacks, statistical weights.
+
+Either way only the request's own thread is profiled, not the pool threads
+it fans out to (those show up as time waiting on futures). The last
+PROFILE_RING_SIZE profiles are kept in memory per worker; the response
+carries X-Profile-Id and /admin/profiles serves them as collapsed-stack
+text ("root;caller;callee weight" per line) for flamegraph.pl or
+speedscope. Weights are microseconds (cprofile) or samples x interval in
+microseconds (sample).
+
+Environment: ADMIN_TOKEN (unset disables header triggers and the admin
+endpoints), PROFILE_SAMPLE_RATE (default 0), PROFILE_MODE (sample |
+cprofile, default sample), PROFILE_INTERVAL (default 0.005),
+PROFILE_RING_SIZE (default 20). init_app() is called by main.create_app().
+"""
+
+import cProfile
+import hmac
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import current_app, g, request
+
+import instrumentation
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_HEADER = 'X-Admin-Token'
+ADMIN_PREFIX = '/admin/'
+MODES = ('sample', 'cprofile')
+MAX_STACK_DEPTH = 200
+
+# cProfile installs one profiler hook per thread, but sys.setprofile users
+# (debuggers, coverage) and Python 3.12's sys.monitoring allow only one
+# deterministic profiler at a time; concurrent requests fall back to sampling
+_cprofile_lock = threading.Lock()
+
+
+def frame_label(filename, name):
+    """'module:function' for a code location, as it appears in a stack."""
+    if filename == '~':  # builtins in cProfile output
+        return name.replace(';', ',')
+    module = os.path.splitext(os.path.basename(filename))[0]
+    return f"{module}:{name}".replace(';', ',')
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled on a daemon thread."""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(frame_label(code.co_filename, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+def cprofile_stacks(stats):
+    """
+    Collapsed stacks from a cProfile call graph: {'a;b;c': microseconds}.
+
+    cProfile keeps caller -> callee edges, not whole stacks, so each path
+    from a root gets the share of a function's self time that its callers
+    along that path account for (the usual approximation, exact for trees).
+    """
+    entries = stats.stats
+    children = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+    roots = [func for func, entry in entries.items() if not any(caller in entries for caller in entry[4])]
+
+    stacks = Counter()
+
+    def expand(func, path, labels, share):
+        _, _, self_time, cumulative, _ = entries[func]
+        labels = labels + (frame_label(func[0], func[2]),)
+        weight = self_time * share * 1e6
+        if weight >= 1:
+            stacks[';'.join(labels)] += int(weight)
+        if len(labels) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_time in children.get(func, ()):
+            child_cumulative = entries[child][3]
+            if child in path or child_cumulative <= 0:
+                continue  # recursion is folded into the outer call
+            child_share = share * edge_time / child_cumulative
+            if edge_time * share * 1e6 >= 1:
+                expand(child, path | {child}, labels, child_share)
+
+    for root in roots:
+        expand(root, frozenset((root,)), (), 1.0)
+    return stacks
+
+
+class ProfileStore:
+    """Bounded ring of the most recent request profiles (per worker)."""
+
+    def __init__(self, size=20):
+        self._ring = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        return next(self._ids)
+
+    def add(self, profile):
+        with self._lock:
+            self._ring.append(profile)
+
+    def summaries(self):
+        """Stored profiles without their stacks, newest first."""
+        with self._lock:
+            profiles = list(self._ring)
+        return [{key: value for key, value in profile.items() if key != 'stacks'} for profile in reversed(profiles)]
+
+    def get(self, profile_id):
+        with self._lock:
+            for profile in self._ring:
+                if profile['id'] == profile_id:
+                    return profile
+        return None
+
+    def merged(self, route=None):
+        """Stacks of every stored profile (optionally of one route) added together."""
+        with self._lock:
+            profiles = [profile for profile in self._ring if route is None or profile['route'] == route]
+        stacks = Counter()
+        for profile in profiles:
+            stacks.update(profile['stacks'])
+        return stacks
+
+
+def collapsed_text(stacks):
+    """Brendan Gregg's folded format, heaviest stacks first."""
+    return ''.join(f"{stack} {weight}\n" for stack, weight in sorted(stacks.items(), key=lambda item: -item[1]))
+
+
+def admin_authorized():
+    """True when ADMIN_TOKEN is configured and the request presents it."""
+    token = current_app.config.get('ADMIN_TOKEN')
+    presented = request.headers.get(TOKEN_HEADER, '')
+    return bool(token) and hmac.compare_digest(presented.encode('utf-8'), token.encode('utf-8'))
+
+
+def store():
+    return current_app.extensions['profiling']
+
+
+def _requested_mode():
+    if request.path.startswith(ADMIN_PREFIX):
+        return None  # reading profiles must not evict them
+    mode = request.headers.get(PROFILE_HEADER, '').strip().lower()
+    if mode and admin_authorized():
+        return mode if mode in MODES else current_app.config['PROFILE_MODE']
+    rate = float(current_app.config['PROFILE_SAMPLE_RATE'])
+    if rate > 0 and random.random() < rate:
+        return current_app.config['PROFILE_MODE']
+    return None
+
+
+# Flask integration
+
+def _start_profile():
+    mode = _requested_mode()
+    if mode is None:
+        return
+    if mode == 'cprofile' and not _cprofile_lock.acquire(blocking=False):
+        mode = 'sample'
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = StackSampler(threading.get_ident(), float(current_app.config['PROFILE_INTERVAL'])).start()
+    g.profile = {'id': store().next_id(), 'mode': mode, 'profiler': profiler,
+                 'started': time.perf_counter(), 'ts': round(time.time(), 3)}
+
+
+def _add_profile_header(response):
+    profile = g.get('profile')
+    if profile is not None:
+        response.headers['X-Profile-Id'] = str(profile['id'])
+        profile['status'] = response.status_code
+    return response
+
+
+def _finish_profile(exc):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return
+    duration = time.perf_counter() - profile['started']
+    profiler = profile['profiler']
+    if profile['mode'] == 'cprofile':
+        profiler.disable()
+        _cprofile_lock.release()
+        stacks = cprofile_stacks(pstats.Stats(profiler))
+    else:
+        interval_us = int(profiler.interval * 1e6)
+        stacks = Counter({stack: count * interval_us for stack, count in profiler.stop().items()})
+    store().add({
+        'id': profile['id'],
+        'mode': profile['mode'],
+        'ts': profile['ts'],
+        'method': request.method,
+        'path': request.path,
+        'route': request.endpoint or 'unmatched',
+        'status': profile.get('status', 500),
+        'duration_ms': round(duration * 1e3, 2),
+        'trace_id': instrumentation.current_trace_id(),
+        'stacks': stacks,
+    })
+
+
+def init_app(app):
+    """Profile opted-in requests of app (call after instrumentation.init_app,
+    so the profile closes before the request's trace is logged)."""
+    app.config.setdefault('ADMIN_TOKEN', os.getenv('ADMIN_TOKEN') or None)
+    app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.getenv('PROFILE_SAMPLE_RATE', '0')))
+    app.config.setdefault('PROFILE_MODE', os.getenv('PROFILE_MODE', 'sample'))
+    app.config.setdefault('PROFILE_INTERVAL', float(os.getenv('PROFILE_INTERVAL', '0.005')))
+    app.config.setdefault('PROFILE_RING_SIZE', int(os.getenv('PROFILE_RING_SIZE', '20')))
+    app.extensions['profiling'] = ProfileStore(int(app.config['PROFILE_RING_SIZE']))
+    app.before_request(_start_profile)
+    app.after_request(_add_profile_header)
+    app.teardown_request(_finish_profile)
@@ -0,0 +1,128 @@
+"""
+Upstream quota governor for fan-out routes.
+
+Amadeus rate-limits each API key (transactions per second) and answers
+429 past it, which amadeus_api then retries with backoff - wasted time and
+quota. Routes that fan one request out into many upstream searches
+(/explore, /search_itinerary, /batch_search) run each search that misses
+the cache inside governing(app's QuotaGovernor), and amadeus_api takes a
+slot from it for every HTTP request it sends - a hotel search is a token
+refresh, a city-code lookup, the hotel list and the offers (plus retries
+and alternate dates), so charging per search would let several times the
+configured rate through. The governor in effect is a ContextVar, so it
+follows the search into deadline.submit() pool threads. It enforces:
+
+- a token bucket refilled at `rate` calls/second, holding at most `burst`;
+- at most `max_in_flight` calls outstanding at once.
+
+A caller that would have to wait longer than its timeout (capped by the
+request deadline, see deadline.py) is refused with QuotaExhausted, so the
+route can fall back to cached or estimated prices rather than queue.
+
+The governor is per process; Amadeus' limit is per key, so set
+AMADEUS_QUOTA_RATE to the key's limit divided by the number of workers.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import deadline
+import instrumentation
+
+DEFAULT_RATE = float(os.getenv('AMADEUS_QUOTA_RATE', '5'))
+DEFAULT_BURST = int(os.getenv('AMADEUS_QUOTA_BURST', '5'))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('AMADEUS_MAX_IN_FLIGHT', '4'))
+DEFAULT_TIMEOUT = 5.0
+
+_governor = contextvars.ContextVar('upstream_quota', default=None)
+
+
+class QuotaExhausted(Exception):
+    """No upstream call slot became available within the caller's timeout."""
+
+
+class QuotaGovernor:
+    """Token bucket plus in-flight cap shared by the upstream calls of one app."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or burst < 1 or max_in_flight < 1:
+            raise ValueError("rate must be positive, burst and max_in_flight at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def _reserve(self, timeout):
+        """Take a token, possibly one that only refills `wait` seconds from now."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > timeout:
+                return None
+            # Tokens may go negative: later callers queue behind this reservation
+            self._tokens -= 1.0
+            return wait
+
+    def acquire(self, timeout=DEFAULT_TIMEOUT):
+        """Wait for a call slot; False when none is free within timeout (or the request deadline)."""
+        left = deadline.remaining()
+        if left is not None:
+            timeout = min(timeout, max(0.0, left - deadline.MIN_CALL_SECONDS))
+        started = self._clock()
+        if not self._in_flight.acquire(timeout=timeout):
+            instrumentation.METRICS.count('upstream_quota_total', result='denied')
+            return False
+        wait = self._reserve(max(0.0, timeout - (self._clock() - started)))
+        if wait is None:
+            self._in_flight.release()
+            instrumentation.METRICS.count('upstream_quota_total', result='denied')
+            return False
+        if wait:
+            self._sleep(wait)
+        instrumentation.METRICS.count('upstream_quota_total', result='granted')
+        return True
+
+    def release(self):
+        self._in_flight.release()
+
+    @contextmanager
+    def slot(self, timeout=DEFAULT_TIMEOUT):
+        """Hold a call slot for the block; raises QuotaExhausted when none is granted."""
+        if not self.acquire(timeout):
+            raise QuotaExhausted("upstream quota exhausted")
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def build_default_quota():
+    """QuotaGovernor configured from AMADEUS_QUOTA_RATE / _BURST / AMADEUS_MAX_IN_FLIGHT."""
+    return QuotaGovernor()
+
+
+@contextmanager
+def governing(governor):
+    """Charge the upstream HTTP requests made in the block to governor (None: not governed)."""
+    token = _governor.set(governor)
+    try:
+        yield
+    finally:
+        _governor.reset(token)
+
+
+def request_slot(timeout=DEFAULT_TIMEOUT):
+    """Slot for one upstream HTTP request from the governor in effect, if any."""
+    governor = _governor.get()
+    return governor.slot(timeout) if governor is not None else nullcontext()
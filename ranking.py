@@ -0,0 +1,152 @@
+"""
+Top-K ranking of flight and hotel offers.
+
+Offers are scored on price, duration, stops, rating and departure-time
+preference, with each numeric criterion min-max normalized over the
+candidate set so weights are comparable. Selection uses a bounded heap
+(heapq.nsmallest), O(n log k), so the few results we show are the best
+of the whole upstream result rather than the first by position.
+"""
+
+import heapq
+
+# Preferred departure windows as [start_hour, end_hour)
+DEPARTURE_WINDOWS = {
+    'morning': (5, 12),
+    'afternoon': (12, 17),
+    'evening': (17, 22),
+    'night': (22, 29),  # wraps past midnight to 05:00
+}
+
+
+class RankingWeights:
+    """Per-request scoring weights; higher weight means the criterion matters more."""
+
+    __slots__ = ('price', 'duration', 'stops', 'rating', 'departure', 'preferred_departure')
+
+    FIELDS = {
+        'price': 'weightPrice',
+        'duration': 'weightDuration',
+        'stops': 'weightStops',
+        'rating': 'weightRating',
+        'departure': 'weightDeparture',
+    }
+
+    def __init__(self, price=1.0, duration=0.5, stops=0.3, rating=0.5, departure=0.3,
+                 preferred_departure=None):
+        if preferred_departure is not None and preferred_departure not in DEPARTURE_WINDOWS:
+            raise ValueError(f"Preferred departure must be one of: {', '.join(DEPARTURE_WINDOWS)}")
+        self.price = price
+        self.duration = duration
+        self.stops = stops
+        self.rating = rating
+        self.departure = departure
+        self.preferred_departure = preferred_departure
+
+    @classmethod
+    def from_mapping(cls, values):
+        """
+        Build weights from request parameters (e.g. request.form).
+
+        Recognized keys are weightPrice, weightDuration, weightStops,
+        weightRating, weightDeparture and preferredDeparture; missing keys
+        keep their defaults.
+
+        Raises:
+            ValueError: If a weight is not a non-negative number
+        """
+        weights = cls(preferred_departure=(values.get('preferredDeparture') or '').strip().lower() or None)
+        for attr, key in cls.FIELDS.items():
+            raw = (values.get(key) or '').strip()
+            if not raw:
+                continue
+            try:
+                value = float(raw)
+            except ValueError:
+                raise ValueError(f"{key} must be a number")
+            if value < 0 or value != value:
+                raise ValueError(f"{key} must be a non-negative number")
+            setattr(weights, attr, value)
+        return weights
+
+
+DEFAULT_WEIGHTS = RankingWeights()
+
+
+def _normalizer(values):
+    """Return a function mapping a value to [0, 1] over the range of values."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return lambda value: 0.0
+    low = min(present)
+    span = max(present) - low
+    if span <= 0:
+        return lambda value: 0.0
+    # Missing values rank as the worst candidate
+    return lambda value: 1.0 if value is None else (value - low) / span
+
+
+def _departure_penalty(departure_time, window):
+    """Distance in hours (scaled to [0, 1]) from the departure hour to the preferred window."""
+    try:
+        hour = int(departure_time[11:13]) + int(departure_time[14:16]) / 60
+    except (TypeError, ValueError, IndexError):
+        return 1.0
+    start, end = window
+    if end > 24 and hour < start:
+        hour += 24
+    if start <= hour < end:
+        return 0.0
+    distance = min(abs(hour - start), abs(hour - end), 24 - abs(hour - start), 24 - abs(hour - end))
+    return min(distance / 12, 1.0)
+
+
+def _rating_value(rating):
+    try:
+        return max(0.0, min(float(rating), 5.0))
+    except (TypeError, ValueError):
+        return None
+
+
+def flight_scorer(offers, weights=DEFAULT_WEIGHTS):
+    """Score function for FlightOffers, normalized over offers (lower is better)."""
+    price_norm = _normalizer([offer.price for offer in offers])
+    duration_norm = _normalizer([offer.total_duration_minutes for offer in offers])
+    max_stops = max((offer.stops for offer in offers), default=0) or 1
+    window = DEPARTURE_WINDOWS.get(weights.preferred_departure)
+
+    def score(offer):
+        value = (weights.price * price_norm(offer.price)
+                 + weights.duration * duration_norm(offer.total_duration_minutes)
+                 + weights.stops * offer.stops / max_stops)
+        if window:
+            value += weights.departure * _departure_penalty(offer.departure_time, window)
+        return value
+
+    return score
+
+
+def hotel_scorer(offers, weights=DEFAULT_WEIGHTS):
+    """Score function for HotelOffers by price and rating (lower is better)."""
+    price_norm = _normalizer([offer.price for offer in offers])
+
+    def score(offer):
+        rating = _rating_value(offer.rating)
+        rating_penalty = 1.0 if rating is None else 1.0 - rating / 5.0
+        return weights.price * price_norm(offer.price) + weights.rating * rating_penalty
+
+    return score
+
+
+def top_k_flights(offers, k=3, weights=DEFAULT_WEIGHTS):
+    """Select the k best FlightOffers (lowest score first)."""
+    if not offers or k <= 0:
+        return []
+    return heapq.nsmallest(k, offers, key=flight_scorer(offers, weights))
+
+
+def top_k_hotels(offers, k=3, weights=DEFAULT_WEIGHTS):
+    """Select the k best HotelOffers by price and rating (lowest score first)."""
+    if not offers or k <= 0:
+        return []
+    return heapq.nsmallest(k, offers, key=hotel_scorer(offers, weights))
@@ -0,0 +1,68 @@
+"""
+Private per-user locations for files shared by the workers on one host.
+
+The shared response cache (shared_cache.py) and the rate-limit database
+(limiter_storage.py) are read back by every worker, and the cache holds
+pickles, so neither may live where another local user can plant or swap
+the file - a fixed name in the world-writable temp dir is exactly that.
+By default they go in app_runtime_dir():
+
+- $XDG_RUNTIME_DIR/travel_planner when the session has one (per-user,
+  mode 0700 by spec), else <temp dir>/travel_planner-<uid>;
+- created with mode 0700; an existing directory must be a real directory
+  (not a symlink) owned by us with no group/other access, or
+  InsecurePathError is raised rather than using it.
+
+check_private_file() applies the same owner/mode test to an opened file,
+which also covers paths set explicitly through the environment.
+
+Ownership checks need POSIX uids; elsewhere (Windows) the temp dir is
+already per user and the checks are skipped.
+"""
+
+import os
+import stat
+import tempfile
+
+APP_DIR_NAME = 'travel_planner'
+
+
+class InsecurePathError(PermissionError):
+    """A shared file or its directory is not private to the current user."""
+
+
+def _check_private(st, path, kind):
+    if not hasattr(os, 'getuid'):
+        return
+    if st.st_uid != os.getuid():
+        raise InsecurePathError(f"{kind} {path} is owned by uid {st.st_uid}, not {os.getuid()}")
+    if st.st_mode & 0o077:
+        raise InsecurePathError(f"{kind} {path} is accessible to other users "
+                                f"(mode {stat.S_IMODE(st.st_mode):o})")
+
+
+def app_runtime_dir():
+    """This user's private directory for the app's shared files, created if needed."""
+    runtime = os.getenv('XDG_RUNTIME_DIR')
+    if runtime and os.path.isdir(runtime):
+        path = os.path.join(runtime, APP_DIR_NAME)
+    else:
+        suffix = f'-{os.getuid()}' if hasattr(os, 'getuid') else ''
+        path = os.path.join(tempfile.gettempdir(), APP_DIR_NAME + suffix)
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise InsecurePathError(f"{path} is not a directory")
+    _check_private(st, path, 'directory')
+    return path
+
+
+def check_private_file(fd, path):
+    """Raise InsecurePathError unless the open file fd is a regular file private to us."""
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode):
+        raise InsecurePathError(f"{path} is not a regular file")
+    _check_private(st, path, 'file')
@@ -0,0 +1,32 @@
+"""
+Production server using waitress (also works on Windows, unlike gunicorn).
+
+waitress runs one multi-threaded process; to use several cores, start one
+instance per core on different ports behind a load balancer:
+
+    python serve.py --port 8001 --threads 8
+    python serve.py --port 8002 --threads 8
+
+The same factory works with waitress-serve --call main:create_app.
+"""
+
+import argparse
+import os
+
+from waitress import serve
+
+from main import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8000')))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WAITRESS_THREADS', '8')))
+    args = parser.parse_args()
+
+    serve(create_app(), host=args.host, port=args.port, threads=args.threads)
+
+
+if __name__ == '__main__':
+    main()
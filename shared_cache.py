@@ -0,0 +1,289 @@
+"""
+Host-local cache shared by all worker processes through a memory-mapped file.
+
+The file is a fixed-slot open-addressing hash table:
+
+    header (64 bytes): magic, version, slot count, slot size, clock hand
+    slot i:            seq u32 | ref u8 | flags u8 | pad | key hash u64 |
+                       expires_at f64 | key length u32 | value length u32 |
+                       key bytes | value bytes
+
+Reads never lock: each slot carries a seqlock counter that writers make
+odd while they modify the slot, and a reader retries if the counter was
+odd or changed while it copied the slot. Writers serialize on an flock()
+of the file (plus a thread lock within the process); cache fills are rare
+next to reads. Values are pickled, zlib-compressed when that helps, and
+must fit in one slot. Larger values are not cached: each one is counted in
+instrumentation.METRICS (shared_cache_oversize_total, by cache name) and
+the first is logged, so an undersized SHARED_CACHE_SLOT_SIZE shows up. A
+50-offer flight search takes about 1.5 KiB, so the default 8 KiB slot
+leaves room for larger searches and hotel lists. A key probes
+PROBE_LENGTH slots from its home slot; when all are live, a clock (second
+chance) sweep over those slots picks the victim, using the ref bit that
+reads set.
+
+Since values are unpickled, the file must be private: it is opened without
+following symlinks and refused (runtime_paths.InsecurePathError) unless it
+is a regular file owned by this user with no group/other access.
+
+Requires fcntl (Linux/macOS); cache_backends.build_default_cache() falls
+back to the per-process MemoryCache elsewhere.
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+import instrumentation
+from runtime_paths import check_private_file
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TPSC'
+VERSION = 1
+HEADER = struct.Struct('<4sIIII')   # magic, version, slots, slot_size, clock hand
+HEADER_SIZE = 64
+SLOT = struct.Struct('<IBBxxQdII')  # seq, ref, flags, key hash, expires_at, key len, value len
+SEQ = struct.Struct('<I')
+CLOCK_HAND_OFFSET = 16
+
+PROBE_LENGTH = 8
+READ_RETRIES = 16
+COMPRESS_MIN_BYTES = 512
+FLAG_COMPRESSED = 1
+
+DEFAULT_SLOTS = 2048
+DEFAULT_SLOT_SIZE = 8192
+
+
+def _encode_key(key):
+    # repr() of the tuple keys we use (str/int/date/None) is deterministic across processes
+    return repr(key).encode('utf-8')
+
+
+def _hash_key(key_bytes):
+    return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), 'little')
+
+
+def _serialize(value):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data):
+            return compressed, FLAG_COMPRESSED
+    return data, 0
+
+
+def _deserialize(data, flags):
+    if flags & FLAG_COMPRESSED:
+        data = zlib.decompress(data)
+    return pickle.loads(data)
+
+
+def _locked(fn):
+    """Run a SharedMemoryCache method under its thread lock and the file's writer lock."""
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            fd = self._write_lock_fd()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                return fn(self, *args, **kwargs)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+class SharedMemoryCache:
+    """Cache backend (see cache_backends.py) stored in a shared memory-mapped file."""
+
+    def __init__(self, path, slots=DEFAULT_SLOTS, slot_size=DEFAULT_SLOT_SIZE):
+        if slot_size <= SLOT.size or slot_size % 8:
+            raise ValueError("slot_size must be a multiple of 8 larger than the slot header")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        # Process-local; held around writes together with the file lock
+        self.lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'oversize': 0}
+        self._lock_pid = None
+        self._lock_fd = None
+        self._oversize_logged = False
+
+        size = HEADER_SIZE + slots * slot_size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            check_private_file(fd, path)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                self._mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+                magic, version, file_slots, file_slot_size, _ = HEADER.unpack_from(self._mm, 0)
+                if magic != MAGIC:
+                    HEADER.pack_into(self._mm, 0, MAGIC, VERSION, slots, slot_size, 0)
+                elif (version, file_slots, file_slot_size) != (VERSION, slots, slot_size):
+                    raise ValueError(
+                        f"{path} holds a cache with {file_slots} slots of {file_slot_size} bytes "
+                        f"(version {version}); expected {slots} x {slot_size} (version {VERSION})")
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * self.slot_size
+
+    def _write_lock_fd(self):
+        # flock() is per open file, so each process (also after fork) needs its own
+        if self._lock_pid != os.getpid():
+            self._lock_fd = os.open(self.path, os.O_RDWR | os.O_NOFOLLOW)
+            self._lock_pid = os.getpid()
+        return self._lock_fd
+
+    # Reads (lock-free)
+
+    def _read_slot(self, index):
+        """Consistent (hash, expires_at, flags, key, value) of a slot, or None if empty/unstable."""
+        mm = self._mm
+        offset = self._offset(index)
+        for _ in range(READ_RETRIES):
+            seq, _, flags, key_hash, expires_at, key_len, value_len = SLOT.unpack_from(mm, offset)
+            if seq & 1:
+                continue
+            if not key_len:
+                return None
+            if SLOT.size + key_len + value_len > self.slot_size:
+                continue  # lengths from a torn read
+            start = offset + SLOT.size
+            key = mm[start:start + key_len]
+            value = mm[start + key_len:start + key_len + value_len]
+            if SEQ.unpack_from(mm, offset)[0] == seq:
+                return key_hash, expires_at, flags, key, value
+        return None
+
+    def get(self, key, default=None):
+        key_bytes = _encode_key(key)
+        key_hash = _hash_key(key_bytes)
+        home = key_hash % self.slots
+        now = time.time()
+        for probe in range(PROBE_LENGTH):
+            index = (home + probe) % self.slots
+            entry = self._read_slot(index)
+            if entry is None or entry[0] != key_hash or entry[3] != key_bytes:
+                continue
+            if entry[1] <= now:
+                break
+            # Second chance for the clock sweep; a racy single-byte store is fine here
+            self._mm[self._offset(index) + 4] = 1
+            self._stats['hits'] += 1
+            return _deserialize(entry[4], entry[2])
+        self._stats['misses'] += 1
+        return default
+
+    def __len__(self):
+        now = time.time()
+        return sum(1 for index in range(self.slots)
+                   if (entry := self._read_slot(index)) is not None and entry[1] > now)
+
+    # Writes (serialized across processes)
+
+    def _write_slot(self, index, key_hash=0, expires_at=0.0, flags=0, key=b'', value=b''):
+        mm = self._mm
+        offset = self._offset(index)
+        seq = SEQ.unpack_from(mm, offset)[0]
+        SEQ.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF)
+        start = offset + SLOT.size
+        mm[start:start + len(key)] = key
+        mm[start + len(key):start + len(key) + len(value)] = value
+        SLOT.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF, 0, flags, key_hash, expires_at, len(key), len(value))
+        SEQ.pack_into(mm, offset, (seq + 2) & 0xFFFFFFFF)
+
+    def _find(self, key_bytes, key_hash):
+        """Slot holding key, else a free/expired slot in the probe window, else None."""
+        home = key_hash % self.slots
+        now = time.time()
+        free = None
+        for probe in range(PROBE_LENGTH):
+            index = (home + probe) % self.slots
+            _, _, _, slot_hash, expires_at, key_len, _ = SLOT.unpack_from(self._mm, self._offset(index))
+            if key_len and slot_hash == key_hash:
+                start = self._offset(index) + SLOT.size
+                if self._mm[start:start + key_len] == key_bytes:
+                    return index, True
+            if free is None and (not key_len or expires_at <= now):
+                free = index
+        return free, False
+
+    def _clock_victim(self, home):
+        """Second-chance sweep over the probe window, starting at the shared clock hand."""
+        mm = self._mm
+        hand = struct.unpack_from('<I', mm, CLOCK_HAND_OFFSET)[0]
+        for step in range(2 * PROBE_LENGTH):
+            index = (home + (hand + step) % PROBE_LENGTH) % self.slots
+            ref_offset = self._offset(index) + 4
+            if mm[ref_offset]:
+                mm[ref_offset] = 0
+                continue
+            struct.pack_into('<I', mm, CLOCK_HAND_OFFSET, (hand + step + 1) % PROBE_LENGTH)
+            return index
+        return home
+
+    @_locked
+    def _store(self, key_bytes, key_hash, value, flags, expires_at):
+        index, found = self._find(key_bytes, key_hash)
+        if index is None:
+            index = self._clock_victim(key_hash % self.slots)
+            self._stats['evictions'] += 1
+        self._write_slot(index, key_hash, expires_at, flags, key_bytes, value)
+
+    def set(self, key, value, ttl_seconds):
+        """Store value; returns False when it is too large for a slot."""
+        key_bytes = _encode_key(key)
+        data, flags = _serialize(value)
+        if SLOT.size + len(key_bytes) + len(data) > self.slot_size:
+            self._oversize(key, SLOT.size + len(key_bytes) + len(data))
+            return False
+        self._store(key_bytes, _hash_key(key_bytes), data, flags, time.time() + ttl_seconds)
+        self._stats['sets'] += 1
+        return True
+
+    def _oversize(self, key, size):
+        name = key[0] if isinstance(key, tuple) and key else 'other'
+        self._stats['oversize'] += 1
+        instrumentation.METRICS.count('shared_cache_oversize_total', cache=name)
+        if not self._oversize_logged:
+            self._oversize_logged = True
+            logger.warning("Not caching a %d-byte %s entry: slots hold %d bytes (SHARED_CACHE_SLOT_SIZE); "
+                           "further oversize entries are only counted", size, name, self.slot_size)
+
+    @_locked
+    def delete(self, key):
+        key_bytes = _encode_key(key)
+        index, found = self._find(key_bytes, _hash_key(key_bytes))
+        if found:
+            self._write_slot(index)
+
+    @_locked
+    def clear(self):
+        for index in range(self.slots):
+            if SLOT.unpack_from(self._mm, self._offset(index))[5]:
+                self._write_slot(index)
+
+    def stats(self):
+        """Per-process hit/miss/set/eviction counters."""
+        return dict(self._stats)
+
+    def close(self):
+        self._mm.close()
+        if self._lock_fd is not None and self._lock_pid == os.getpid():
+            os.close(self._lock_fd)
+            self._lock_fd = None
@@ -65,11 +65,8 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load city options into dropdowns
     async function loadCityOptions() {
         try {
-            // Get list of all available cities
-            const response = await fetch('/search_cities', {
-                method: 'POST',
-                body: new FormData()
-            });
+            // Get list of all available cities (GET, so the browser/CDN can cache it)
+            const response = await fetch('/cities');
             
             if (!response.ok) {
                 throw new Error('Failed to fetch cities');
@@ -147,17 +144,11 @@ document.addEventListener('DOMContentLoaded', function() {
         minPricesDiv.innerHTML = '';
         minPricesDiv.style.display = 'none';
         
-        // Create form data
-        const formData = new FormData();
-        formData.append('startPoint', startPoint);
-        formData.append('destination', destination);
+        const params = new URLSearchParams({ startPoint, destination });
         
         try {
-            // Fetch minimum prices
-            const response = await fetch('/get_min_prices', {
-                method: 'POST',
-                body: formData
-            });
+            // Fetch minimum prices (GET, so repeat lookups are served from the HTTP cache)
+            const response = await fetch(`/get_min_prices?${params}`);
             
             if (!response.ok) throw new Error('Failed to fetch minimum prices');
             const data = await response.json();
@@ -0,0 +1,93 @@
+"""
+Storage backends for the persistent api_cache table.
+
+SQLiteStorage wraps database.py (local file) and PostgresStorage wraps
+supabase_db.py (Supabase/PostgreSQL, imported on first use so psycopg2
+stays out of the app's import path). Both expose the same methods, so
+create_app() and the cache sweeper do not care which one is configured.
+"""
+
+import os
+import sqlite3
+
+import database
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), 'travel_planner.db')
+
+
+def _partitioned_from_env():
+    return os.getenv("API_CACHE_PARTITIONED", "").lower() in ("1", "true", "yes")
+
+
+class SQLiteStorage:
+    """api_cache in a local SQLite file; partitioned uses daily shard tables."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, partitioned=False):
+        self.path = path
+        self.partitioned = partitioned
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _run(self, fn, *args, **kwargs):
+        conn = self.connect()
+        try:
+            return fn(conn, *args, **kwargs)
+        finally:
+            conn.close()
+
+    def get_cached_api_response(self, route_key, data_type):
+        return self._run(database.get_cached_api_response, route_key, data_type, sharded=self.partitioned)
+
+    def cache_api_response(self, route_key, data_type, response_data, ttl_hours=6):
+        self._run(database.cache_api_response, route_key, data_type, response_data,
+                  ttl_hours=ttl_hours, sharded=self.partitioned)
+
+    def sweep_expired_cache(self, batch_size=1000, max_batches=None):
+        return self._run(database.sweep_expired_cache, batch_size=batch_size, max_batches=max_batches,
+                         sharded=self.partitioned)
+
+    def drop_expired_partitions(self):
+        return self._run(database.drop_expired_api_cache_shards)
+
+    def ensure_partitions(self):
+        return self._run(database.ensure_api_cache_shards)
+
+
+class PostgresStorage:
+    """api_cache in Supabase/PostgreSQL (DATABASE_URL); partitioned uses daily partitions."""
+
+    def __init__(self, partitioned=False):
+        self.partitioned = partitioned
+
+    @staticmethod
+    def _db():
+        import supabase_db
+        return supabase_db
+
+    def connect(self):
+        return self._db().get_db_connection()
+
+    def get_cached_api_response(self, route_key, data_type):
+        return self._db().get_cached_api_response(route_key, data_type)
+
+    def cache_api_response(self, route_key, data_type, response_data, ttl_hours=6):
+        return self._db().cache_api_response(route_key, data_type, response_data, ttl_hours=ttl_hours)
+
+    def sweep_expired_cache(self, batch_size=1000, max_batches=None):
+        return self._db().sweep_expired_cache(batch_size=batch_size, max_batches=max_batches)
+
+    def drop_expired_partitions(self):
+        return self._db().drop_expired_api_cache_partitions()
+
+    def ensure_partitions(self):
+        return self._db().ensure_api_cache_partitions()
+
+
+def build_default_storage():
+    """PostgreSQL when DATABASE_URL is set, otherwise the local SQLite database."""
+    if os.getenv("DATABASE_URL"):
+        return PostgresStorage(partitioned=_partitioned_from_env())
+    return SQLiteStorage(partitioned=_partitioned_from_env())
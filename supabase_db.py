@@ -15,13 +15,20 @@ Setup Instructions:
 import os
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Optional daily-partitioned api_cache layout (partitioned by expires_at day).
+# Writes never run DDL: the cache sweeper creates upcoming daily partitions
+# ahead of time, and rows for a day without one land in the DEFAULT partition.
+API_CACHE_PARTITIONED = os.getenv("API_CACHE_PARTITIONED", "").lower() in ("1", "true", "yes")
+API_CACHE_PARTITION_PREFIX = "api_cache_p"
+API_CACHE_PARTITION_DAYS_AHEAD = 2
+
 def get_db_connection():
     """
     Create and return a PostgreSQL database connection.
@@ -90,16 +97,19 @@ def init_database():
         print("✓ Min prices table created/verified")
         
         # Create api_cache table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS api_cache (
-                route_key TEXT NOT NULL,
-                data_type TEXT NOT NULL,
-                response_data TEXT NOT NULL,
-                last_updated TIMESTAMP NOT NULL,
-                expires_at TIMESTAMP NOT NULL,
-                PRIMARY KEY (route_key, data_type)
-            )
-        ''')
+        if API_CACHE_PARTITIONED:
+            _create_partitioned_api_cache(cursor)
+        else:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    route_key TEXT NOT NULL,
+                    data_type TEXT NOT NULL,
+                    response_data TEXT NOT NULL,
+                    last_updated TIMESTAMP NOT NULL,
+                    expires_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (route_key, data_type)
+                )
+            ''')
         print("✓ API cache table created/verified")
         
         # Create indexes for better performance
@@ -216,10 +226,21 @@ def cache_api_response(route_key, data_type, response_data, ttl_hours=6):
     cursor = conn.cursor()
     
     try:
-        from datetime import timedelta
         now = datetime.now()
         expires_at = now + timedelta(hours=ttl_hours)
         
+        if API_CACHE_PARTITIONED:
+            # The primary key includes expires_at, so replace rather than upsert
+            cursor.execute('''
+                DELETE FROM api_cache WHERE route_key = %s AND data_type = %s
+            ''', (route_key, data_type))
+            cursor.execute('''
+                INSERT INTO api_cache (route_key, data_type, response_data, last_updated, expires_at)
+                VALUES (%s, %s, %s, %s, %s)
+            ''', (route_key, data_type, response_data, now, expires_at))
+            conn.commit()
+            return
+        
         cursor.execute('''
             INSERT INTO api_cache (route_key, data_type, response_data, last_updated, expires_at)
             VALUES (%s, %s, %s, %s, %s)
@@ -250,6 +271,8 @@ def get_cached_api_response(route_key, data_type):
             WHERE route_key = %s 
             AND data_type = %s 
             AND expires_at > %s
+            ORDER BY expires_at DESC
+            LIMIT 1
         ''', (route_key, data_type, datetime.now()))
         result = cursor.fetchone()
         return result['response_data'] if result else None
@@ -258,24 +281,176 @@ def get_cached_api_response(route_key, data_type):
         conn.close()
 
 
-def cleanup_expired_cache():
-    """Remove expired cache entries."""
+def cleanup_expired_cache(batch_size=1000):
+    """Remove expired cache entries in bounded batches."""
+    deleted = sweep_expired_cache(batch_size=batch_size)
+    print(f"Cleaned up {deleted} expired cache entries")
+    return deleted
+
+
+def sweep_expired_cache(batch_size=1000, max_batches=None, now=None):
+    """
+    Delete expired api_cache rows in batches of at most batch_size.
+    
+    Each batch is committed separately so row locks are held briefly and
+    autovacuum can keep up, instead of one unbounded DELETE.
+    
+    Args:
+        batch_size: Maximum rows deleted per statement
+        max_batches: Stop after this many batches (None = until drained)
+        now: Cutoff timestamp (defaults to datetime.now())
+        
+    Returns:
+        Total number of rows deleted
+    """
+    cutoff = now or datetime.now()
     conn = get_db_connection()
     cursor = conn.cursor()
+    total = 0
+    batches = 0
+    
+    try:
+        while max_batches is None or batches < max_batches:
+            cursor.execute('''
+                DELETE FROM api_cache
+                WHERE (route_key, data_type, expires_at) IN (
+                    SELECT route_key, data_type, expires_at
+                    FROM api_cache
+                    WHERE expires_at < %s
+                    LIMIT %s
+                )
+            ''', (cutoff, batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            total += deleted
+            batches += 1
+            if deleted < batch_size:
+                break
+    except psycopg2.Error as e:
+        print(f"Error sweeping cache: {e}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+    
+    return total
+
+
+def _create_partitioned_api_cache(cursor):
+    """Create api_cache as a table partitioned by day of expires_at."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_cache (
+            route_key TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            response_data TEXT NOT NULL,
+            last_updated TIMESTAMP NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (route_key, data_type, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+    ''')
+    # Catch-all so inserts never fail when a daily partition is missing
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_cache_default
+        PARTITION OF api_cache DEFAULT
+    ''')
+    today = datetime.now().date()
+    for offset in range(API_CACHE_PARTITION_DAYS_AHEAD + 1):
+        _ensure_partition(cursor, today + timedelta(days=offset))
+
+
+def _partition_name(day):
+    return f"{API_CACHE_PARTITION_PREFIX}{day.strftime('%Y%m%d')}"
+
+
+def _ensure_partition(cursor, day):
+    """Create the daily api_cache partition for day if it does not exist."""
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {_partition_name(day)}
+        PARTITION OF api_cache
+        FOR VALUES FROM (%s) TO (%s)
+    ''', (day, day + timedelta(days=1)))
+
+
+def ensure_api_cache_partitions(days_ahead=API_CACHE_PARTITION_DAYS_AHEAD):
+    """
+    Pre-create daily api_cache partitions for today and the next days_ahead days.
+    
+    Each day is its own transaction, so one that cannot be created (e.g. the
+    DEFAULT partition already holds rows for it) does not undo the others.
+    
+    Returns:
+        Number of days whose partition exists afterwards
+    """
+    if not API_CACHE_PARTITIONED:
+        return 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    ensured = 0
+    
+    try:
+        today = datetime.now().date()
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            try:
+                _ensure_partition(cursor, day)
+                conn.commit()
+                ensured += 1
+            except psycopg2.Error as e:
+                print(f"Error creating cache partition for {day}: {e}")
+                conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+    
+    return ensured
+
+
+def drop_expired_api_cache_partitions(now=None):
+    """
+    Drop daily api_cache partitions whose whole range has expired.
+    
+    Dropping a partition is a metadata operation, so it removes a day's worth
+    of rows without scanning or vacuuming them.
+    
+    Returns:
+        Number of partitions dropped
+    """
+    if not API_CACHE_PARTITIONED:
+        return 0
+    today = (now or datetime.now()).date()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    dropped = 0
     
     try:
         cursor.execute('''
-            DELETE FROM api_cache WHERE expires_at < %s
-        ''', (datetime.now(),))
-        deleted = cursor.rowcount
+            SELECT child.relname AS name
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = 'api_cache'
+        ''')
+        for row in cursor.fetchall():
+            name = row['name']
+            if not name.startswith(API_CACHE_PARTITION_PREFIX):
+                continue
+            try:
+                day = datetime.strptime(name[len(API_CACHE_PARTITION_PREFIX):], '%Y%m%d').date()
+            except ValueError:
+                continue
+            # Partition covers [day, day + 1); everything in it expired before today
+            if day < today:
+                cursor.execute(f'DROP TABLE IF EXISTS {name}')
+                dropped += 1
         conn.commit()
-        print(f"Cleaned up {deleted} expired cache entries")
     except psycopg2.Error as e:
-        print(f"Error cleaning cache: {e}")
+        print(f"Error dropping cache partitions: {e}")
         conn.rollback()
     finally:
         cursor.close()
         conn.close()
+    
+    return dropped
 
 
 if __name__ == "__main__":
@@ -10,13 +10,69 @@ from datetime import datetime
 # Add parent directory to path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from main import app as flask_app
+# Keep rate-limit counters and response caches per test process instead of in
+# the shared host files
+os.environ.setdefault('RATELIMIT_STORAGE_URI', 'memory://')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+
+from cache_backends import MemoryCache
+from fx import FxConverter, StaticRateProvider
+from main import create_app
+from quota import QuotaGovernor, request_slot
+
+
+class StubResponse:
+    """Minimal stand-in for a requests Response."""
+
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+class StubUpstream:
+    """
+    Upstream client that answers searches and Gemini prompts locally.
+
+    flights and hotels are lists of offers, or functions taking the
+    search's keyword arguments and returning one (or raising, to simulate
+    an upstream failure). Each search is recorded in flight_calls or
+    hotel_calls as its keyword arguments and takes a quota slot, as one
+    Amadeus HTTP request would.
+    """
+
+    gemini_enabled = True
+    reply = 'Pack light and visit the museums early in the morning. ' * 4
+
+    def __init__(self, flights=(), hotels=()):
+        self.flights, self.hotels = flights, hotels
+        self.flight_calls, self.hotel_calls = [], []
+        self.prompts = []
+
+    def search_flights(self, **kwargs):
+        return self._answer(self.flights, self.flight_calls, kwargs)
+
+    def search_hotels(self, **kwargs):
+        return self._answer(self.hotels, self.hotel_calls, kwargs)
+
+    def generate_content(self, payload, timeout=30):
+        self.prompts.append(payload)
+        return StubResponse(200, {'candidates': [{'content': {'parts': [{'text': self.reply}]}}]})
+
+    @staticmethod
+    def _answer(source, calls, kwargs):
+        with request_slot():
+            calls.append(kwargs)
+        return list(source(**kwargs) if callable(source) else source)
 
 
 @pytest.fixture
 def app():
     """Create and configure a Flask application instance for testing."""
-    flask_app.config.update({
+    flask_app = create_app({
         "TESTING": True,
         "SECRET_KEY": "test-secret-key-for-testing-only",
     })
@@ -24,12 +80,48 @@ def app():
     yield flask_app
 
 
+@pytest.fixture(autouse=True)
+def reset_amadeus_tokens():
+    """Don't let one test's cached Amadeus token skip another test's token call."""
+    yield
+    import amadeus_api
+    amadeus_api.clear_token_cache()
+
+
 @pytest.fixture
 def client(app):
     """A test client for the Flask application."""
     return app.test_client()
 
 
+@pytest.fixture
+def make_client():
+    """Build a test client for a fresh app; keyword arguments are passed to create_app()."""
+    def _make(**services):
+        return create_app({"TESTING": True}, **services).test_client()
+    return _make
+
+
+@pytest.fixture
+def stub_upstream():
+    """The StubUpstream class; call it with the flights/hotels to serve."""
+    return StubUpstream
+
+
+@pytest.fixture
+def stub_client(make_client):
+    """
+    Build a test client around an upstream stub, with a fresh memory cache,
+    INR as the canonical currency (80 INR to the USD) and a quota that only
+    the given one will exhaust.
+    """
+    def _make(upstream, cache=None, quota=None):
+        return make_client(upstream=upstream, cache=MemoryCache() if cache is None else cache,
+                           fx=FxConverter(StaticRateProvider({'INR': 80.0}), canonical='INR'),
+                           quota=quota or QuotaGovernor(rate=1000, burst=1000, max_in_flight=4))
+    return _make
+
+
 @pytest.fixture
 def runner(app):
     """A test CLI runner for the Flask application."""
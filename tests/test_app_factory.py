@@ -0,0 +1,101 @@
+"""
+Tests for create_app() and its injected upstream/cache/storage backends.
+"""
+
+import pytest
+
+import main
+from cache_backends import MemoryCache
+from storage import SQLiteStorage
+
+
+class TestMemoryCache:
+    """Tests for the in-process cache backend."""
+
+    def test_get_set_and_expiry(self):
+        cache = MemoryCache()
+        cache.set(('k',), 'v', ttl_seconds=60)
+        cache.set(('gone',), 'v', ttl_seconds=-1)
+        assert cache.get(('k',)) == 'v'
+        assert cache.get(('gone',), 'default') == 'default'
+        cache.delete(('k',))
+        assert len(cache) == 0
+
+
+class TestCreateApp:
+    """Tests for building independently configured apps."""
+
+    def test_apps_have_separate_services(self, stub_upstream):
+        first = main.create_app({'TESTING': True}, upstream=stub_upstream())
+        second = main.create_app({'TESTING': True, 'SOME_SETTING': 'x'})
+
+        assert first.extensions['travel_planner'].cache is not second.extensions['travel_planner'].cache
+        assert second.config['SOME_SETTING'] == 'x'
+        assert 'SOME_SETTING' not in first.config
+
+    def test_shared_cache_is_sized_per_app(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('CACHE_BACKEND', 'shared')
+        monkeypatch.setenv('SHARED_CACHE_PATH', str(tmp_path / 'cache.mmap'))
+        app = main.create_app({'TESTING': True, 'SHARED_CACHE_SLOTS': 64, 'SHARED_CACHE_SLOT_SIZE': 16384})
+
+        cache = app.extensions['travel_planner'].cache
+        assert (cache.slots, cache.slot_size) == (64, 16384)
+        cache.close()
+
+    def test_apps_have_independent_rate_limiters(self):
+        limited = main.create_app({'TESTING': True}).test_client()
+        unlimited = main.create_app({'TESTING': True, 'RATELIMIT_ENABLED': False}).test_client()
+
+        # 10 per minute; building the second app must not disable the first's limiter
+        assert [limited.post('/search_hotels').status_code for _ in range(11)][-1] == 429
+        assert [unlimited.post('/search_hotels').status_code for _ in range(11)][-1] == 400
+
+    def test_importing_main_builds_no_app(self):
+        assert not hasattr(main, 'app')
+        assert main.rate_limit_exempt(lambda: None).rate_limit_exempt
+
+    def test_min_prices_use_injected_upstream_and_cache(self, make_client, stub_upstream):
+        upstream = stub_upstream(hotels=[{'name': 'Paris Inn', 'price': 1800.0}])
+        cache = MemoryCache()
+        client = make_client(upstream=upstream, cache=cache)
+        form = {'startPoint': 'Delhi, India', 'destination': 'Paris, France'}
+
+        first = client.post('/get_min_prices', data=form).get_json()
+        calls = len(upstream.hotel_calls)
+        second = client.post('/get_min_prices', data=form).get_json()
+
+        assert first == second == {'min_hotel_price': '₹1,800'}
+        assert calls > 0 and len(upstream.hotel_calls) == calls
+        assert len(cache) == 1
+
+    def test_chatbot_uses_injected_gemini_client(self, make_client, stub_upstream):
+        upstream = stub_upstream()
+        client = make_client(upstream=upstream)
+
+        data = client.post('/chatbot', data={'message': 'What should I see?', 'destination': 'Paris'}).get_json()
+
+        assert 'museums' in data['response']
+        assert len(upstream.prompts) == 1
+
+    def test_sweeper_runs_against_injected_storage(self, tmp_path):
+        storage = SQLiteStorage(str(tmp_path / 'cache.db'))
+        conn = storage.connect()
+        conn.execute('''CREATE TABLE api_cache (route_key TEXT, data_type TEXT, response_data TEXT,
+                        last_updated TIMESTAMP, expires_at TIMESTAMP, PRIMARY KEY (route_key, data_type))''')
+        conn.close()
+        storage.cache_api_response('DEL-BOM', 'flights', '[]')
+        storage.cache_api_response('DEL-GOI', 'flights', '[]', ttl_hours=-1)
+
+        app = main.create_app({'TESTING': True, 'CACHE_SWEEP_INTERVAL': 3600}, storage=storage)
+        sweeper = app.extensions['travel_planner'].cache_sweeper
+        try:
+            assert sweeper.run_once() == 1
+        finally:
+            sweeper.stop()
+        assert storage.get_cached_api_response('DEL-BOM', 'flights') == '[]'
+
+
+@pytest.mark.integration
+def test_login_links_resolve_through_blueprint(client):
+    assert b'/signup' in client.get('/login').data
+    assert client.get('/logout').headers['Location'].endswith('/login')
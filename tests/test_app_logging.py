@@ -0,0 +1,111 @@
+"""
+Unit tests for queued, structured, sampled logging.
+"""
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from app_logging import (SamplingFilter, StructuredFormatter, configure_logging, flush_logging,
+                         parse_sample_rates)
+
+
+class FormatProbe:
+    """Argument that records which thread (if any) formatted it."""
+
+    def __init__(self):
+        self.formatted_in = []
+
+    def __str__(self):
+        self.formatted_in.append(threading.current_thread().name)
+        return 'probe'
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    configure_logging(level='INFO', fmt='json', sample={'sampled': 0.1}, stream=stream, force=True)
+    yield stream
+    configure_logging(force=True)
+
+
+def _records(stream):
+    flush_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestStructuredLogging:
+    """Tests for level gating, deferred formatting and JSON output."""
+
+    def test_json_lines_carry_extra_fields(self, log_stream):
+        logging.getLogger('amadeus_api').info("GET %s -> %d", '/v1/x', 429, extra={'attempt': 2})
+
+        (record,) = _records(log_stream)
+        assert record['msg'] == 'GET /v1/x -> 429'
+        assert (record['level'], record['logger'], record['attempt']) == ('INFO', 'amadeus_api', 2)
+
+    def test_below_level_is_never_formatted(self, log_stream):
+        probe = FormatProbe()
+        logging.getLogger('city_data').debug("Looking up %s", probe)
+
+        assert _records(log_stream) == []
+        assert probe.formatted_in == []
+
+    def test_formatting_happens_off_the_calling_thread(self, log_stream):
+        probe = FormatProbe()
+        logging.getLogger('main').warning("value %s", probe)
+
+        assert _records(log_stream)[0]['msg'] == 'value probe'
+        # pytest's capture handlers format on this thread too; ours is the listener's
+        assert any(name != threading.current_thread().name for name in probe.formatted_in)
+
+    def test_exceptions_include_traceback(self, log_stream):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logging.getLogger('main').exception("Error in /search")
+
+        record = _records(log_stream)[0]
+        assert record['level'] == 'ERROR' and 'ValueError: boom' in record['exc']
+
+
+class TestSampling:
+    """Tests for per-module sampling of DEBUG records."""
+
+    def test_keeps_configured_fraction_of_debug_only(self):
+        sampler = SamplingFilter({'amadeus_api': 0.1})
+
+        def kept(name, level, count):
+            return sum(sampler.filter(logging.LogRecord(name, level, '', 0, 'x', (), None))
+                       for _ in range(count))
+
+        assert kept('amadeus_api', logging.DEBUG, 1000) == 100
+        assert kept('amadeus_api.sub', logging.DEBUG, 10) == 1
+        assert kept('amadeus_api', logging.WARNING, 10) == 10
+        assert kept('amadeus_api_other', logging.DEBUG, 10) == 10
+
+    def test_parse_sample_rates(self):
+        assert parse_sample_rates('amadeus_api=0.1, city_data=0.01,') == {'amadeus_api': 0.1, 'city_data': 0.01}
+        assert parse_sample_rates(None) == {}
+
+    def test_configured_sampling_applies_to_queue(self):
+        stream = io.StringIO()
+        configure_logging(level='DEBUG', sample={'sampled': 0.1}, stream=stream, force=True)
+        try:
+            for i in range(50):
+                logging.getLogger('sampled').debug("line %d", i)
+            logging.getLogger('sampled').error("always")
+            records = _records(stream)
+        finally:
+            configure_logging(force=True)
+
+        assert len(records) == 6
+        assert records[-1]['msg'] == 'always'
+
+
+def test_format_without_queue():
+    record = logging.LogRecord('x', logging.INFO, '', 0, 'hi %s', ('there',), None)
+    assert json.loads(StructuredFormatter().format(record))['msg'] == 'hi there'
@@ -0,0 +1,101 @@
+"""
+Tests for the /batch_search JSON endpoint.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from offers import FlightOffer
+from quota import QuotaGovernor
+
+DEPARTURE = (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d')
+
+
+def _flights(empty=(), fail=()):
+    """Five fares per route; none to destinations in empty, an error for those in fail."""
+    def search(origin, destination, departure_date, **kwargs):
+        if destination in fail:
+            raise RuntimeError("upstream down")
+        if destination in empty:
+            return []
+        return [FlightOffer('Test Air', 'TA', str(n), f'{departure_date}T10:00:00', None, origin, destination,
+                            4000 + 1000 * n, 'INR', None) for n in range(5)]
+    return search
+
+
+def _query(destination, origin='DEL', **extra):
+    return dict({'origin': origin, 'destination': destination, 'departureDate': DEPARTURE}, **extra)
+
+
+class TestBatchSearch:
+    """Tests for POST /batch_search."""
+
+    def test_results_in_order_with_duplicates_run_once(self, stub_client, stub_upstream):
+        upstream = stub_upstream(flights=_flights(empty={'GOI'}))
+        queries = [_query('BOM'), _query('GOI'), _query('bom', adults='1'), _query('XX1'), _query('DXB')]
+
+        data = stub_client(upstream).post('/batch_search', json={'queries': queries, 'limit': 2}).get_json()
+
+        assert [result['index'] for result in data['results']] == [0, 1, 2, 3, 4]
+        assert [result['status'] for result in data['results']] == ['ok', 'not_found', 'ok', 'invalid', 'ok']
+        assert data['unique'] == 3
+        assert sorted(call['destination'] for call in upstream.flight_calls) == ['BOM', 'DXB', 'GOI']
+        assert [flight['price'] for flight in data['results'][0]['flights']] == [4000, 5000]
+        assert data['results'][3]['error']
+
+    def test_failures_are_per_item(self, stub_client, stub_upstream):
+        upstream = stub_upstream(flights=_flights(fail={'GOI'}))
+        data = stub_client(upstream).post('/batch_search', json={
+            'queries': [_query('GOI'), _query('BOM')], 'currency': 'USD'}).get_json()
+
+        assert [result['status'] for result in data['results']] == ['error', 'ok']
+        assert data['results'][1]['flights'][0]['currency'] == 'USD'
+
+    def test_throttled_when_quota_is_exhausted(self, stub_client, stub_upstream):
+        quota = QuotaGovernor(rate=0.001, burst=1, max_in_flight=1)
+        data = stub_client(stub_upstream(flights=_flights()), quota=quota).post('/batch_search', json={
+            'queries': [_query('GOI'), _query('BOM')]}).get_json()
+
+        assert sorted(result['status'] for result in data['results']) == ['ok', 'throttled']
+
+    def test_warm_batch_takes_no_quota(self, stub_client, stub_upstream):
+        upstream = stub_upstream(flights=_flights())
+        quota = QuotaGovernor(rate=0.001, burst=5, max_in_flight=4)  # spent by the cold batch
+        client = stub_client(upstream, quota=quota)
+        queries = {'queries': [_query(code) for code in ['BOM', 'GOI', 'DXB', 'BLR', 'MAA'] * 5]}
+        client.post('/batch_search', json=queries)
+        assert len(upstream.flight_calls) == 5
+
+        started = time.monotonic()
+        data = client.post('/batch_search', json=queries).get_json()
+
+        assert time.monotonic() - started < 1.0
+        assert {result['status'] for result in data['results']} == {'ok'}
+        assert len(upstream.flight_calls) == 5
+
+    @pytest.mark.parametrize('body', [
+        None,
+        {'queries': []},
+        {'queries': [_query('BOM')] * 26},
+        {'queries': [_query('BOM')], 'limit': 'many'},
+        {'queries': [_query('BOM')], 'currency': 'XXX'},
+    ])
+    def test_malformed_requests(self, stub_client, stub_upstream, body):
+        response = stub_client(stub_upstream(flights=_flights())).post('/batch_search', json=body)
+        assert response.status_code == 400
+
+    def test_rate_limit_counts_upstream_searches(self, stub_client, stub_upstream):
+        client = stub_client(stub_upstream(flights=_flights()))
+        codes = ['B' + a + b for a in 'ABC' for b in 'ABCDEFGHIJKLMNOPQRST']  # 60 distinct routes
+
+        def batch(destinations):
+            return client.post('/batch_search', json={'queries': [_query(code) for code in destinations]})
+
+        assert batch(codes[:25]).status_code == 200
+        assert batch(codes[25:50]).status_code == 200
+        assert batch(codes[50:55] + codes[:20]).status_code == 200  # cached searches are free
+        assert batch(codes[:25]).status_code == 200
+        # 25 + 25 + 5 + 1 of 60 spent; five more searches don't fit
+        assert batch(['ZZA', 'ZZB', 'ZZC', 'ZZD', 'ZZE']).status_code == 429
@@ -0,0 +1,156 @@
+"""
+Unit tests for batched cache sweeping and the sharded SQLite api_cache layout.
+"""
+
+import sqlite3
+import datetime
+import pytest
+
+import database
+from cache_sweeper import CacheSweeper
+from instrumentation import METRICS, render_prometheus
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(':memory:')
+    connection.execute('''
+        CREATE TABLE api_cache (
+            route_key TEXT NOT NULL,
+            data_type TEXT NOT NULL,
+            response_data TEXT NOT NULL,
+            last_updated TIMESTAMP NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (route_key, data_type)
+        )
+    ''')
+    yield connection
+    connection.close()
+
+
+def _insert(conn, count, expires_at):
+    now = datetime.datetime.now()
+    conn.executemany(
+        'INSERT INTO api_cache VALUES (?, ?, ?, ?, ?)',
+        [(f'route-{expires_at}-{i}', 'flights', '{}', now, expires_at) for i in range(count)]
+    )
+    conn.commit()
+
+
+class TestSqliteSweep:
+    """Tests for batched deletes on the SQLite api_cache table."""
+
+    def test_sweep_removes_only_expired_rows(self, conn):
+        now = datetime.datetime.now()
+        _insert(conn, 25, now - datetime.timedelta(hours=1))
+        _insert(conn, 5, now + datetime.timedelta(hours=1))
+
+        deleted = database.sweep_expired_cache(conn, batch_size=10)
+
+        assert deleted == 25
+        assert conn.execute('SELECT COUNT(*) FROM api_cache').fetchone()[0] == 5
+
+    def test_sweep_respects_max_batches(self, conn):
+        _insert(conn, 25, datetime.datetime.now() - datetime.timedelta(hours=1))
+
+        deleted = database.sweep_expired_cache(conn, batch_size=10, max_batches=2)
+
+        assert deleted == 20
+        assert conn.execute('SELECT COUNT(*) FROM api_cache').fetchone()[0] == 5
+
+
+class TestSqliteShards:
+    """Tests for the per-day sharded api_cache layout."""
+
+    def test_round_trip_through_shard(self, conn):
+        database.cache_api_response(conn, 'DEL-BOM', 'flights', '[1]', sharded=True)
+        database.cache_api_response(conn, 'DEL-BOM', 'flights', '[2]', sharded=True)
+
+        assert database.get_cached_api_response(conn, 'DEL-BOM', 'flights', sharded=True) == '[2]'
+
+    def test_writes_run_no_ddl_once_shards_exist(self, conn):
+        assert database.ensure_api_cache_shards(conn, days_ahead=2) == 3
+        statements = []
+        conn.set_trace_callback(statements.append)
+
+        database.cache_api_response(conn, 'DEL-BOM', 'flights', '[1]', sharded=True)
+
+        assert not [sql for sql in statements if 'CREATE' in sql.upper()]
+        assert database.get_cached_api_response(conn, 'DEL-BOM', 'flights', sharded=True) == '[1]'
+
+    def test_sweep_covers_shards(self, conn):
+        now = datetime.datetime.now()
+        old = database.ensure_api_cache_shard(conn, now.date() - datetime.timedelta(days=2))
+        current = database.ensure_api_cache_shard(conn, now.date())
+        rows = [(f'route-{i}', 'flights', '{}', now, now - datetime.timedelta(days=2)) for i in range(3)]
+        conn.executemany(f'INSERT INTO {old} VALUES (?, ?, ?, ?, ?)', rows)
+        conn.executemany(f'INSERT INTO {current} VALUES (?, ?, ?, ?, ?)', [
+            ('expired', 'flights', '{}', now, now - datetime.timedelta(minutes=1)),
+            ('live', 'flights', '{}', now, now + datetime.timedelta(minutes=1)),
+        ])
+        _insert(conn, 2, now - datetime.timedelta(hours=1))
+
+        deleted = database.sweep_expired_cache(conn, batch_size=10, sharded=True)
+
+        assert deleted == 3 + 1 + 2
+        assert [name for _, name in database.list_api_cache_shards(conn)] == [current]
+        assert [row[0] for row in conn.execute(f'SELECT route_key FROM {current}')] == ['live']
+
+    def test_drop_expired_shards(self, conn):
+        today = datetime.date.today()
+        database.ensure_api_cache_shard(conn, today - datetime.timedelta(days=2))
+        database.ensure_api_cache_shard(conn, today)
+
+        dropped = database.drop_expired_api_cache_shards(conn)
+
+        assert dropped == 1
+        assert [day for day, _ in database.list_api_cache_shards(conn)] == [today]
+
+
+class TestCacheSweeper:
+    """Tests for sweeper scheduling metrics."""
+
+    def test_run_once_records_metrics(self):
+        calls = []
+
+        def fake_sweep(batch_size, max_batches):
+            calls.append((batch_size, max_batches))
+            return 42
+
+        ensured = []
+        sweeper = CacheSweeper(fake_sweep, drop_partitions_fn=lambda: 3, batch_size=500, max_batches=4,
+                               ensure_partitions_fn=lambda: ensured.append(True))
+        assert sweeper.run_once() == 42
+        sweeper.run_once()
+
+        stats = sweeper.stats()
+        assert calls == [(500, 4), (500, 4)]
+        assert len(ensured) == 2
+        assert stats['runs'] == 2
+        assert stats['rows_swept_total'] == 84
+        assert stats['partitions_dropped_total'] == 6
+        assert stats['last_duration_seconds'] >= 0
+
+    def test_run_once_exports_to_prometheus(self):
+        METRICS.reset()
+        CacheSweeper(lambda batch_size, max_batches: 7, drop_partitions_fn=lambda: 1).run_once()
+
+        def failing_sweep(batch_size, max_batches):
+            raise sqlite3.OperationalError("database is locked")
+
+        CacheSweeper(failing_sweep).run_once()
+
+        assert METRICS.counter_value('cache_sweep_rows_total') == 7
+        assert METRICS.counter_value('cache_sweep_partitions_dropped_total') == 1
+        assert METRICS.counter_value('cache_sweep_runs_total', result='ok') == 1
+        assert METRICS.counter_value('cache_sweep_runs_total', result='error') == 1
+        assert METRICS.histogram('cache_sweep_duration_seconds').count == 2
+        assert 'cache_sweep_duration_seconds_count 2' in render_prometheus()
+
+    def test_run_once_counts_errors(self):
+        def failing_sweep(batch_size, max_batches):
+            raise sqlite3.OperationalError("no such table: api_cache")
+
+        sweeper = CacheSweeper(failing_sweep)
+        assert sweeper.run_once() == 0
+        assert sweeper.stats()['errors'] == 1
@@ -0,0 +1,124 @@
+"""
+Unit tests for the local city/airport autocomplete index.
+"""
+
+import os
+import pytest
+
+from city_index import CityIndex, build_default_index, load_airport_dataset, normalize
+
+
+@pytest.fixture(scope='module')
+def index():
+    return build_default_index()
+
+
+class TestCityIndex:
+    """Tests for prefix lookup and ranking."""
+
+    def test_prefix_match_on_city_name(self, index):
+        results = index.search('par')
+        assert results[0]['name'] == 'Paris'
+        assert results[0]['subType'] == 'CITY'
+
+    def test_exact_iata_code_ranks_first(self, index):
+        assert index.search('JFK')[0]['iataCode'] == 'JFK'
+        assert index.search('bom')[0]['name'] == 'Mumbai'
+
+    def test_alias_and_inner_word_match(self, index):
+        assert index.search('Bombay')[0]['name'] == 'Mumbai'
+        assert 'DEL' in [r['iataCode'] for r in index.search('gandhi')]
+
+    def test_popularity_orders_partial_matches(self):
+        index = CityIndex()
+        index.add({'name': 'Lucknow', 'iataCode': 'LKO', 'subType': 'AIRPORT'}, ['Lucknow'], 10)
+        index.add({'name': 'London', 'iataCode': 'LON', 'subType': 'CITY'}, ['London'], 100)
+        assert [r['iataCode'] for r in index.search('l')] == ['LON', 'LKO']
+
+    def test_limit_and_miss(self, index):
+        assert len(index.search('a', limit=2)) == 2
+        assert index.search('zzzz') == []
+        assert index.search('   ') == []
+
+    def test_merge_upstream_result(self):
+        index = CityIndex()
+        index.merge_upstream([{
+            'name': 'GOA INTL', 'iataCode': 'GOI', 'subType': 'AIRPORT',
+            'address': {'cityName': 'GOA', 'countryName': 'INDIA'}
+        }])
+        assert index.search('goa')[0]['iataCode'] == 'GOI'
+
+    def test_merges_into_a_built_index(self):
+        index = build_default_index()
+        index.add({'name': 'Aalborg', 'iataCode': 'AAL', 'subType': 'AIRPORT'}, ['Aalborg'], 100)
+        index.bulk_add([({'name': f'Zed {n}', 'iataCode': f'Z{n:02d}', 'subType': 'CITY'}, [f'Zed {n}'], 1)
+                        for n in range(100)])
+
+        assert index.search('aalb')[0]['iataCode'] == 'AAL'
+        assert index.search('zed 42')[0]['iataCode'] == 'Z42'
+        assert index.search('par')[0]['name'] == 'Paris'
+
+    def test_upstream_misses_expire(self):
+        index = CityIndex()
+        index.note_miss('Xq')
+        index.note_miss('Yq', ttl_seconds=-1)
+
+        assert index.recent_miss('xq') and index.recent_miss('XQZ')
+        assert not index.recent_miss('x') and not index.recent_miss('yq')
+
+    def test_dataset_loader(self):
+        items = load_airport_dataset(os.path.join(os.path.dirname(__file__), '..', 'data', 'airports.csv'))
+        codes = {location['iataCode'] for location, _, _ in items}
+        assert {'BLR', 'HYD', 'LHR'} <= codes
+
+    def test_normalize(self):
+        assert normalize("  São  Paulo–Guarulhos ") == 'sao paulo guarulhos'
+
+
+class StubCitySearch:
+    """Upstream client whose city search returns fixed locations."""
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.calls = []
+
+    def search_cities(self, query):
+        self.calls.append(query)
+        return self.locations
+
+
+@pytest.mark.integration
+class TestSearchCitiesRoute:
+    """Tests for /search_cities answering locally."""
+
+    def test_local_hit_skips_amadeus(self, make_client):
+        client = make_client(upstream=StubCitySearch([]))
+        response = client.post('/search_cities', data={'query': 'lond'})
+        assert response.status_code == 200
+        assert response.get_json()['suggestions'][0]['name'] == 'London'
+        assert client.application.extensions['travel_planner'].upstream.calls == []
+
+    def test_miss_falls_back_and_merges(self, make_client):
+        upstream = StubCitySearch([{'name': 'Reykjavik', 'iataCode': 'REK', 'subType': 'CITY',
+                                    'address': {'cityName': 'Reykjavik', 'countryName': 'Iceland'}}])
+        client = make_client(upstream=upstream)
+
+        first = client.post('/search_cities', data={'query': 'reykj'})
+        second = client.post('/search_cities', data={'query': 'reyk'})
+
+        assert first.get_json()['suggestions'][0]['iataCode'] == 'REK'
+        assert second.get_json()['suggestions'][0]['iataCode'] == 'REK'
+        assert upstream.calls == ['reykj']
+
+    def test_upstream_miss_is_not_repeated(self, make_client):
+        upstream = StubCitySearch([])
+        client = make_client(upstream=upstream)
+
+        for query in ('qqxz', 'qqxz', 'qqxzw'):
+            assert client.post('/search_cities', data={'query': query}).get_json()['suggestions'] == []
+
+        assert upstream.calls == ['qqxz']
+
+    def test_empty_query_lists_available_cities(self, client):
+        data = client.post('/search_cities', data={}).get_json()
+        assert {'name': 'Delhi', 'country': 'India', 'city_code': 'DEL'} in data['available_cities']
@@ -0,0 +1,112 @@
+"""
+Unit tests for request deadline propagation (deadline.py) through the
+Amadeus retry loop and the routes.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import amadeus_api
+import deadline
+from cache_backends import MemoryCache
+
+
+class StubResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def http_calls(monkeypatch):
+    """Make every Amadeus GET return 429 and record (timeout, sleep) calls."""
+    calls = {'timeouts': [], 'sleeps': []}
+
+    def fake_get(url, headers=None, params=None, timeout=None):
+        calls['timeouts'].append(timeout)
+        return StubResponse(429)
+
+    monkeypatch.setattr(amadeus_api.requests, 'get', fake_get)
+    monkeypatch.setattr(amadeus_api.time, 'sleep', calls['sleeps'].append)
+    return calls
+
+
+class TestDeadline:
+    """Tests for the context-local budget helpers."""
+
+    def test_unlimited_outside_a_deadline(self):
+        assert deadline.remaining() is None
+        assert deadline.allows(3600)
+        assert deadline.call_timeout(20) == 20
+
+    def test_nested_deadline_never_extends_outer(self):
+        with deadline.request_deadline(2):
+            with deadline.request_deadline(60):
+                assert deadline.remaining() <= 2
+            assert deadline.call_timeout(20) <= 2
+            assert not deadline.allows(5)
+        assert deadline.remaining() is None
+
+    def test_exhausted_budget_raises_a_requests_timeout(self):
+        with deadline.request_deadline(0):
+            with pytest.raises(requests.exceptions.Timeout):
+                deadline.call_timeout(20)
+
+    def test_submit_carries_deadline_into_worker_threads(self):
+        with deadline.request_deadline(10), ThreadPoolExecutor(max_workers=1) as executor:
+            assert 0 < deadline.submit(executor, deadline.remaining).result() <= 10
+            assert executor.submit(deadline.remaining).result() is None
+
+
+class TestRetryUnderDeadline:
+    """Tests for _request_with_retry's budget-aware timeouts and retries."""
+
+    def test_retries_without_deadline(self, http_calls):
+        response = amadeus_api._request_with_retry('GET', 'https://example.test')
+
+        assert response.status_code == 429
+        assert http_calls['sleeps'] == [0.5, 1.0, 2.0]
+        assert http_calls['timeouts'] == [amadeus_api.AMADEUS_TIMEOUT] * 4
+
+    def test_tight_deadline_skips_retries_and_caps_timeout(self, http_calls):
+        with deadline.request_deadline(1.2):
+            response = amadeus_api._request_with_retry('GET', 'https://example.test')
+
+        assert response.status_code == 429
+        # 0.5s backoff + 0.5s minimum call fits once; the 1s backoff does not
+        assert http_calls['sleeps'] == [0.5]
+        assert all(timeout <= 1.2 for timeout in http_calls['timeouts'])
+
+    def test_expired_deadline_makes_no_call(self, http_calls):
+        with deadline.request_deadline(0):
+            assert amadeus_api.get_city_code('Paris', 'token') is None
+        assert http_calls['timeouts'] == []
+
+
+class DeadlineRecordingUpstream:
+    """Upstream stub that records the budget visible to each hotel lookup."""
+
+    def __init__(self):
+        self.remaining = []
+
+    def search_hotels(self, city_name, check_in, check_out, adults=1):
+        self.remaining.append(deadline.remaining())
+        return [{'price': 1000.0}]
+
+
+def test_routes_run_under_configured_deadline(monkeypatch):
+    import main
+
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    upstream = DeadlineRecordingUpstream()
+    client = main.create_app({'TESTING': True, 'REQUEST_DEADLINE_SECONDS': 10},
+                             upstream=upstream, cache=MemoryCache()).test_client()
+
+    response = client.post('/get_min_prices', data={'startPoint': 'Delhi, India', 'destination': 'Paris, France'})
+
+    assert response.status_code == 200
+    # Seen in the min-price worker threads, and cleared after the request
+    assert upstream.remaining and all(0 < left <= 10 for left in upstream.remaining)
+    assert deadline.remaining() is None
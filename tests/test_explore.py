@@ -0,0 +1,118 @@
+"""
+Tests for the /explore destination ranking stream.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache_backends import MemoryCache
+from city_data import AVAILABLE_CITIES
+from offers import FlightOffer, HotelOffer
+
+FLIGHT_PRICES = {'NYC': 60000, 'LON': 45000, 'PAR': 40000, 'TYO': 35000, 'SYD': 70000,
+                 'DXB': 15000, 'SIN': 20000, 'BOM': 5000, 'SFO': 80000}
+
+
+def _flights(fail=()):
+    """One fare per destination at FLIGHT_PRICES; an error for destinations in fail."""
+    def search(origin, destination, **kwargs):
+        if destination in fail:
+            raise RuntimeError("upstream down")
+        return [FlightOffer('Test Air', 'TA', '1', '2030-01-10T10:00:00', None, origin, destination,
+                            FLIGHT_PRICES.get(destination, 50000), 'INR', None)]
+    return search
+
+
+def _hotels(city_name, **kwargs):
+    return [HotelOffer('Stub Hotel', 4.0, 4000, 'INR', city_name, '')]
+
+
+def _form(**overrides):
+    start = datetime.now() + timedelta(days=20)
+    form = {'startPointCode': 'DEL', 'startDate': start.strftime('%Y-%m-%d'),
+            'endDate': (start + timedelta(days=3)).strftime('%Y-%m-%d'), 'budget': '60000'}
+    form.update(overrides)
+    return form
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+
+
+class TestExplore:
+    """Tests for POST /explore."""
+
+    @pytest.fixture
+    def upstream(self, stub_upstream):
+        return stub_upstream(flights=_flights(), hotels=_hotels)
+
+    def test_streams_every_destination_then_ranking(self, stub_client, upstream):
+        response = stub_client(upstream).post('/explore', data=_form())
+        lines = _lines(response)
+
+        assert response.mimetype == 'application/x-ndjson'
+        destinations = [line['destination'] for line in lines[:-1]]
+        assert len(destinations) == len(AVAILABLE_CITIES) - 1  # not Delhi itself
+        done = lines[-1]
+        assert done['type'] == 'done' and done['unpriced'] == []
+        totals = {d['city']: d['totalPrice'] for d in destinations}
+        assert done['ranking'] == sorted(totals, key=totals.get)
+        assert done['ranking'][0] == 'Mumbai'  # 5000 + 3000 estimate x 3 nights
+        assert totals['Mumbai'] == 14000
+        assert done['withinBudget'] == [city for city in done['ranking'] if totals[city] <= 60000]
+        # Hotels come from the precomputed estimates; only flights hit the upstream
+        assert len(upstream.flight_calls) == len(destinations)
+        assert upstream.hotel_calls == []
+
+    def test_cached_prices_are_reused(self, stub_client, upstream):
+        client = stub_client(upstream)
+        _lines(client.post('/explore', data=_form()))  # the stream runs as it is read
+        upstream.flight_calls.clear()
+
+        lines = _lines(client.post('/explore', data=_form()))
+
+        assert upstream.flight_calls == []
+        assert {line['destination']['sources']['flight'] for line in lines[:-1]} == {'cache'}
+        assert None not in [line['rank'] for line in lines[:-1]]
+
+    def test_display_currency(self, stub_client, upstream):
+        lines = _lines(stub_client(upstream).post('/explore', data=_form(currency='USD', budget='750')))
+        mumbai = next(line['destination'] for line in lines[:-1] if line['destination']['city'] == 'Mumbai')
+        assert mumbai['currency'] == 'USD' and mumbai['totalPrice'] == 175.0
+        assert lines[-1]['budget'] == 750.0
+
+    def test_failed_lookups_are_unpriced(self, stub_client, stub_upstream):
+        upstream = stub_upstream(flights=_flights(fail={'LON'}), hotels=_hotels)
+        lines = _lines(stub_client(upstream).post('/explore', data=_form()))
+        done = lines[-1]
+        unpriced = {line['destination']['city']: line['destination']['error']
+                    for line in lines[:-1] if line['rank'] is None}
+        assert 'London' in done['unpriced'] and unpriced['London'] == "Price lookup failed"
+        assert len(done['ranking']) + len(done['unpriced']) == len(AVAILABLE_CITIES) - 1
+
+    def test_hotel_stay_totals_are_ranked_per_night(self, stub_client, upstream, monkeypatch):
+        import main
+        form = _form()
+        cache = MemoryCache()
+        # A cached 3-night stay in Paris for 9000 in total, and a live search for London
+        cache.set(('hotels', 'paris', form['startDate'], form['endDate'], 1, 'INR'),
+                  [HotelOffer('Left Bank', 4.0, 9000, 'INR', 'Paris', '')], 60)
+        monkeypatch.setitem(main.ESTIMATED_HOTEL_PRICES, 'london', None)
+
+        lines = _lines(stub_client(upstream, cache=cache).post('/explore', data=form))
+        by_city = {line['destination']['city']: line['destination'] for line in lines[:-1]}
+
+        assert by_city['Paris']['sources']['hotel'] == 'cache'
+        assert by_city['Paris']['hotelPerNight'] == 3000
+        assert by_city['Paris']['totalPrice'] == 40000 + 9000
+        assert [call['city_name'] for call in upstream.hotel_calls] == ['London']
+        assert by_city['London']['hotelPerNight'] == pytest.approx(4000 / 3, abs=0.01)
+        assert by_city['London']['totalPrice'] == 45000 + 4000
+
+    def test_validation(self, stub_client, upstream):
+        client = stub_client(upstream)
+        assert client.post('/explore', data=_form(budget='')).status_code == 400
+        assert client.post('/explore', data=_form(startPointCode='')).status_code == 400
+        assert client.post('/explore', data=_form(currency='XXX')).status_code == 400
@@ -0,0 +1,71 @@
+"""
+Unit tests for typo-tolerant city lookup.
+"""
+
+import random
+import pytest
+
+from city_data import format_city_info, get_airport_codes, get_city_info, resolve_city_name
+from fuzzy_match import BKTree, levenshtein, max_typos
+
+
+def _reference_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class TestDistance:
+    """Tests for the bit-parallel edit distance and BK-tree."""
+
+    def test_matches_reference_dp(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            a = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 10)))
+            b = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 10)))
+            assert levenshtein(a, b) == _reference_distance(a, b)
+
+    def test_bk_tree_agrees_with_linear_scan(self):
+        rng = random.Random(3)
+        words = {''.join(rng.choice('abcde') for _ in range(rng.randint(3, 8))) for _ in range(300)}
+        tree = BKTree((word, word) for word in words)
+        assert len(tree) == len(words)
+        for query in ('abcde', 'eeee', 'bad', 'cabbage'):
+            expected = sorted((levenshtein(query, w), w) for w in words if levenshtein(query, w) <= 2)
+            assert [(d, w) for d, w, _ in tree.search(query, 2)] == expected
+
+    def test_short_queries_are_not_corrected(self):
+        assert max_typos('del') == 0
+        assert max_typos('dehl') == 1
+        assert max_typos('dehli') == 2
+
+
+class TestResolveCityName:
+    """Tests for alias, code and typo resolution in city_data."""
+
+    @pytest.mark.parametrize('query, expected', [
+        ('new york city', 'New York'),
+        ('Bombay', 'Mumbai'),
+        ('NYC', 'New York'),
+        ('Dehli', 'Delhi'),
+        ('San Fransisco', 'San Francisco'),
+        ('heathrow', 'London'),
+        ('Paris, France', 'Paris'),
+        ('  tokyo ', 'Tokyo'),
+    ])
+    def test_resolves(self, query, expected):
+        assert resolve_city_name(query) == expected
+
+    def test_unknown_and_empty(self):
+        assert resolve_city_name('Reykjavik') is None
+        assert resolve_city_name('') is None
+        assert resolve_city_name('xyz') is None
+
+    def test_lookup_helpers_use_resolution(self):
+        assert get_airport_codes('Bombay') == ['BOM']
+        assert get_city_info('Dehli')['city_code'] == 'DEL'
+        assert format_city_info('nyc') == 'New York, United States'
@@ -0,0 +1,185 @@
+"""
+Unit tests for the FX rate table, converter cache and currency-aware routes.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from cache_backends import MemoryCache
+from fx import FileRateProvider, FxConverter, RateTable, StaticRateProvider, UnknownCurrency, format_money
+from offers import FlightOffer, HotelOffer
+
+RATES = {'INR': 80.0, 'EUR': 0.8, 'GBP': 0.5}
+
+
+class FlakyProvider:
+    """Serves a table, then fails until given a new one."""
+
+    def __init__(self, table):
+        self.table = table
+        self.fetches = 0
+
+    def fetch(self):
+        self.fetches += 1
+        if self.table is None:
+            raise OSError('rates unavailable')
+        return self.table
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _flight(price, currency):
+    return FlightOffer('Test Air', 'TA', '1', '2030-01-10T10:00:00', None, 'DEL', 'BOM', price, currency,
+                       None, traveler_prices=(('ADULT', price),))
+
+
+class TestRateTable:
+    """Tests for cross rates and the shipped rate file."""
+
+    def test_cross_rates_through_base(self):
+        table = RateTable('usd', RATES)
+        assert table.rate('USD', 'INR') == 80.0
+        assert table.rate('EUR', 'INR') == pytest.approx(100.0)
+        with pytest.raises(UnknownCurrency):
+            table.rate('INR', 'XYZ')
+
+    def test_rejects_non_positive_rates(self):
+        with pytest.raises(ValueError):
+            RateTable('USD', {'INR': 0})
+
+    def test_shipped_rate_file_loads(self):
+        table = FileRateProvider().fetch()
+        assert {'INR', 'USD', 'EUR'} <= set(table.rates)
+
+
+class TestFxConverter:
+    """Tests for TTL caching, stale fallback and bulk conversion."""
+
+    def test_table_cached_for_ttl(self):
+        provider, clock = FlakyProvider(RateTable('USD', RATES)), Clock()
+        fx = FxConverter(provider, ttl=60, clock=clock)
+
+        fx.convert(1, 'USD', 'INR')
+        fx.convert(2, 'EUR', 'INR')
+        clock.now = 61
+        fx.convert(3, 'USD', 'INR')
+
+        assert provider.fetches == 2
+
+    def test_failed_refresh_keeps_previous_rates(self):
+        provider, clock = FlakyProvider(RateTable('USD', RATES)), Clock()
+        fx = FxConverter(provider, ttl=600, clock=clock)
+        fx.table()
+
+        provider.table = None
+        clock.now = 601
+        assert fx.convert(10, 'USD', 'INR') == 800.0
+        assert fx.convert(10, 'USD', 'INR') == 800.0
+        assert provider.fetches == 2  # retried after FX_RETRY_SECONDS, not per call
+
+    def test_no_table_at_all_raises(self):
+        with pytest.raises(OSError):
+            FxConverter(FlakyProvider(None)).table()
+
+    def test_same_currency_needs_no_table(self):
+        fx = FxConverter(FlakyProvider(None))
+        assert fx.convert(12.5, 'INR', 'INR') == 12.5
+        assert fx.convert_many([1.0, 2.0], 'EUR', 'EUR') == [1.0, 2.0]
+
+    def test_convert_many_and_offers(self):
+        fx = FxConverter(StaticRateProvider(RATES), canonical='INR')
+        usd, inr = _flight(100.0, 'USD'), _flight(5000.0, 'INR')
+        hotel = HotelOffer('Inn', 4.0, 50.0, 'EUR', 'Goa', '')
+
+        assert fx.convert_many([1.0, 2.5], 'USD', 'INR') == [80.0, 200.0]
+        converted = fx.to_canonical([usd, inr, hotel])
+
+        assert converted[1] is inr
+        assert (converted[0].price, converted[0].currency) == (8000.0, 'INR')
+        assert converted[0].traveler_prices == (('ADULT', 8000.0),)
+        assert (converted[2].price, converted[2].currency) == (5000.0, 'INR')
+        assert (usd.price, usd.currency) == (100.0, 'USD')
+
+    def test_offers_in_unknown_currencies_are_dropped(self, caplog):
+        fx = FxConverter(StaticRateProvider(RATES), canonical='INR')
+        usd, odd = _flight(100.0, 'USD'), _flight(100.0, 'XYZ')
+
+        converted = fx.to_canonical([odd, usd, odd])
+
+        assert [(offer.price, offer.currency) for offer in converted] == [(8000.0, 'INR')]
+        assert [record.getMessage() for record in caplog.records] == [
+            "Dropping offers priced in XYZ: no exchange rate to INR"]
+        with pytest.raises(UnknownCurrency):
+            fx.convert_offers([usd], 'XYZ')
+
+    def test_format_money(self):
+        assert format_money(5000, 'INR') == '₹5,000'
+        assert format_money(1250.4, 'AED') == '1,250 AED'
+
+
+class TestCurrencyRoutes:
+    """Tests that caches hold canonical prices and routes convert on the way out."""
+
+    @pytest.fixture
+    def client_and_upstream(self, make_client, stub_upstream):
+        upstream = stub_upstream(flights=[_flight(100.0, 'USD')])  # whatever currency was asked for
+        fx = FxConverter(StaticRateProvider(RATES), canonical='INR')
+        return make_client(upstream=upstream, cache=MemoryCache(), fx=fx), upstream
+
+    def _form(self, **extra):
+        departure = (datetime.now() + timedelta(days=10)).strftime('%Y-%m-%d')
+        return {'startPointCode': 'DEL', 'destinationCode': 'BOM', 'startDate': departure,
+                'adults': '1', 'travelClass': 'ECONOMY', **extra}
+
+    def test_one_cached_search_serves_every_currency(self, client_and_upstream):
+        client, upstream = client_and_upstream
+
+        default = client.post('/search_flights', data=self._form()).get_json()
+        euros = client.post('/search_flights', data=self._form(currency='eur')).get_json()
+
+        assert (default[0]['price'], default[0]['currency']) == (8000.0, 'INR')
+        assert (euros[0]['price'], euros[0]['currency']) == (80.0, 'EUR')
+        assert len(upstream.flight_calls) == 1
+        assert upstream.flight_calls[0]['currency'] == 'INR'
+
+    def test_unsupported_currency_is_rejected(self, client_and_upstream):
+        client, upstream = client_and_upstream
+
+        response = client.post('/search_flights', data=self._form(currency='XYZ'))
+
+        assert response.status_code == 400
+        assert upstream.flight_calls == []
+
+    def test_hotel_routes_share_one_cached_search(self, make_client, stub_upstream):
+        upstream = stub_upstream(hotels=[HotelOffer('Taj', 4.5, 50.0, 'USD', 'Mumbai', '')])
+        fx = FxConverter(StaticRateProvider(RATES), canonical='INR')
+        client = make_client(upstream=upstream, cache=MemoryCache(), fx=fx)
+        start = datetime.now() + timedelta(days=10)
+        form = {'destination': 'Mumbai', 'startDate': start.strftime('%Y-%m-%d'),
+                'endDate': (start + timedelta(days=2)).strftime('%Y-%m-%d'), 'adults': '1'}
+
+        hotels = client.post('/search_hotels', data=dict(form, currency='EUR')).get_json()
+        combined = client.post('/search', data=form).get_json()
+        chat = client.post('/chatbot', data=dict(form, message='Any hotel deals?')).get_json()
+
+        assert (hotels[0]['price'], hotels[0]['currency']) == (40.0, 'EUR')
+        assert (combined['hotels'][0]['price'], combined['hotels'][0]['currency']) == (4000.0, 'INR')
+        assert 'Taj' in chat['response']
+        assert len(upstream.hotel_calls) == 1
+
+    def test_offers_in_unknown_currencies_are_skipped(self, make_client, stub_upstream):
+        fx = FxConverter(StaticRateProvider(RATES), canonical='INR')
+        upstream = stub_upstream(flights=[_flight(100.0, 'XYZ'), _flight(100.0, 'USD')])
+        client = make_client(upstream=upstream, cache=MemoryCache(), fx=fx)
+
+        response = client.post('/search_flights', data=self._form())
+
+        assert response.status_code == 200
+        assert [(flight['price'], flight['currency']) for flight in response.get_json()] == [(8000.0, 'INR')]
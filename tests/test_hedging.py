@@ -0,0 +1,151 @@
+"""
+Unit tests for the latency histogram and hedged upstream GETs.
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+import amadeus_api
+from hedging import HedgePolicy
+from histogram import LatencyHistogram, SUB_BUCKET_HALF
+
+
+def _profiled(policy, endpoint, seconds=0.01, samples=50):
+    for _ in range(samples):
+        policy.observe(endpoint, seconds)
+    return policy
+
+
+class SlowFirstCall:
+    """send() whose first call takes `slow` seconds and later calls `fast`."""
+
+    def __init__(self, slow=0.5, fast=0.01, first_error=None):
+        self.slow = slow
+        self.fast = fast
+        self.first_error = first_error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            number = self.calls
+        if number == 1:
+            time.sleep(self.slow)
+            if self.first_error:
+                raise self.first_error
+            return 'primary'
+        time.sleep(self.fast)
+        return 'hedge'
+
+
+class TestLatencyHistogram:
+    """Tests for bucket precision and percentiles."""
+
+    def test_percentiles_within_bucket_precision(self):
+        rng = random.Random(7)
+        values = sorted(rng.lognormvariate(-4, 1.5) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        for pct in (50, 95, 99):
+            exact = values[int(len(values) * pct / 100) - 1]
+            assert histogram.percentile(pct) == pytest.approx(exact, rel=1.5 / SUB_BUCKET_HALF)
+        assert histogram.count == 20000
+        assert histogram.max == values[-1]
+
+    def test_cumulative_counts_and_decay(self):
+        histogram = LatencyHistogram()
+        for seconds in (0.001, 0.002, 0.05, 0.05, 2.0):
+            histogram.record(seconds)
+
+        assert histogram.cumulative_counts([0.005, 0.1, 10]) == [2, 4, 5]
+        histogram.decay()
+        assert histogram.count == 1
+        assert LatencyHistogram().percentile(99) is None
+
+
+class TestHedgePolicy:
+    """Tests for hedging thresholds, winners and the global budget."""
+
+    def test_unprofiled_endpoint_is_not_hedged(self):
+        send = SlowFirstCall(slow=0.05)
+        assert HedgePolicy(budget=1.0).call('/v1/x', send) == 'primary'
+        assert send.calls == 1
+
+    def test_unhedgeable_calls_run_on_the_callers_thread(self):
+        policy = _profiled(HedgePolicy(budget=0.0), '/v1/x')
+        threads = []
+        assert policy.call('/v1/x', lambda: threads.append(threading.get_ident()) or 'ok') == 'ok'
+        assert threads == [threading.get_ident()]
+        assert policy.histogram('/v1/x').count == 51
+
+    def test_queue_wait_is_not_counted_as_latency(self):
+        policy = _profiled(HedgePolicy(budget=1.0, max_workers=1), '/v1/x', seconds=0.05)
+        policy._pool().submit(time.sleep, 0.3)  # the only pool thread is busy
+
+        assert policy.call('/v1/x', lambda: 'ok') == 'ok'
+        assert policy.histogram('/v1/x').max < 0.1
+        assert policy.stats()['hedges'] == 0
+
+    def test_slow_call_is_hedged_and_fast_copy_wins(self):
+        policy = _profiled(HedgePolicy(budget=1.0), '/v3/shopping/hotel-offers')
+        send = SlowFirstCall()
+
+        start = time.perf_counter()
+        result = policy.call('/v3/shopping/hotel-offers', send)
+
+        assert result == 'hedge'
+        assert time.perf_counter() - start < 0.3
+        assert policy.stats()['hedge_wins'] == 1
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        policy = _profiled(HedgePolicy(budget=1.0), '/v1/x')
+        send = SlowFirstCall(slow=0.05, fast=0.1, first_error=ValueError('boom'))
+        assert policy.call('/v1/x', send) == 'hedge'
+
+    def test_both_copies_failing_raises(self):
+        policy = _profiled(HedgePolicy(budget=1.0), '/v1/x')
+
+        def always_slow_error():
+            time.sleep(0.05)
+            raise ValueError('down')
+
+        with pytest.raises(ValueError):
+            policy.call('/v1/x', always_slow_error)
+
+    def test_budget_caps_extra_calls(self):
+        # Enough history that p95 stays low: every call below is hedge-worthy
+        policy = _profiled(HedgePolicy(budget=0.05), '/v1/x', seconds=0.001, samples=1500)
+        sends = 0
+        lock = threading.Lock()
+
+        def slow():
+            nonlocal sends
+            with lock:
+                sends += 1
+            time.sleep(0.004)
+            return 'ok'
+
+        for _ in range(60):
+            policy.call('/v1/x', slow)
+
+        stats = policy.stats()
+        assert stats['hedges'] == int(0.05 * stats['calls'])
+        assert sends == stats['calls'] + stats['hedges']
+
+
+def test_amadeus_gets_go_through_hedge_policy(monkeypatch):
+    policy = HedgePolicy()
+    seen = []
+    monkeypatch.setattr(amadeus_api, 'HEDGE_POLICY', policy)
+    monkeypatch.setattr(amadeus_api.requests, 'get',
+                        lambda url, **kwargs: seen.append(url) or type('R', (), {'status_code': 200})())
+
+    amadeus_api._request_with_retry('GET', 'https://test.api.amadeus.com/v3/shopping/hotel-offers')
+
+    assert seen and policy.histogram('/v3/shopping/hotel-offers').count == 1
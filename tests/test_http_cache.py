@@ -0,0 +1,89 @@
+"""
+Tests for HTTP caching of the read-mostly GET endpoints.
+"""
+
+from cache_backends import MemoryCache
+from fx import FxConverter, StaticRateProvider
+from http_cache import CachePolicy, StaticJSON, strong_etag
+from main import _min_price_cache_key
+
+
+def _etag(response):
+    return response.headers['ETag']
+
+
+class TestHttpCacheHelpers:
+    """Unit tests for http_cache.py."""
+
+    def test_policy_header(self):
+        assert CachePolicy(60, 600, 3600).header() == 'public, max-age=60, s-maxage=600, stale-while-revalidate=3600'
+        assert CachePolicy(60, 600).header() == 'public, max-age=60, s-maxage=600'
+
+    def test_static_json_is_tagged_once(self):
+        static = StaticJSON({'a': [1, 2]})
+        assert static.etag == strong_etag(static.body)
+        assert static.etag != StaticJSON({'a': [1, 3]}).etag
+
+
+class TestCityList:
+    """GET /cities and GET /search_cities without a query."""
+
+    def test_cache_headers(self, client):
+        response = client.get('/cities')
+        assert response.status_code == 200
+        assert response.get_json()['available_cities']
+        assert response.headers['Cache-Control'].startswith('public, max-age=3600, s-maxage=86400')
+        assert _etag(response).startswith('"') and not _etag(response).startswith('W/')
+
+    def test_conditional_get(self, client):
+        etag = _etag(client.get('/cities'))
+
+        not_modified = client.get('/cities', headers={'If-None-Match': etag})
+        weakened = client.get('/search_cities', headers={'If-None-Match': 'W/' + etag})
+        changed = client.get('/cities', headers={'If-None-Match': '"something-else"'})
+
+        assert not_modified.status_code == 304 and not_modified.data == b''
+        assert not_modified.headers['ETag'] == etag and 'max-age' in not_modified.headers['Cache-Control']
+        assert weakened.status_code == 304
+        assert changed.status_code == 200
+
+    def test_post_is_not_cached(self, client):
+        response = client.post('/search_cities', data={})
+        assert response.get_json() == client.get('/cities').get_json()
+        assert 'Cache-Control' not in response.headers
+
+
+def _min_price_client(make_client, price=5000.0):
+    cache = MemoryCache()
+    cache.set(_min_price_cache_key('Paris'), price, 60)
+    return make_client(cache=cache, fx=FxConverter(StaticRateProvider({'INR': 80.0}), canonical='INR'))
+
+
+class TestMinPrices:
+    """GET /get_min_prices."""
+
+    QUERY = {'startPoint': 'Delhi, India', 'destination': 'Paris, France'}
+
+    def test_get_matches_post(self, make_client):
+        client = _min_price_client(make_client)
+        response = client.get('/get_min_prices', query_string=self.QUERY)
+
+        assert response.get_json() == {'min_hotel_price': '₹5,000'}
+        assert response.get_json() == client.post('/get_min_prices', data=self.QUERY).get_json()
+        assert 'stale-while-revalidate=21600' in response.headers['Cache-Control']
+
+    def test_etag_follows_content(self, make_client):
+        client = _min_price_client(make_client)
+        etag = _etag(client.get('/get_min_prices', query_string=self.QUERY))
+
+        assert client.get('/get_min_prices', query_string=self.QUERY,
+                          headers={'If-None-Match': etag}).status_code == 304
+        in_dollars = client.get('/get_min_prices', query_string=dict(self.QUERY, currency='USD'),
+                                headers={'If-None-Match': etag})
+        assert in_dollars.status_code == 200 and in_dollars.get_json() == {'min_hotel_price': '$62'}
+        assert _etag(_min_price_client(make_client, 4000.0).get('/get_min_prices', query_string=self.QUERY)) != etag
+
+    def test_errors_are_not_cached(self, make_client):
+        response = _min_price_client(make_client).get('/get_min_prices', query_string={'startPoint': 'Delhi'})
+        assert response.status_code == 400
+        assert 'Cache-Control' not in response.headers
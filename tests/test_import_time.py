@@ -0,0 +1,50 @@
+"""
+Cold-import budget for main.py (serverless cold starts import it per instance).
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+checks the cumulative import time of main against IMPORT_TIME_BUDGET_MS.
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '400'))
+
+# Modules that must not be loaded just by importing the app
+DEFERRED_MODULES = ('google.generativeai', 'psycopg2')
+
+
+def _import_times(module):
+    """Map module name -> cumulative import time (microseconds) for a cold import."""
+    env = dict(os.environ, SECRET_KEY=os.getenv('SECRET_KEY') or 'import-time-test')
+    env.pop('CACHE_SWEEP_INTERVAL', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.slow
+class TestImportTime:
+    """Regression tests for the cold-import budget."""
+
+    def test_main_imports_within_budget(self):
+        # Best of three runs, to keep a busy machine from failing the check
+        elapsed_ms = min(_import_times('main')['main'] for _ in range(3)) / 1000
+        assert elapsed_ms <= IMPORT_TIME_BUDGET_MS, (
+            f"import main took {elapsed_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)")
+
+    def test_heavy_modules_are_not_imported(self):
+        imported = _import_times('main')
+        assert not [name for name in DEFERRED_MODULES if name in imported]
@@ -0,0 +1,156 @@
+"""
+Unit tests for metrics, request tracing and the /metrics endpoint.
+"""
+
+import json
+import logging
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import pytest
+
+import amadeus_api
+import instrumentation
+from cache_backends import MemoryCache
+from instrumentation import METRICS, Metrics, render_prometheus, span
+from quota import QuotaGovernor, governing
+from upstream import UpstreamClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise amadeus_api.requests.exceptions.HTTPError(self.status_code)
+
+
+class FakeAmadeus:
+    """Answers the Amadeus endpoints of a hotel search; the first offers call is throttled."""
+
+    def __init__(self):
+        self.offer_calls = 0
+
+    def post(self, url, **kwargs):
+        return FakeResponse(200, {'access_token': 'token'})
+
+    def get(self, url, **kwargs):
+        path = urlsplit(url).path
+        if path.endswith('/locations/cities'):
+            return FakeResponse(200, {'data': [{'iataCode': 'PAR'}]})
+        if path.endswith('/hotels/by-city'):
+            return FakeResponse(200, {'data': [{'hotelId': 'H1'}]})
+        self.offer_calls += 1
+        if self.offer_calls == 1:
+            return FakeResponse(429, {})
+        return FakeResponse(200, {'data': [{'hotel': {'name': 'Lumen', 'rating': 4},
+                                            'offers': [{'price': {'total': '9000', 'currency': 'INR'}}]}]})
+
+
+@pytest.fixture
+def fake_amadeus(monkeypatch):
+    fake = FakeAmadeus()
+    monkeypatch.setattr(amadeus_api.requests, 'get', fake.get)
+    monkeypatch.setattr(amadeus_api.requests, 'post', fake.post)
+    monkeypatch.setattr(amadeus_api.time, 'sleep', lambda seconds: None)
+    METRICS.reset()
+    return fake
+
+
+class TestMetrics:
+    """Tests for the registry and Prometheus rendering."""
+
+    def test_prometheus_text_format(self):
+        metrics = Metrics()
+        metrics.count('upstream_responses_total', endpoint='/v1/x', status=429)
+        metrics.count('upstream_responses_total', endpoint='/v1/x', status='429')
+        for seconds in (0.004, 0.02, 0.3):
+            metrics.observe('http_request_duration_seconds', seconds, route='routes.index')
+
+        text = render_prometheus(metrics)
+
+        assert '# TYPE upstream_responses_total counter' in text
+        assert 'upstream_responses_total{endpoint="/v1/x",status="429"} 2' in text
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert 'http_request_duration_seconds_bucket{route="routes.index",le="0.005"} 1' in text
+        assert 'http_request_duration_seconds_bucket{route="routes.index",le="0.5"} 3' in text
+        assert 'http_request_duration_seconds_bucket{route="routes.index",le="+Inf"} 3' in text
+        assert 'http_request_duration_seconds_count{route="routes.index"} 3' in text
+
+    def test_label_values_are_escaped(self):
+        metrics = Metrics()
+        metrics.count('cache_lookups_total', cache='a"b\\c')
+        assert 'cache="a\\"b\\\\c"' in render_prometheus(metrics)
+
+    def test_spans_record_parents(self):
+        trace = instrumentation.Trace()
+        token = instrumentation._trace.set(trace)
+        try:
+            with span('outer'):
+                with span('inner', city='Paris'):
+                    pass
+        finally:
+            instrumentation._trace.reset(token)
+
+        inner, outer = (item.to_dict(trace.started) for item in trace.spans)
+        assert (outer['name'], outer['parent']) == ('outer', None)
+        assert (inner['name'], inner['parent'], inner['city']) == ('inner', 'outer', 'Paris')
+
+
+class TestRequestInstrumentation:
+    """Tests for per-request tracing through the real Amadeus client."""
+
+    def test_hotel_search_is_traced_and_counted(self, fake_amadeus, make_client, caplog):
+        client = make_client(upstream=UpstreamClient(gemini_api_key=''))
+        check_in = date.today() + timedelta(days=30)
+        with caplog.at_level(logging.INFO, logger='instrumentation'):
+            response = client.post('/search_hotels', data={
+                'destination': 'Paris, France', 'startDate': check_in.isoformat(),
+                'endDate': (check_in + timedelta(days=2)).isoformat()})
+        assert response.status_code == 200
+
+        records = [record for record in caplog.records if record.name == 'instrumentation']
+        assert len(records) == 1
+        log = vars(records[0])
+        assert (log['route'], log['status']) == ('routes.search_hotels', 200)
+        assert [item['name'] for item in log['spans']] == [
+            '/v1/security/oauth2/token', '/v1/reference-data/locations/cities',
+            '/v1/reference-data/locations/hotels/by-city',
+            '/v3/shopping/hotel-offers', '/v3/shopping/hotel-offers']
+        assert {item['parent'] for item in log['spans']} == {'routes.search_hotels'}
+        assert [item['status'] for item in log['spans']][-2:] == [429, 200]
+
+        offers = '/v3/shopping/hotel-offers'
+        assert METRICS.counter_value('upstream_retries_total', endpoint=offers) == 1
+        assert METRICS.counter_value('upstream_responses_total', endpoint=offers, status=429) == 1
+        assert METRICS.histogram('upstream_request_duration_seconds', endpoint=offers).count == 2
+
+    def test_every_amadeus_request_takes_a_quota_slot(self, fake_amadeus):
+        governor = QuotaGovernor(rate=1000, burst=1000, max_in_flight=4)
+        check_in = date.today() + timedelta(days=30)
+        with governing(governor):
+            hotels = amadeus_api.search_hotels('Paris', check_in.isoformat(),
+                                               (check_in + timedelta(days=2)).isoformat())
+
+        assert [hotel.name for hotel in hotels] == ['Lumen']
+        # token, city code, hotel list, offers (429) and its retry: one search, five requests
+        assert METRICS.counter_value('upstream_quota_total', result='granted') == 5
+
+    def test_metrics_endpoint_reports_routes_and_cache_hits(self, fake_amadeus, make_client):
+        client = make_client(upstream=UpstreamClient(gemini_api_key=''), cache=MemoryCache())
+        form = {'startPoint': 'Delhi, India', 'destination': 'Paris, France'}
+        client.post('/get_min_prices', data=form)
+        client.post('/get_min_prices', data=form)
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.get_data(as_text=True)
+        assert 'http_requests_total{route="routes.get_min_prices",status="200"} 2' in text
+        assert 'cache_lookups_total{cache="min_price",result="hit"} 1' in text
+        assert 'cache_lookups_total{cache="min_price",result="miss"} 1' in text
+        assert 'upstream_request_duration_seconds_count{endpoint="/v3/shopping/hotel-offers"}' in text
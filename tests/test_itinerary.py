@@ -0,0 +1,174 @@
+"""
+Tests for multi-city itineraries.
+"""
+
+import itertools
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+import requests
+
+from cache_backends import MemoryCache
+from itinerary import cheapest_fare, cheapest_itineraries, date_window
+from offers import FlightOffer, HotelOffer
+from quota import QuotaGovernor
+
+
+def _flight(price, origin='DEL', destination='BOM'):
+    return FlightOffer('Test Air', 'TA', '1', '2030-01-10T10:00:00', None, origin, destination, price, 'INR', None)
+
+
+def _hotel(price, name='Stub Hotel'):
+    return HotelOffer(name, 4.0, price, 'INR', '', '')
+
+
+def _brute_force(fares, stays, min_nights, budget):
+    totals = []
+    for days in itertools.product(*(sorted(leg) for leg in fares)):
+        if any((later - earlier).days < min_nights for earlier, later in zip(days, days[1:])):
+            continue
+        total = sum(fares[leg][day].price for leg, day in enumerate(days))
+        total += sum(hotel.price * (days[stop + 1] - days[stop]).days for stop, (_, hotel) in enumerate(stays))
+        if budget is None or total <= budget:
+            totals.append(total)
+    return sorted(totals)
+
+
+class TestCheapestItineraries:
+    """The dynamic program against enumerating every date combination."""
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        start = date(2030, 1, 1)
+        legs = rng.randrange(2, 5)
+        fares, offset = [], 0
+        for _ in range(legs):
+            days = date_window(start + timedelta(days=offset), start + timedelta(days=offset + rng.randrange(3)))
+            fares.append({day: _flight(rng.randrange(2000, 20000)) for day in days if rng.random() < 0.9})
+            offset += rng.randrange(1, 4)
+        stays = [(f'City {stop}', _hotel(rng.randrange(1000, 8000))) for stop in range(legs - 1)]
+        min_nights = rng.choice([0, 1, 2])
+        budget = rng.choice([None, 30000, 60000])
+
+        expected = _brute_force(fares, stays, min_nights, budget)[:6]
+        itineraries = cheapest_itineraries(fares, stays, min_nights=min_nights, k=6, budget=budget)
+
+        assert [itinerary.total for itinerary in itineraries] == expected
+        for itinerary in itineraries:
+            assert itinerary.total == sum(f.price for _, f in itinerary.flights) + sum(s.price for s in itinerary.stays)
+
+    def test_stays_span_consecutive_departures(self):
+        fares = [{date(2030, 1, 1): _flight(5000)}, {date(2030, 1, 4): _flight(6000)}]
+        [itinerary] = cheapest_itineraries(fares, [('Mumbai', _hotel(2000))])
+        stay = itinerary.stays[0]
+        assert (stay.check_in, stay.check_out, stay.nights) == (date(2030, 1, 1), date(2030, 1, 4), 3)
+        assert itinerary.total == 17000
+
+    def test_infeasible_dates(self):
+        fares = [{date(2030, 1, 5): _flight(5000)}, {date(2030, 1, 4): _flight(6000)}]
+        assert cheapest_itineraries(fares, [('Mumbai', _hotel(2000))]) == []
+
+    def test_cheapest_fare_skips_unpriced(self):
+        assert cheapest_fare([_flight(0.0), _flight(900), _flight(400)]).price == 400
+        assert cheapest_fare([]) is None
+
+
+def _flights(fail=()):
+    """Two fares per leg date, the cheaper rising by day; an error for (origin, destination) pairs in fail."""
+    def search(origin, destination, departure_date, **kwargs):
+        if (origin, destination) in fail:
+            raise requests.exceptions.ConnectionError("upstream down")
+        day = int(departure_date[-2:])
+        return [_flight(3000 + 100 * day, origin, destination), _flight(9000, origin, destination)]
+    return search
+
+
+def _hotels(city_name, **kwargs):
+    return [_hotel(2500, f'{city_name} Inn'), _hotel(6000, f'{city_name} Palace')]
+
+
+def _form(legs, **overrides):
+    form = {'legOrigin': [], 'legDestination': [], 'legEarliest': [], 'legLatest': []}
+    base = datetime.now().date() + timedelta(days=30)
+    for origin, destination, earliest, window in legs:
+        form['legOrigin'].append(origin)
+        form['legDestination'].append(destination)
+        form['legEarliest'].append((base + timedelta(days=earliest)).isoformat())
+        form['legLatest'].append((base + timedelta(days=earliest + window - 1)).isoformat())
+    form.update(overrides)
+    return form
+
+
+TRIANGLE = [('DEL', 'BOM', 0, 3), ('BOM', 'DXB', 3, 3), ('DXB', 'DEL', 6, 3)]
+
+
+class TestSearchItinerary:
+    """Tests for POST /search_itinerary."""
+
+    @pytest.fixture
+    def upstream(self, stub_upstream):
+        return stub_upstream(flights=_flights(), hotels=_hotels)
+
+    def test_upstream_calls_are_linear_in_legs(self, stub_client, upstream):
+        data = stub_client(upstream).post('/search_itinerary', data=_form(TRIANGLE)).get_json()
+
+        assert len(upstream.flight_calls) == 9  # 3 legs x 3 days
+        assert sorted(call['city_name'] for call in upstream.hotel_calls) == ['Dubai', 'Mumbai']
+        assert data['searches'] == {'flights': 9, 'hotels': 2}
+        best = data['itineraries'][0]
+        assert [leg['flight']['arrivalAirport'] for leg in best['legs']] == ['BOM', 'DXB', 'DEL']
+        assert [stay['hotel']['name'] for stay in best['stays']] == ['Mumbai Inn', 'Dubai Inn']
+        totals = [itinerary['totalPrice'] for itinerary in data['itineraries']]
+        assert totals == sorted(totals) and len(totals) == 5
+
+    def test_window_hotel_totals_become_nightly_rates(self, stub_client, upstream):
+        data = stub_client(upstream).post('/search_itinerary', data=_form(TRIANGLE)).get_json()
+
+        # Mumbai's search spans leg 1's earliest to leg 2's latest departure: 5 nights for 2500
+        for itinerary in data['itineraries']:
+            mumbai = itinerary['stays'][0]
+            assert mumbai['hotel']['price'] == 500
+            assert mumbai['price'] == 500 * mumbai['nights']
+            fares = sum(leg['flight']['price'] for leg in itinerary['legs'])
+            assert itinerary['totalPrice'] == fares + sum(stay['price'] for stay in itinerary['stays'])
+
+    def test_leg_searches_are_cached(self, stub_client, upstream):
+        client = stub_client(upstream)
+        client.post('/search_itinerary', data=_form(TRIANGLE))
+        client.post('/search_itinerary', data=_form(TRIANGLE, limit='2', currency='USD'))
+        assert len(upstream.flight_calls) == 9 and len(upstream.hotel_calls) == 2
+
+    def test_cache_hits_take_no_quota(self, stub_client, upstream):
+        cache = MemoryCache()
+        stub_client(upstream, cache).post('/search_itinerary', data=_form(TRIANGLE))
+        starved = QuotaGovernor(rate=0.001, burst=1, max_in_flight=1)
+        assert starved.acquire(timeout=0)  # holds the only token and slot
+
+        data = stub_client(upstream, cache, starved).post('/search_itinerary', data=_form(TRIANGLE)).get_json()
+
+        assert data['unavailable'] == {'fares': [], 'hotels': []} and data['itineraries']
+        assert len(upstream.flight_calls) == 9 and len(upstream.hotel_calls) == 2
+
+    def test_failed_leg_dates_are_reported(self, stub_client, stub_upstream):
+        upstream = stub_upstream(flights=_flights(fail={('BOM', 'DXB')}), hotels=_hotels)
+        data = stub_client(upstream).post('/search_itinerary', data=_form(TRIANGLE)).get_json()
+        assert data['itineraries'] == []
+        assert [fare['leg'] for fare in data['unavailable']['fares']] == [2, 2, 2]
+
+    def test_budget(self, stub_client, upstream):
+        client = stub_client(upstream)
+        data = client.post('/search_itinerary', data=_form(TRIANGLE, budget='1000')).get_json()
+        assert data['itineraries'] == []
+
+    @pytest.mark.parametrize('legs, overrides', [
+        ([('DEL', 'BOM', 0, 1)], {}),                                  # one leg
+        ([('DEL', 'BOM', 0, 1), ('GOI', 'DEL', 3, 1)], {}),            # legs don't connect
+        ([('DEL', 'BOM', 0, 5), ('BOM', 'DEL', 6, 1)], {}),            # window too wide
+        (TRIANGLE, {'minNights': '-1'}),
+        (TRIANGLE, {'legLatest': ['']}),                               # misaligned leg fields
+    ])
+    def test_validation(self, stub_client, upstream, legs, overrides):
+        response = stub_client(upstream).post('/search_itinerary', data=_form(legs, **overrides))
+        assert response.status_code == 400
@@ -0,0 +1,38 @@
+"""
+Unit tests for the pluggable JSON codec.
+"""
+
+from decimal import Decimal
+
+import json_codec
+from offers import HotelOffer
+
+
+class TestCodec:
+    """Tests for decode/encode through the selected backend."""
+
+    def test_loads_accepts_bytes_and_str(self):
+        assert json_codec.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+        assert json_codec.loads('{"a": "₹"}') == {'a': '₹'}
+
+    def test_dumps_returns_utf8_bytes(self):
+        encoded = json_codec.dumps({'price': '₹5,000'})
+        assert isinstance(encoded, bytes)
+        assert json_codec.loads(encoded) == {'price': '₹5,000'}
+
+    def test_dumps_uses_default_for_unknown_types(self):
+        encoded = json_codec.dumps([HotelOffer('A', 4.0, 10.0, 'INR', 'X', '')], default=lambda o: o.to_dict())
+        assert json_codec.loads(encoded)[0]['name'] == 'A'
+
+    def test_stdlib_backend_always_available(self):
+        loads, dumps = json_codec._load_backend('json')
+        assert loads(dumps({'b': 1, 'a': 2}, sort_keys=True)) == {'a': 2, 'b': 1}
+        assert dumps({'b': 1, 'a': 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+
+def test_provider_serializes_decimal_and_offers(app):
+    with app.app_context():
+        body = app.json.dumps({'amount': Decimal('12.50'), 'hotel': HotelOffer('A', 4.0, 10.0, 'INR', 'X', '')})
+    data = json_codec.loads(body)
+    assert data['amount'] == '12.50'
+    assert data['hotel']['price'] == 10.0
@@ -0,0 +1,125 @@
+"""
+Unit tests for the shared SQLite rate-limit storage.
+"""
+
+import multiprocessing
+import os
+import stat
+import threading
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+import main
+from limiter_storage import SQLiteLimiterStorage, default_storage_uri
+from runtime_paths import InsecurePathError
+
+
+def _uri(path):
+    return f'sqlite:///{path}'
+
+
+def _hit_many(uri, attempts, results):
+    limiter = MovingWindowRateLimiter(SQLiteLimiterStorage(uri))
+    item = parse('60 per minute')
+    results.put(sum(limiter.hit(item, 'client') for _ in range(attempts)))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteLimiterStorage(_uri(tmp_path / 'limits.db'))
+
+
+class TestSQLiteLimiterStorage:
+    """Tests for fixed/moving window semantics and cross-process sharing."""
+
+    def test_registered_as_sqlite_scheme(self, tmp_path):
+        assert isinstance(storage_from_string(_uri(tmp_path / 'limits.db')), SQLiteLimiterStorage)
+
+    def test_moving_window(self, storage):
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse('3 per minute')
+
+        assert [limiter.hit(item, 'a') for _ in range(4)] == [True, True, True, False]
+        assert limiter.hit(item, 'b')
+        assert limiter.get_window_stats(item, 'a').remaining == 0
+        storage.clear(item.key_for('a'))
+        assert limiter.test(item, 'a')
+
+    def test_fixed_window(self, storage):
+        limiter = FixedWindowRateLimiter(storage)
+        item = parse('2 per minute')
+
+        assert [limiter.hit(item, 'a') for _ in range(3)] == [True, True, False]
+        assert storage.get(item.key_for('a')) == 3
+        assert storage.reset() > 0
+        assert storage.get(item.key_for('a')) == 0
+
+    def test_expired_counter_restarts(self, storage):
+        assert storage.incr('k', expiry=-1) == 1
+        assert storage.incr('k', expiry=60) == 1
+        assert storage.incr('k', expiry=60) == 2
+
+    def test_default_database_is_private(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('RATELIMIT_STORAGE_URI', raising=False)
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        uri = default_storage_uri()
+        assert uri == _uri(tmp_path / 'travel_planner' / 'ratelimit.db')
+        storage = SQLiteLimiterStorage(uri)
+        assert stat.S_IMODE(os.stat(storage.path).st_mode) == 0o600
+
+    def test_refuses_a_database_other_users_can_write(self, tmp_path):
+        path = tmp_path / 'limits.db'
+        path.touch()
+        os.chmod(path, 0o666)
+        with pytest.raises(InsecurePathError):
+            SQLiteLimiterStorage(_uri(path))
+
+    def test_concurrent_threads_never_exceed_limit(self, tmp_path):
+        uri = _uri(tmp_path / 'limits.db')
+        limiter = MovingWindowRateLimiter(SQLiteLimiterStorage(uri))
+        item = parse('60 per minute')
+        granted = []
+
+        def worker():
+            granted.append(sum(limiter.hit(item, 'client') for _ in range(25)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(granted) == 60
+
+    @pytest.mark.slow
+    def test_concurrent_processes_share_one_limit(self, tmp_path):
+        uri = _uri(tmp_path / 'limits.db')
+        SQLiteLimiterStorage(uri)  # create the schema before the workers race
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        workers = [context.Process(target=_hit_many, args=(uri, 30, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        granted = sum(results.get(timeout=60) for _ in workers)
+        for worker in workers:
+            worker.join(timeout=60)
+        # 4 workers x 30 attempts against one 60/minute limit
+        assert granted == 60
+
+
+@pytest.mark.integration
+def test_app_counts_requests_in_configured_storage(tmp_path):
+    path = tmp_path / 'limits.db'
+    client = main.create_app({'TESTING': True, 'RATELIMIT_STORAGE_URI': _uri(path)}).test_client()
+
+    statuses = [client.post('/flight_status', data={}).status_code for _ in range(51)]
+
+    assert statuses.count(429) == 1 and statuses[-1] == 429
+    # A second process on the host sees the same "50 per hour" window
+    other = SQLiteLimiterStorage(_uri(path))
+    assert max(other.get_moving_window(key, 50, 3600)[1] for key in _window_keys(other)) == 50
+
+
+def _window_keys(storage):
+    return [row[0] for row in storage._connection().execute('SELECT DISTINCT key FROM ratelimit_window')]
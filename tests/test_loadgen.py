@@ -0,0 +1,56 @@
+"""
+Unit tests for the load generator's user mix, level runner and knee detection.
+"""
+
+import time
+
+import pytest
+
+from benchmarks.loadgen import find_knee, parse_mix, run_level
+
+
+class FakeTransport:
+    """Answers every request after a fixed delay; one status per path."""
+
+    def __init__(self, delay=0.001, statuses=None):
+        self.delay = delay
+        self.statuses = statuses or {}
+        self.paths = []
+
+    def client(self):
+        def send(path, form):
+            self.paths.append(path)
+            time.sleep(self.delay)
+            return self.statuses.get(path, 200)
+        return send
+
+
+class TestLoadGenerator:
+    """Tests for parsing mixes, running a level and locating the knee."""
+
+    def test_parse_mix(self):
+        assert parse_mix('autocomplete=3, search=1,') == {'autocomplete': 3.0, 'search': 1.0}
+        assert parse_mix('chatbot') == {'chatbot': 1.0}
+        with pytest.raises(ValueError):
+            parse_mix('checkout=1')
+        with pytest.raises(ValueError):
+            parse_mix('search=0')
+
+    def test_run_level_reports_only_mixed_actions(self):
+        transport = FakeTransport(statuses={'/chatbot': 500})
+
+        level = run_level(transport, {'min_price': 1, 'chatbot': 1}, users=3, duration=0.2)
+
+        assert level['concurrency'] == 3
+        assert set(level['actions']) == {'min_price', 'chatbot'}
+        assert set(transport.paths) == {'/get_min_prices', '/chatbot'}
+        assert level['requests'] == len(transport.paths)
+        assert level['errors'] == level['actions']['chatbot']['requests'] > 0
+        assert level['actions']['min_price']['p50_ms'] >= 1
+
+    def test_knee_is_first_level_near_peak(self):
+        levels = [{'concurrency': users, 'throughput_rps': rps}
+                  for users, rps in ((1, 10), (2, 19), (4, 36), (8, 40), (16, 39))]
+
+        assert find_knee(levels) == 4
+        assert find_knee([]) is None
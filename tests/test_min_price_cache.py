@@ -1,17 +1,18 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from main import (
-    get_min_price_for_destination,
-    MIN_PRICE_CACHE,
-    MIN_PRICE_CACHE_LOCK,
-)
+import requests
+
+import deadline
+from cache_backends import MemoryCache
+from main import create_app, get_min_price_for_destination
 
 
 class TestMinPriceCaching(unittest.TestCase):
     def setUp(self):
-        with MIN_PRICE_CACHE_LOCK:
-            MIN_PRICE_CACHE.clear()
+        context = create_app({'TESTING': True}, cache=MemoryCache()).app_context()
+        context.push()
+        self.addCleanup(context.pop)
 
     def test_min_price_is_cached(self):
         call_count = {"count": 0}
@@ -32,6 +33,44 @@ class TestMinPriceCaching(unittest.TestCase):
         # Should not invoke the fetcher again after the first computation
         self.assertEqual(call_count["count"], initial_calls)
 
+    def test_partial_minimum_is_not_cached(self):
+        calls = []
+        timed_out = []
+        flaky_day = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        def flaky_fetch(city_name, check_in, check_out, adults):
+            calls.append(check_in)
+            if check_in == flaky_day and not timed_out:
+                timed_out.append(check_in)
+                raise requests.exceptions.Timeout("read timed out")
+            return [{"price": 1600}]
+
+        first = get_min_price_for_destination("Rome", fetcher=flaky_fetch, days=3)
+        second = get_min_price_for_destination("Rome", fetcher=flaky_fetch, days=3)
+
+        self.assertEqual(first, 1600)
+        self.assertEqual(second, 1600)
+        # The date that timed out made the first minimum partial, so every date was fetched again
+        self.assertEqual(len(calls), 6)
+
+    def test_dates_skipped_by_the_deadline_are_not_cached(self):
+        calls = []
+
+        def fetch(city_name, check_in, check_out, adults):
+            calls.append(check_in)
+            return [{"price": 1500}]
+
+        # Enough budget for the cache write but not for another date
+        with deadline.request_deadline(0.6):
+            skipped = get_min_price_for_destination("London", fetcher=fetch, days=3)
+        # No date fit the budget, so the estimate was returned and not kept
+        self.assertEqual(calls, [])
+        self.assertIsNotNone(skipped)
+
+        price = get_min_price_for_destination("London", fetcher=fetch, days=3)
+        self.assertEqual(price, 1500)
+        self.assertEqual(len(calls), 3)
+
     def test_min_price_handles_no_results(self):
         def empty_fetch(city_name, check_in, check_out, adults):
             return []
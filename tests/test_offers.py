@@ -0,0 +1,153 @@
+"""
+Unit tests for the offer models and Amadeus offer parsing.
+"""
+
+import json
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from amadeus_api import parse_flight_offers, parse_hotel_offers
+from ranking import top_k_flights
+from offers import FlightOffer, HotelOffer, dedupe_offers, filter_and_sort_flights, parse_iso_duration
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'fixtures', 'flight_offers.json')
+
+
+@pytest.fixture
+def flight_payload():
+    with open(FIXTURE_PATH) as f:
+        return json.load(f)
+
+
+class TestParseFlightOffers:
+    """Tests for parsing recorded flight-offer payloads."""
+
+    def test_parses_numeric_prices_and_dedupes(self, flight_payload):
+        flights = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')
+
+        # Offers 1 and 4 are the same AI 865 departure; the first one wins
+        assert [(f.airline_code, f.flight_number, f.departure_time) for f in flights] == [
+            ('AI', '865', '2026-11-20T06:00:00'),
+            ('6E', '2134', '2026-11-20T09:15:00'),
+            ('UK', '995', '2026-11-20T18:30:00'),
+        ]
+        assert flights[0].price == 5423.0
+        assert isinstance(flights[1].price, float)
+        assert flights[0].airline == 'Air India'
+
+    def test_connecting_flight_reports_final_arrival(self, flight_payload):
+        connecting = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')[1]
+
+        assert connecting.arrival_airport == 'BOM'
+        assert connecting.arrival_time == '2026-11-20T14:50:00'
+        assert connecting.stops == 1
+        assert connecting.total_duration_minutes == 335
+        assert connecting.itineraries[0].layovers() == [('HYD', 120)]
+
+    def test_round_trip_keeps_return_leg_and_passenger_fares(self, flight_payload):
+        round_trip = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')[2]
+
+        assert len(round_trip.itineraries) == 2
+        assert round_trip.itineraries[1].segments[0].departure_airport == 'BOM'
+        assert round_trip.total_duration_minutes == 135 + 125
+        assert round_trip.traveler_prices == (('ADULT', 6200.0), ('CHILD', 5050.0))
+        assert round_trip.price_per_passenger == 5625.0
+
+    def test_unpriced_offers_are_dropped(self, flight_payload):
+        del flight_payload['data'][0]['price']
+        flight_payload['data'][2]['price'] = {'currency': 'INR', 'grandTotal': 'n/a'}
+
+        flights = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')
+
+        # The priced duplicate of offer 1 (offer 4) is kept instead
+        assert [(f.flight_number, f.price) for f in flights] == [('2134', 4180.5), ('865', 6120.0)]
+        assert [f.price for f in top_k_flights(flights, k=3)] == [4180.5, 6120.0]
+
+    def test_respects_limit(self, flight_payload):
+        assert len(parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR', limit=1)) == 1
+
+    def test_empty_payload(self):
+        assert parse_flight_offers({}, 'DEL', 'BOM', 'INR') == []
+
+
+class TestFlightViews:
+    """Tests for server-side sort/filter over one search result."""
+
+    def test_sort_and_filter(self, flight_payload):
+        flights = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')
+
+        assert [f.flight_number for f in filter_and_sort_flights(flights)] == ['2134', '865', '995']
+        assert [f.flight_number for f in filter_and_sort_flights(flights, sort_by='fastest')] == ['865', '995', '2134']
+        assert [f.flight_number for f in filter_and_sort_flights(flights, non_stop=True)] == ['865', '995']
+
+    def test_rejects_unknown_sort(self, flight_payload):
+        with pytest.raises(ValueError):
+            filter_and_sort_flights([], sort_by='random')
+
+    def test_parse_iso_duration(self):
+        assert parse_iso_duration('PT5H35M') == 335
+        assert parse_iso_duration('P1DT2H') == 1560
+        assert parse_iso_duration('PT45M') == 45
+        assert parse_iso_duration('bogus') is None
+
+
+class TestOfferModels:
+    """Tests for offer serialization."""
+
+    def test_flight_round_trip(self, flight_payload):
+        flight = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')[0]
+        data = flight.to_dict()
+
+        assert data['flightNumber'] == '865'
+        assert data['departureAirport'] == 'DEL'
+        assert FlightOffer.from_dict(data) == flight
+
+    def test_hotel_estimate_flag_only_when_set(self):
+        hotel = HotelOffer('Test Hotel', 4.5, 3000.0, 'INR', 'Mumbai', 'A test hotel')
+        assert 'isEstimate' not in hotel.to_dict()
+        hotel.is_estimate = True
+        assert hotel.to_dict()['isEstimate'] is True
+
+    def test_parse_hotel_offers_skips_malformed(self):
+        data = {'data': [
+            {'hotel': {'name': 'Taj'}, 'offers': [{'price': {'total': '9000.00', 'currency': 'INR'}}]},
+            {'hotel': {'name': 'Broken'}, 'offers': []},
+        ]}
+        hotels = parse_hotel_offers(data, 'Mumbai', 'Real hotel')
+        assert [h.name for h in hotels] == ['Taj']
+        assert hotels[0].price == 9000.0
+
+    def test_dedupe_offers(self):
+        a = HotelOffer('A', 4.0, 100.0, 'INR', 'X', '')
+        b = HotelOffer('A', 4.0, 120.0, 'INR', 'X', '')
+        assert dedupe_offers([a, b]) == [a]
+
+    def test_hotel_per_night(self):
+        stay = HotelOffer('A', 4.0, 9000.0, 'INR', 'X', '')
+        assert stay.per_night(3).price == 3000.0 and stay.price == 9000.0
+        assert stay.per_night(1) is stay
+
+
+@pytest.mark.integration
+def test_search_flights_route_serves_views_from_one_call(make_client, stub_upstream, flight_payload):
+    flights = parse_flight_offers(flight_payload, 'DEL', 'BOM', 'INR')
+    upstream = stub_upstream(flights=flights)
+    client = make_client(upstream=upstream)
+    future_date = (datetime.now() + timedelta(days=10)).strftime('%Y-%m-%d')
+    form = {
+        'startPointCode': 'DEL',
+        'destinationCode': 'BOM',
+        'startDate': future_date,
+        'adults': '1',
+        'travelClass': 'ECONOMY'
+    }
+
+    cheapest = client.post('/search_flights', data=dict(form, sort='cheapest'))
+    fastest = client.post('/search_flights', data=dict(form, sort='fastest', nonStop='true'))
+
+    assert cheapest.status_code == 200
+    assert cheapest.get_json() == [f.to_dict() for f in filter_and_sort_flights(flights)]
+    assert [f['flightNumber'] for f in fastest.get_json()] == ['865', '995']
+    assert len(upstream.flight_calls) == 1
+    assert upstream.flight_calls[0]['max_results'] is None
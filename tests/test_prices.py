@@ -0,0 +1,102 @@
+"""
+Property and unit tests for price normalization.
+"""
+
+import random
+import string
+from datetime import date
+
+import pytest
+
+from main import _collect_prices_for_date
+from prices import Money, parse_price, price_amount
+
+
+def indian_grouping(whole):
+    """1234567 -> '12,34,567' (lakh/crore grouping)."""
+    digits = str(whole)
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ','.join([head] + groups + [tail])
+
+
+# (formatter of a 2-decimal amount, currency it names or None, decimals it keeps)
+FORMATS = (
+    (lambda amount: f'{amount:.2f}', None, 2),
+    (lambda amount: f'₹{amount:,.2f}', 'INR', 2),
+    (lambda amount: f'₹{indian_grouping(round(amount))}', 'INR', 0),
+    (lambda amount: f'Rs. {amount:,.2f}/night', 'INR', 2),
+    (lambda amount: f'INR {amount:,.0f}', 'INR', 0),
+    (lambda amount: f'USD {amount:.2f}', 'USD', 2),
+    (lambda amount: f'{amount:.2f} usd', 'USD', 2),
+    (lambda amount: f'${amount:,.2f}', 'USD', 2),
+    (lambda amount: '€' + f'{amount:,.2f}'.replace(',', ' ').replace('.', ','), 'EUR', 2),
+    (lambda amount: '€' + f'{amount:,.2f}'.replace(',', '#').replace('.', ',').replace('#', '.'), 'EUR', 2),
+    (lambda amount: f'£ {amount:,.1f}', 'GBP', 1),
+)
+
+
+class TestPriceProperties:
+    """Randomized round trips through every display format we've seen."""
+
+    @pytest.mark.parametrize('index', range(len(FORMATS)))
+    def test_formatted_amount_round_trips(self, index):
+        formatter, currency, decimals = FORMATS[index]
+        rng = random.Random(index)
+        for _ in range(300):
+            amount = round(rng.uniform(0, 2_000_000), 2)
+            text = formatter(amount)
+
+            money = parse_price(text, default_currency='XXX')
+
+            assert money is not None, text
+            assert money.amount == pytest.approx(round(amount, decimals), abs=0.5 * 10 ** -decimals), text
+            assert money.currency == (currency or 'XXX'), text
+
+    def test_numbers_take_the_fast_path_unchanged(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            value = rng.choice([rng.randint(0, 10 ** 7), rng.uniform(0, 10 ** 7)])
+            assert parse_price(value, 'INR') == Money(float(value), 'INR')
+            assert price_amount(float(value)) == float(value)
+
+    def test_arbitrary_text_never_raises(self):
+        rng = random.Random(11)
+        alphabet = string.printable + '₹€£¥'
+        for _ in range(2000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            result = parse_price(text)
+            assert result is None or result.amount >= 0 or text.lstrip().startswith('-')
+
+
+class TestParsePrice:
+    """Tests for specific inputs and the Amadeus price object."""
+
+    @pytest.mark.parametrize('value', [None, '', 'N/A', 'nan', 'inf', 'Price on request', True, {}])
+    def test_values_without_amount(self, value):
+        assert parse_price(value) is None
+        assert price_amount(value, default=-1) == -1
+
+    def test_amadeus_price_object(self):
+        assert parse_price({'total': '1234.50', 'currency': 'EUR'}, 'INR') == Money(1234.5, 'EUR')
+        assert parse_price({'total': '99.00'}, 'INR') == Money(99.0, 'INR')
+        assert price_amount({'total': '12.5'}) == 12.5
+
+    def test_ambiguous_separators(self):
+        assert price_amount('12,5') == 12.5
+        assert price_amount('5,000') == 5000.0
+        assert price_amount('1.234.567') == 1234567.0
+        assert price_amount('1.234') == 1.234  # a plain decimal, like every Amadeus total
+
+
+def test_min_price_collection_normalizes_legacy_strings():
+    legacy = [{'price': 'Rs. 4,500/night'}, {'price': '₹3,200'}, {'price': 'N/A'}, {'price': 2800.0}]
+
+    prices = _collect_prices_for_date('Goa', date(2030, 1, 10), lambda **kwargs: legacy)
+
+    assert prices == [4500.0, 3200.0, 2800.0]
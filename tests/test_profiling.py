@@ -0,0 +1,109 @@
+"""
+Unit tests for opt-in request profiling and collapsed-stack export.
+"""
+
+import cProfile
+import pstats
+import time
+
+from cache_backends import MemoryCache
+from main import create_app
+from profiling import ProfileStore, cprofile_stacks, collapsed_text
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+class SlowCities:
+    """Upstream whose city search takes long enough to be sampled."""
+
+    def search_cities(self, query):
+        time.sleep(0.05)
+        return []
+
+
+def _client(**config):
+    settings = {'TESTING': True, 'ADMIN_TOKEN': 'secret', 'PROFILE_SAMPLE_RATE': 0, **config}
+    return create_app(settings, upstream=SlowCities(), cache=MemoryCache()).test_client()
+
+
+def _leaf():
+    return sum(range(20000))
+
+
+def _branch():
+    return _leaf() + _leaf()
+
+
+class TestProfilingMiddleware:
+    """Tests for triggering, storing and serving request profiles."""
+
+    def test_header_needs_admin_token(self):
+        client = _client()
+
+        response = client.post('/search_cities', data={'query': 'Par'}, headers={'X-Profile': 'cprofile'})
+
+        assert 'X-Profile-Id' not in response.headers
+        assert client.get('/admin/profiles').status_code == 404
+        assert client.get('/admin/profiles', headers=ADMIN).json == {'profiles': []}
+
+    def test_admin_endpoints_disabled_without_token(self):
+        client = _client(ADMIN_TOKEN=None)
+        assert client.get('/admin/profiles', headers={'X-Admin-Token': ''}).status_code == 404
+
+    def test_cprofile_request_is_served_as_collapsed_stacks(self):
+        client = _client()
+
+        response = client.post('/search_cities', data={'query': 'Par'},
+                               headers={'X-Profile': 'cprofile', **ADMIN})
+        profile_id = response.headers['X-Profile-Id']
+        text = client.get(f'/admin/profiles/{profile_id}', headers=ADMIN).get_data(as_text=True)
+
+        (summary,) = client.get('/admin/profiles', headers=ADMIN).json['profiles']
+        assert summary['mode'] == 'cprofile' and summary['route'] == 'routes.search_city'
+        lines = text.splitlines()
+        assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert any('main:search_city' in line for line in lines)
+
+    def test_sampled_requests_use_stack_sampler(self):
+        client = _client(PROFILE_SAMPLE_RATE=1.0, PROFILE_MODE='sample', PROFILE_INTERVAL=0.002)
+
+        client.post('/search_cities', data={'query': 'Zzq'})
+        text = client.get('/admin/profiles?format=collapsed', headers=ADMIN).get_data(as_text=True)
+
+        assert 'main:search_city;' in text
+        assert 'test_profiling:search_cities' in text
+
+    def test_ring_keeps_latest_profiles(self):
+        client = _client(PROFILE_SAMPLE_RATE=1.0, PROFILE_RING_SIZE=2)
+
+        for _ in range(3):
+            client.get('/metrics')
+
+        profiles = client.get('/admin/profiles', headers=ADMIN).json['profiles']
+        assert [profile['id'] for profile in profiles] == [3, 2]
+        assert client.get('/admin/profiles/1', headers=ADMIN).status_code == 404
+
+
+class TestCollapsedStacks:
+    """Tests for expanding a cProfile call graph into stacks."""
+
+    def test_call_graph_expansion(self):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _branch()
+        profiler.disable()
+
+        stacks = cprofile_stacks(pstats.Stats(profiler))
+
+        (leaf_stack,) = [stack for stack in stacks if stack.endswith('test_profiling:_leaf')]
+        assert leaf_stack.endswith('test_profiling:_branch;test_profiling:_leaf')
+        assert stacks[leaf_stack] > 0
+
+    def test_store_merges_by_route(self):
+        store = ProfileStore(size=3)
+        for route, stack in (('a', 'x;y'), ('a', 'x;y'), ('b', 'x;z')):
+            store.add({'id': store.next_id(), 'route': route, 'stacks': {stack: 10}})
+
+        assert store.merged('a') == {'x;y': 20}
+        assert collapsed_text(store.merged()) == 'x;y 20\nx;z 10\n'
+        assert [item['id'] for item in store.summaries()] == [3, 2, 1]
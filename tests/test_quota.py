@@ -0,0 +1,113 @@
+"""
+Unit tests for the upstream quota governor.
+"""
+
+import threading
+
+import pytest
+
+import deadline
+from quota import QuotaExhausted, QuotaGovernor, governing, request_slot
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def make_governor(clock, **kwargs):
+    return QuotaGovernor(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestQuotaGovernor:
+    """Token bucket and in-flight cap."""
+
+    def test_burst_is_granted_without_waiting(self):
+        clock = FakeClock()
+        governor = make_governor(clock, rate=2, burst=3, max_in_flight=10)
+        assert all(governor.acquire(timeout=0) for _ in range(3))
+        assert clock.slept == []
+
+    def test_callers_past_the_burst_wait_for_refill(self):
+        clock = FakeClock()
+        governor = make_governor(clock, rate=2, burst=1, max_in_flight=10)
+        assert governor.acquire() and governor.acquire() and governor.acquire()
+        assert clock.slept == pytest.approx([0.5, 0.5])
+
+    def test_refused_when_wait_exceeds_timeout(self):
+        clock = FakeClock()
+        governor = make_governor(clock, rate=1, burst=1, max_in_flight=10)
+        assert governor.acquire(timeout=0)
+        assert not governor.acquire(timeout=0.5)
+        clock.now += 1.0  # refused callers don't consume tokens
+        assert governor.acquire(timeout=0)
+
+    def test_in_flight_cap(self):
+        governor = make_governor(FakeClock(), rate=100, burst=100, max_in_flight=2)
+        assert governor.acquire(timeout=0) and governor.acquire(timeout=0)
+        assert not governor.acquire(timeout=0)
+        governor.release()
+        assert governor.acquire(timeout=0)
+
+    def test_slot_releases_and_raises(self):
+        governor = make_governor(FakeClock(), rate=100, burst=100, max_in_flight=1)
+        with governor.slot(timeout=0):
+            with pytest.raises(QuotaExhausted):
+                with governor.slot(timeout=0):
+                    pass
+        with governor.slot(timeout=0):
+            pass
+
+    def test_timeout_is_capped_by_request_deadline(self):
+        governor = QuotaGovernor(rate=1, burst=1, max_in_flight=1)
+        governor.acquire()
+        with deadline.request_deadline(0.6):
+            # 0.6s left minus the minimum call time leaves no room to wait
+            assert not governor.acquire(timeout=5)
+
+    def test_concurrent_callers_never_exceed_cap(self):
+        governor = QuotaGovernor(rate=1000, burst=1000, max_in_flight=3)
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def call():
+            with governor.slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                threading.Event().wait(0.01)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak[0] <= 3
+
+    def test_request_slots_come_from_the_governor_in_effect(self):
+        clock = FakeClock()
+        governor = make_governor(clock, rate=1.0, burst=2)
+        with request_slot(timeout=0):
+            pass  # nothing governs this block
+        with governing(governor):
+            for _ in range(2):
+                with request_slot(timeout=0):
+                    pass
+            with pytest.raises(QuotaExhausted):
+                with request_slot(timeout=0):
+                    pass
+        with request_slot(timeout=0):
+            pass
+
+    def test_rejects_bad_configuration(self):
+        with pytest.raises(ValueError):
+            QuotaGovernor(rate=0)
@@ -0,0 +1,80 @@
+"""
+Unit tests for top-K offer ranking.
+"""
+
+import pytest
+
+from offers import FlightOffer, HotelOffer
+from ranking import RankingWeights, top_k_flights, top_k_hotels
+
+
+def _flight(number, price, minutes, stops=0, departure='2026-11-20T10:00:00'):
+    return FlightOffer('Test Air', 'TA', number, departure, None, 'DEL', 'BOM', price, 'INR', None,
+                       stops=stops, total_duration_minutes=minutes)
+
+
+def _hotel(name, price, rating):
+    return HotelOffer(name, rating, price, 'INR', 'Mumbai', '')
+
+
+class TestTopKFlights:
+    """Tests for weighted flight selection."""
+
+    def test_picks_best_k_not_first_k(self):
+        offers = [_flight(str(i), 9000 - i, 300) for i in range(10)] + [_flight('cheap', 3000, 130)]
+
+        best = top_k_flights(offers, k=3)
+
+        assert [f.flight_number for f in best] == ['cheap', '9', '8']
+
+    def test_price_only_weights_sort_by_price(self):
+        offers = [_flight('a', 5000, 100), _flight('b', 4000, 600, stops=2), _flight('c', 4500, 200)]
+        weights = RankingWeights(price=1, duration=0, stops=0)
+
+        assert [f.flight_number for f in top_k_flights(offers, k=3, weights=weights)] == ['b', 'c', 'a']
+
+    def test_departure_preference(self):
+        offers = [
+            _flight('night', 5000, 120, departure='2026-11-20T23:30:00'),
+            _flight('morning', 5000, 120, departure='2026-11-20T07:15:00'),
+        ]
+        weights = RankingWeights(preferred_departure='morning')
+
+        assert top_k_flights(offers, k=1, weights=weights)[0].flight_number == 'morning'
+
+    def test_empty_and_zero_k(self):
+        assert top_k_flights([], k=3) == []
+        assert top_k_flights([_flight('a', 1, 1)], k=0) == []
+
+
+class TestTopKHotels:
+    """Tests for hotel selection by price and rating."""
+
+    def test_rating_breaks_close_prices(self):
+        hotels = [_hotel('Budget', 3000, '2'), _hotel('Grand', 3100, '5'), _hotel('Palace', 12000, '5')]
+
+        assert [h.name for h in top_k_hotels(hotels, k=2)] == ['Grand', 'Budget']
+
+    def test_missing_rating_ranks_last_on_ties(self):
+        hotels = [_hotel('Unknown', 3000, None), _hotel('Rated', 3000, 4.0)]
+
+        assert top_k_hotels(hotels, k=1)[0].name == 'Rated'
+
+
+class TestRankingWeights:
+    """Tests for per-request weight parsing."""
+
+    def test_from_mapping(self):
+        weights = RankingWeights.from_mapping({'weightPrice': '2', 'preferredDeparture': 'Evening'})
+        assert weights.price == 2.0
+        assert weights.duration == 0.5
+        assert weights.preferred_departure == 'evening'
+
+    @pytest.mark.parametrize('values', [
+        {'weightPrice': 'abc'},
+        {'weightStops': '-1'},
+        {'preferredDeparture': 'brunch'},
+    ])
+    def test_invalid_values(self, values):
+        with pytest.raises(ValueError):
+            RankingWeights.from_mapping(values)
@@ -0,0 +1,35 @@
+"""
+Unit tests for the private per-user app directory.
+"""
+
+import os
+import stat
+
+import pytest
+
+from runtime_paths import InsecurePathError, app_runtime_dir
+
+
+class TestAppRuntimeDir:
+    """Tests for app_runtime_dir()."""
+
+    def test_created_private_under_xdg_runtime_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        path = app_runtime_dir()
+        assert path == str(tmp_path / 'travel_planner')
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+        assert app_runtime_dir() == path  # reused once it exists
+
+    def test_refuses_a_shared_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        (tmp_path / 'travel_planner').mkdir(mode=0o777)
+        os.chmod(tmp_path / 'travel_planner', 0o777)
+        with pytest.raises(InsecurePathError):
+            app_runtime_dir()
+
+    def test_refuses_a_planted_symlink(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        (tmp_path / 'elsewhere').mkdir(mode=0o700)
+        (tmp_path / 'travel_planner').symlink_to(tmp_path / 'elsewhere')
+        with pytest.raises(InsecurePathError):
+            app_runtime_dir()
@@ -0,0 +1,118 @@
+"""
+Unit tests for the memory-mapped cache shared between worker processes.
+"""
+
+import multiprocessing
+import os
+import pytest
+
+from instrumentation import METRICS
+from runtime_paths import InsecurePathError
+from shared_cache import PROBE_LENGTH, SharedMemoryCache
+from offers import HotelOffer
+
+
+def _writer(path, rounds):
+    cache = SharedMemoryCache(path, slots=64, slot_size=1024)
+    for i in range(rounds):
+        # Each value is self-consistent, so a torn read would be detectable
+        cache.set(('hot',), (i, 'x' * (i % 500)), ttl_seconds=60)
+        cache.set(('key', os.getpid(), i % 10), i, ttl_seconds=60)
+
+
+def _reader(path, rounds, results):
+    cache = SharedMemoryCache(path, slots=64, slot_size=1024)
+    torn = seen = 0
+    for _ in range(rounds):
+        value = cache.get(('hot',))
+        if value is not None:
+            seen += 1
+            torn += len(value[1]) != value[0] % 500
+    results.put((seen, torn))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedMemoryCache(str(tmp_path / 'cache.mmap'), slots=64, slot_size=1024)
+
+
+class TestSharedMemoryCache:
+    """Tests for the shared fixed-slot hash table."""
+
+    def test_round_trip_and_delete(self, cache):
+        hotel = HotelOffer('Taj', 4.5, 9000.0, 'INR', 'Mumbai', 'x' * 2000)
+        cache.set(('hotels', 'BOM'), [hotel], ttl_seconds=60)
+        cache.set(('min_price', 'nowhere'), None, ttl_seconds=60)
+
+        assert cache.get(('hotels', 'BOM'))[0].to_dict() == hotel.to_dict()
+        assert cache.get(('min_price', 'nowhere'), 'miss') is None
+        assert cache.get(('min_price', 'elsewhere'), 'miss') == 'miss'
+        cache.delete(('hotels', 'BOM'))
+        assert cache.get(('hotels', 'BOM')) is None
+        assert len(cache) == 1
+
+    def test_visible_to_other_instances(self, cache):
+        cache.set(('min_price', 'paris'), 1500.0, ttl_seconds=60)
+        other = SharedMemoryCache(cache.path, slots=64, slot_size=1024)
+        assert other.get(('min_price', 'paris')) == 1500.0
+        other.clear()
+        assert cache.get(('min_price', 'paris')) is None
+
+    def test_ttl_and_oversize(self, cache):
+        cache.set(('old',), 1, ttl_seconds=-1)
+        assert cache.get(('old',)) is None
+        assert cache.set(('big',), os.urandom(4096), ttl_seconds=60) is False
+        assert cache.stats()['oversize'] == 1
+
+    def test_oversize_entries_are_counted_and_logged_once(self, cache, caplog):
+        METRICS.reset()
+        for i in range(3):
+            cache.set(('flights', i), os.urandom(4096), ttl_seconds=60)
+
+        assert METRICS.counter_value('shared_cache_oversize_total', cache='flights') == 3
+        assert len([r for r in caplog.records if 'SHARED_CACHE_SLOT_SIZE' in r.getMessage()]) == 1
+
+    def test_clock_gives_recently_read_entries_a_second_chance(self, tmp_path):
+        cache = SharedMemoryCache(str(tmp_path / 'small.mmap'), slots=PROBE_LENGTH, slot_size=256)
+        for i in range(PROBE_LENGTH):
+            cache.set(('k', i), i, ttl_seconds=60)
+        assert cache.get(('k', 0)) == 0
+
+        cache.set(('k', 'new'), 'new', ttl_seconds=60)
+
+        assert len(cache) == PROBE_LENGTH
+        assert cache.get(('k', 0)) == 0
+        assert cache.get(('k', 'new')) == 'new'
+        assert cache.stats()['evictions'] == 1
+
+    def test_rejects_mismatched_geometry(self, cache):
+        with pytest.raises(ValueError):
+            SharedMemoryCache(cache.path, slots=128, slot_size=1024)
+
+    def test_refuses_files_other_users_can_write(self, cache):
+        os.chmod(cache.path, 0o666)
+        with pytest.raises(InsecurePathError):
+            SharedMemoryCache(cache.path, slots=64, slot_size=1024)
+
+    def test_refuses_symlinks(self, cache, tmp_path):
+        link = tmp_path / 'planted.mmap'
+        link.symlink_to(cache.path)
+        with pytest.raises(OSError):
+            SharedMemoryCache(str(link), slots=64, slot_size=1024)
+
+    @pytest.mark.slow
+    def test_concurrent_processes_never_read_torn_values(self, cache):
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=_writer, args=(cache.path, 2000)) for _ in range(2)]
+        processes += [context.Process(target=_reader, args=(cache.path, 5000, results)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get(timeout=120) for _ in range(2)]
+        for process in processes:
+            process.join(timeout=120)
+
+        assert all(torn == 0 for _, torn in outcomes)
+        assert sum(seen for seen, _ in outcomes) > 0
+        # Both writers' keys landed in the one table
+        assert len(cache) >= 2
@@ -0,0 +1,52 @@
+"""
+Tests for the offline Amadeus/Gemini stub used by the benchmarks.
+"""
+
+import pytest
+
+import amadeus_api
+from benchmarks.stub_server import StubServer
+from upstream import UpstreamClient
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with StubServer() as server:
+        monkeypatch.setattr(amadeus_api, 'AMADEUS_BASE_URL', server.url)
+        yield server
+
+
+class TestStubServer:
+    """Tests that the app's upstream clients run unchanged against the stub."""
+
+    def test_hotel_search_replays_fixtures(self, stub):
+        hotels = amadeus_api.search_hotels('Mumbai, India', '2030-01-10', '2030-01-12')
+
+        assert hotels and all(hotel.price for hotel in hotels)
+        assert stub.counts == {'token': 1, 'cities': 1, 'hotels-by-city': 1, 'hotel-offers': 1}
+
+    def test_access_token_is_reused(self, stub):
+        amadeus_api.search_hotels('Mumbai, India', '2030-01-10', '2030-01-12')
+        amadeus_api.search_hotels('Mumbai, India', '2030-01-11', '2030-01-13')
+
+        assert stub.counts['token'] == 1
+
+    def test_injected_429s_are_retried(self, stub, monkeypatch):
+        monkeypatch.setattr(amadeus_api.time, 'sleep', lambda seconds: None)
+        stub.rate_429 = 1.0
+
+        assert amadeus_api.get_access_token() is None
+        assert stub.counts == {'token:429': 4}
+
+    def test_generate_content(self, stub):
+        client = UpstreamClient(gemini_api_key='stub', gemini_base_url=stub.gemini_url)
+
+        response = client.generate_content({'contents': [{'parts': [{'text': 'Plan a day in Goa'}]}]})
+
+        assert response.status_code == 200
+        assert response.json()['candidates'][0]['content']['parts'][0]['text']
+        assert stub.counts == {'generateContent': 1}
+
+    def test_unknown_path_is_404(self, stub):
+        response = amadeus_api.requests.get(f'{stub.url}/v9/nothing', timeout=5)
+        assert response.status_code == 404
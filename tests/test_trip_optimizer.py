@@ -0,0 +1,119 @@
+"""
+Unit tests for budget-constrained flight + hotel combinations.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from offers import FlightOffer, HotelOffer
+from ranking import flight_scorer, hotel_scorer
+from trip_optimizer import best_combinations, cheapest_combinations, optimize_trip
+
+
+def _flight(number, price, minutes=120, stops=0):
+    return FlightOffer('Test Air', 'TA', str(number), '2030-01-10T10:00:00', None, 'DEL', 'GOI', price, 'INR',
+                       None, stops=stops, total_duration_minutes=minutes)
+
+
+def _hotel(name, price, rating=4.0):
+    return HotelOffer(str(name), rating, price, 'INR', 'Goa', '')
+
+
+def _random_offers(rng, flights=40, hotels=30):
+    return ([_flight(i, rng.randrange(3000, 20000), rng.randrange(60, 600), rng.randrange(3))
+             for i in range(flights)],
+            [_hotel(i, rng.randrange(1000, 9000), rng.choice([2.0, 3.0, 3.5, 4.0, 4.5, 5.0]))
+             for i in range(hotels)])
+
+
+class TestAgainstCrossProduct:
+    """Randomized comparisons with scoring every flight x hotel pair."""
+
+    @pytest.mark.parametrize('seed', range(8))
+    def test_cheapest_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        flights, hotels = _random_offers(rng)
+        nights, budget = rng.randrange(1, 5), rng.randrange(8000, 40000)
+
+        totals = sorted(f.price + h.price * nights for f in flights for h in hotels)
+        expected = [total for total in totals if total <= budget][:7]
+
+        assert [option.total for option in cheapest_combinations(flights, hotels, nights, budget, k=7)] == expected
+
+    @pytest.mark.parametrize('seed', range(8))
+    def test_best_matches_brute_force(self, seed):
+        rng = random.Random(100 + seed)
+        flights, hotels = _random_offers(rng)
+        nights, budget = rng.randrange(1, 5), rng.randrange(8000, 40000)
+        flight_score, hotel_score = flight_scorer(flights), hotel_scorer(hotels)
+
+        scores = sorted(flight_score(f) + hotel_score(h) for f in flights for h in hotels
+                        if f.price + h.price * nights <= budget)
+        options = best_combinations(flights, hotels, nights, budget, k=7)
+
+        assert [option.score for option in options] == pytest.approx(scores[:7])
+        assert all(option.total <= budget for option in options)
+
+
+class TestOptimizeTrip:
+    """Tests for edge cases of the optimizer."""
+
+    def test_nothing_within_budget(self):
+        assert optimize_trip([_flight(1, 9000)], [_hotel('a', 5000)], 2, budget=10000) == []
+
+    def test_unpriced_offers_are_ignored(self):
+        options = optimize_trip([_flight(1, 0.0), _flight(2, 4000)], [_hotel('a', 1000)], 1, 10000,
+                                objective='cheapest')
+        assert [option.flight.flight_number for option in options] == ['2']
+
+    def test_unknown_objective(self):
+        with pytest.raises(ValueError):
+            optimize_trip([], [], 1, 100, objective='fastest')
+
+
+def test_optimize_trip_route(stub_client, stub_upstream):
+    upstream = stub_upstream(flights=[_flight(1, 8000), _flight(2, 4000, minutes=600, stops=2)],
+                             hotels=[_hotel('Beach', 3000, 4.5), _hotel('Budget', 1000, 2.0)])
+    client = stub_client(upstream)
+    start = datetime.now() + timedelta(days=20)
+    form = {'startPointCode': 'DEL', 'destinationCode': 'GOI', 'destination': 'Goa, India',
+            'startDate': start.strftime('%Y-%m-%d'), 'endDate': (start + timedelta(days=2)).strftime('%Y-%m-%d'),
+            'budget': '150', 'currency': 'USD', 'objective': 'cheapest', 'limit': '2'}
+
+    data = client.post('/optimize_trip', data=form).get_json()
+    again = client.post('/optimize_trip', data=dict(form, budget='1')).get_json()
+
+    assert data['nights'] == 2 and data['currency'] == 'USD'
+    # Hotel prices are stay totals: 4000 + 1000, 4000 + 3000
+    assert [option['totalPrice'] for option in data['options']] == [62.5, 87.5]
+    assert data['options'][0]['hotel']['price'] == 6.25  # per night
+    assert data['options'][0]['flight']['currency'] == 'USD'
+    assert again['options'] == []
+    # second request served from cache
+    assert len(upstream.flight_calls) == len(upstream.hotel_calls) == 1
+
+
+def test_multi_night_stay_total_is_not_multiplied(stub_client, stub_upstream):
+    upstream = stub_upstream(flights=[_flight(1, 5000)], hotels=[_hotel('Villa', 12000)])  # 12000 for all 4 nights
+    client = stub_client(upstream)
+    start = datetime.now() + timedelta(days=20)
+    data = client.post('/optimize_trip', data={
+        'startPointCode': 'DEL', 'destinationCode': 'GOI', 'destination': 'Goa, India',
+        'startDate': start.strftime('%Y-%m-%d'), 'endDate': (start + timedelta(days=4)).strftime('%Y-%m-%d'),
+        'budget': '17000', 'objective': 'cheapest'}).get_json()
+
+    [option] = data['options']
+    assert option['totalPrice'] == 17000 and option['nights'] == 4
+    assert option['hotel']['price'] == 3000
+
+
+def test_optimize_trip_route_validates_budget(stub_client, stub_upstream):
+    client = stub_client(stub_upstream())
+    start = datetime.now() + timedelta(days=20)
+    response = client.post('/optimize_trip', data={
+        'startPointCode': 'DEL', 'destinationCode': 'GOI', 'destination': 'Goa',
+        'startDate': start.strftime('%Y-%m-%d'), 'endDate': (start + timedelta(days=2)).strftime('%Y-%m-%d'),
+        'budget': '-5'})
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+"""
+Budget-constrained flight + hotel combinations.
+
+A trip option is one flight offer plus one hotel for the stay: total =
+flight price + hotel nightly price x nights. Hotel searches price the
+whole stay, so callers pass nightly rates (HotelOffer.per_night). Both lists are the full cached offer sets, hundreds
+per side, so instead of scoring every one of the F x H pairs:
+
+- cheapest: the k smallest totals, by a heap merge over the two
+  price-sorted arrays (the k-smallest-pair-sums frontier). Stops at the
+  first total over budget. O(F log F + H log H + k log k).
+- best: the k lowest combined ranking scores (ranking.py) within budget.
+  Flights are sorted by price with a running best-score index, so a
+  two-pointer sweep over hotels by ascending cost finds each hotel's best
+  affordable flight in O(1). A heap over hotels then pulls further
+  affordable flights per hotel in score order, only as far as the k
+  options need.
+
+All prices must be in one currency (the canonical one, see fx.py).
+"""
+
+import heapq
+
+from ranking import DEFAULT_WEIGHTS, flight_scorer, hotel_scorer
+
+OBJECTIVES = ('best', 'cheapest')
+
+
+class TripOption:
+    """One flight + hotel combination and its total price."""
+
+    __slots__ = ('flight', 'hotel', 'nights', 'total', 'score')
+
+    def __init__(self, flight, hotel, nights, total, score=None):
+        self.flight = flight
+        self.hotel = hotel
+        self.nights = nights
+        self.total = total
+        self.score = score
+
+    def in_currency(self, currency, rate):
+        return TripOption(self.flight.in_currency(currency, rate), self.hotel.in_currency(currency, rate),
+                          self.nights, round(self.total * rate, 2), self.score)
+
+    def to_dict(self):
+        return {
+            'flight': self.flight.to_dict(),
+            'hotel': self.hotel.to_dict(),
+            'nights': self.nights,
+            'totalPrice': round(self.total, 2),
+            'currency': self.flight.currency,
+        }
+
+    def __repr__(self):
+        return f"TripOption({self.flight!r} + {self.hotel!r} x{self.nights} = {self.total})"
+
+
+def _priced(offers):
+    # Offers whose price failed to parse come through as 0 - never "free"
+    return [offer for offer in offers if offer.price and offer.price > 0]
+
+
+def cheapest_combinations(flights, hotels, nights, budget, k=5):
+    """The k cheapest options with total <= budget, cheapest first."""
+    flights = sorted(_priced(flights), key=lambda offer: offer.price)
+    hotels = sorted(_priced(hotels), key=lambda offer: offer.price)
+    if not flights or not hotels or k <= 0:
+        return []
+
+    def total(i, j):
+        return flights[i].price + hotels[j].price * nights
+
+    frontier = [(total(0, 0), 0, 0)]
+    seen = {(0, 0)}
+    options = []
+    while frontier and len(options) < k:
+        cost, i, j = heapq.heappop(frontier)
+        if cost > budget:
+            break  # every remaining pair costs at least this much
+        options.append(TripOption(flights[i], hotels[j], nights, cost))
+        for pair in ((i + 1, j), (i, j + 1)):
+            if pair[0] < len(flights) and pair[1] < len(hotels) and pair not in seen:
+                seen.add(pair)
+                heapq.heappush(frontier, (total(*pair), *pair))
+    return options
+
+
+def best_combinations(flights, hotels, nights, budget, k=5, weights=DEFAULT_WEIGHTS):
+    """The k options with the lowest flight + hotel ranking score and total <= budget."""
+    flights = sorted(_priced(flights), key=lambda offer: offer.price)
+    hotels = sorted(_priced(hotels), key=lambda offer: offer.price)
+    if not flights or not hotels or k <= 0:
+        return []
+    flight_score = list(map(flight_scorer(flights, weights), flights))
+    hotel_score = list(map(hotel_scorer(hotels, weights), hotels))
+
+    # best_upto[i]: index of the best-scoring flight among the i+1 cheapest
+    best_upto = []
+    best = 0
+    for i, score in enumerate(flight_score):
+        if score < flight_score[best]:
+            best = i
+        best_upto.append(best)
+    # Flights in score order, and each flight's position in it
+    by_score = sorted(range(len(flights)), key=flight_score.__getitem__)
+    position = {index: pos for pos, index in enumerate(by_score)}
+
+    # Two pointers: hotels by ascending cost leave ever less for the flight
+    frontier = []
+    affordable = len(flights)  # flights[:affordable] fit next to the current hotel
+    for j, hotel in enumerate(hotels):
+        limit = budget - hotel.price * nights
+        while affordable and flights[affordable - 1].price > limit:
+            affordable -= 1
+        if not affordable:
+            break  # pricier hotels can't afford even the cheapest flight
+        i = best_upto[affordable - 1]
+        frontier.append((hotel_score[j] + flight_score[i], flights[i].price, j, position[i], limit))
+    heapq.heapify(frontier)
+
+    options = []
+    while frontier and len(options) < k:
+        score, _, j, pos, limit = heapq.heappop(frontier)
+        i = by_score[pos]
+        hotel = hotels[j]
+        options.append(TripOption(flights[i], hotel, nights, flights[i].price + hotel.price * nights, score))
+        # Next-best flight this hotel can afford (everything between is over its limit)
+        for next_pos in range(pos + 1, len(by_score)):
+            i = by_score[next_pos]
+            if flights[i].price <= limit:
+                heapq.heappush(frontier, (hotel_score[j] + flight_score[i], flights[i].price, j, next_pos, limit))
+                break
+    return options
+
+
+def optimize_trip(flights, hotels, nights, budget, k=5, objective='best', weights=DEFAULT_WEIGHTS):
+    """Options for objective 'best' (ranking score) or 'cheapest' (total price)."""
+    if objective == 'cheapest':
+        return cheapest_combinations(flights, hotels, nights, budget, k)
+    if objective == 'best':
+        return best_combinations(flights, hotels, nights, budget, k, weights)
+    raise ValueError(f"Objective must be one of: {', '.join(OBJECTIVES)}")
@@ -0,0 +1,61 @@
+"""
+Upstream API client injected into the app by create_app().
+
+UpstreamClient puts the Amadeus calls (amadeus_api) and Gemini
+generateContent behind one object, so each worker can be built with its
+own configuration and load tests can pass a local stub instead of
+monkeypatching module globals. Any object with the same methods works.
+"""
+
+import os
+import requests
+
+import amadeus_api
+import deadline
+import instrumentation
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+GEMINI_MODEL = "gemini-2.5-flash"
+
+
+class UpstreamClient:
+    """Amadeus and Gemini calls used by the routes."""
+
+    def __init__(self, gemini_api_key=None, gemini_base_url=None, gemini_model=None):
+        self.gemini_api_key = gemini_api_key if gemini_api_key is not None else os.getenv("GEMINI_API_KEY")
+        self.gemini_base_url = (gemini_base_url or os.getenv("GEMINI_BASE_URL") or GEMINI_BASE_URL).rstrip('/')
+        self.gemini_model = gemini_model or GEMINI_MODEL
+
+    @property
+    def gemini_enabled(self):
+        return bool(self.gemini_api_key)
+
+    def search_flights(self, origin, destination, departure_date, return_date=None, adults=1,
+                       travel_class='ECONOMY', currency='USD', max_results=3):
+        return amadeus_api.search_flights(
+            origin=origin, destination=destination, departure_date=departure_date,
+            return_date=return_date, adults=adults, travel_class=travel_class,
+            currency=currency, max_results=max_results
+        )
+
+    def search_hotels(self, city_name, check_in, check_out, adults=1):
+        return amadeus_api.search_hotels(city_name=city_name, check_in=check_in,
+                                         check_out=check_out, adults=adults)
+
+    def search_cities(self, query):
+        return amadeus_api.search_cities(query)
+
+    def get_flight_status(self, carrier_code, flight_number, departure_date):
+        return amadeus_api.get_flight_status(carrier_code, flight_number, departure_date)
+
+    def generate_content(self, payload, timeout=30):
+        """POST a generateContent request to Gemini and return the requests.Response.
+
+        The timeout is capped by the request deadline (deadline.py).
+        """
+        url = f"{self.gemini_base_url}/models/{self.gemini_model}:generateContent?key={self.gemini_api_key}"
+        with instrumentation.upstream_call('gemini:generateContent') as call:
+            response = requests.post(url, headers={"Content-Type": "application/json"}, json=payload,
+                                     timeout=deadline.call_timeout(timeout))
+            call.attrs['status'] = response.status_code
+        return response
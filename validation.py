@@ -194,6 +194,26 @@ def validate_travel_class(travel_class: str) -> Tuple[bool, Optional[str]]:
     return True, None
 
 
+def validate_currency(currency: str, supported) -> Tuple[bool, Optional[str]]:
+    """
+    Validate a display currency code.
+    
+    Args:
+        currency: ISO 4217 code (e.g. INR, USD)
+        supported: Container of the codes the FX table can convert to
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    if not currency or not re.match(r'^[A-Z]{3}$', currency.upper()):
+        return False, "Currency must be a 3-letter ISO code"
+    
+    if currency.upper() not in supported:
+        return False, f"Currency {currency.upper()} is not supported"
+    
+    return True, None
+
+
 def sanitize_string(text: str, max_length: int = 200) -> str:
     """
     Sanitize and truncate user input strings.
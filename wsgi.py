@@ -0,0 +1,12 @@
+"""
+WSGI entry point for hosts that import a module-level app object: Vercel
+(vercel.json) and `waitress-serve wsgi:app`.
+
+Importing main only defines the app factory; the app is built here, once.
+Background cache sweeps are left to long-running servers built with
+create_app() (gunicorn.conf.py, serve.py).
+"""
+
+from main import create_app
+
+app = create_app({'CACHE_SWEEP_INTERVAL': 0})